@@ -0,0 +1,185 @@
+import abc
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .log_sketches import QuantileSketch, SpaceSaving
+
+
+class Aggregate(metaclass=abc.ABCMeta):
+    """
+    Abstract base class for additional statistics computed over log entries
+    alongside the built-in counters of a LogSummary.
+
+    Aggregates must be mergeable, so that they can be kept per time bucket and
+    combined over any window.
+    """
+
+    @abc.abstractmethod
+    def add(self, entry) -> None:
+        """Count the LogLine-like `entry` in the aggregate."""
+
+    @abc.abstractmethod
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        """Fold the aggregate `other`, of the same type, into this one."""
+
+    @property
+    @abc.abstractmethod
+    def value(self) -> Any:
+        """The reportable value of the aggregate."""
+
+    def snapshot(self) -> Any:
+        """
+        The aggregate's state as plain data, for checkpoints (see
+        log_checkpoint), or None if it cannot be checkpointed.
+        Subclasses should override this and `restore`.
+        """
+        return None
+
+    def restore(self, snapshot: Any) -> "Aggregate":
+        """Replace the aggregate's state with that of `snapshot`."""
+        return self
+
+
+AggregateFactory = Callable[[], Aggregate]
+AggregateFactories = Dict[str, AggregateFactory]
+
+
+class BytesSum(Aggregate):
+    """Total response payload size, in bytes."""
+
+    def __init__(self) -> None:
+        self.total = 0
+
+    def add(self, entry) -> None:
+        self.total += int(entry.size or 0)
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.total += other.total  # type: ignore
+        return self
+
+    @property
+    def value(self) -> int:
+        return self.total
+
+    def snapshot(self) -> int:
+        return self.total
+
+    def restore(self, snapshot: int) -> "Aggregate":
+        self.total = snapshot
+        return self
+
+
+class TopN(Aggregate):
+    """
+    The `n` most common values of the LogLine attribute named `attribute`
+    (e.g. "username"), as a list of (value, count) pairs.
+    """
+
+    def __init__(self, attribute: str, n: int = 3) -> None:
+        self.attribute = attribute
+        self.n = n
+        self.counts: Counter = Counter()
+
+    def add(self, entry) -> None:
+        self.counts[getattr(entry, self.attribute)] += 1
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.counts.update(other.counts)  # type: ignore
+        return self
+
+    @property
+    def value(self) -> list:
+        return self.counts.most_common(self.n)
+
+    def snapshot(self) -> dict:
+        return dict(self.counts)
+
+    def restore(self, snapshot: dict) -> "Aggregate":
+        self.counts = Counter(snapshot)
+        return self
+
+
+class HeavyHitters(Aggregate):
+    """
+    The estimated `n` most common values of the LogLine attribute named
+    `attribute` (e.g. "ip_address"), as a list of (value, count) pairs, kept
+    in a SpaceSaving sketch of at most `capacity` counters.
+
+    Unlike TopN, memory is bounded however many distinct values there are.
+    Counts may overestimate by up to 1/`capacity` of the entries counted.
+    Entries lacking the attribute are not counted.
+    """
+
+    def __init__(self, attribute: str, n: int = 3,
+                 capacity: int = 64) -> None:
+        self.attribute = attribute
+        self.n = n
+        self.sketch = SpaceSaving(capacity)
+
+    def add(self, entry) -> None:
+        value = getattr(entry, self.attribute, None)
+        if value is not None:
+            self.sketch.add(value)
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.sketch.merge(other.sketch)  # type: ignore
+        return self
+
+    @property
+    def value(self) -> list:
+        return self.sketch.top(self.n)
+
+    def snapshot(self) -> list:
+        return self.sketch.snapshot()
+
+    def restore(self, snapshot: list) -> "Aggregate":
+        self.sketch.restore(snapshot)
+        return self
+
+
+class Percentiles(Aggregate):
+    """
+    Estimated percentiles of the numeric LogLine attribute named `attribute`
+    (e.g. "size"), multiplied by `scale`, as a dict like {"p50": 240.0, ...}
+    for each of the `quantiles`, or None if no entry had a value. Kept in a
+    QuantileSketch, so memory is fixed however many entries are counted, and
+    each estimate is within `relative_accuracy` of the true percentile.
+
+    Entries with an empty or missing value are not counted.
+    """
+
+    def __init__(self,
+                 attribute: str,
+                 quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+                 scale: float = 1,
+                 relative_accuracy: float = 0.01) -> None:
+        self.attribute = attribute
+        self.quantiles = quantiles
+        self.scale = scale
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, entry) -> None:
+        value = getattr(entry, self.attribute, None)
+        if value is not None and value != "":
+            self.sketch.add(float(value))
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.sketch.merge(other.sketch)  # type: ignore
+        return self
+
+    @property
+    def value(self) -> Optional[Dict[str, float]]:
+        percentiles = {}
+        for q in self.quantiles:
+            estimate = self.sketch.quantile(q)
+            if estimate is None:
+                return None
+            percentiles[f"p{100 * q:g}"] = round(estimate * self.scale, 1)
+        return percentiles
+
+    def snapshot(self) -> list:
+        return self.sketch.snapshot()
+
+    def restore(self, snapshot: list) -> "Aggregate":
+        self.sketch.restore(snapshot)
+        return self
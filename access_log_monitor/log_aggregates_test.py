@@ -0,0 +1,66 @@
+from .log_aggregates import BytesSum, HeavyHitters, Percentiles, TopN
+from .log_line import LogLine
+
+
+def entries():
+    return [
+        LogLine(username="jill", size="100"),
+        LogLine(username="jill", size="200"),
+        LogLine(username="mary", size="300"),
+    ]
+
+
+def test_bytes_sum_totals_sizes_and_merges():
+    first, second = BytesSum(), BytesSum()
+    for entry in entries():
+        first.add(entry)
+    second.add(LogLine(size="50"))
+
+    assert first.value == 600
+    assert first.merge(second).value == 650
+
+
+def test_top_n_ranks_values_of_given_attribute_and_merges():
+    first, second = TopN("username", n=1), TopN("username", n=1)
+    for entry in entries():
+        first.add(entry)
+    assert first.value == [("jill", 2)]
+
+    for _ in range(3):
+        second.add(LogLine(username="mary"))
+    assert first.merge(second).value == [("mary", 4)]
+
+
+def test_heavy_hitters_rank_within_capacity_and_merge():
+    first, second = (HeavyHitters("username", n=1, capacity=2),
+                     HeavyHitters("username", n=1, capacity=2))
+    for entry in entries():
+        first.add(entry)
+    first.add(LogLine(username="frank"))
+    assert first.value == [("jill", 2)]
+    assert len(first.sketch) == 2
+
+    for _ in range(3):
+        second.add(LogLine(username="mary"))
+    assert first.merge(second).value == [("mary", 5)]
+
+
+def test_heavy_hitters_skip_entries_without_the_attribute():
+    hitters = HeavyHitters("path")
+    hitters.add(object())
+    assert hitters.value == []
+
+
+def test_percentiles_estimate_scaled_quantiles_and_merge():
+    first, second = Percentiles("size"), Percentiles("size", scale=0.001)
+    for entry in entries():
+        first.add(entry)
+    first.add(LogLine(size=""))
+    for _ in range(97):
+        first.add(LogLine(size="100"))
+    assert first.value == {"p50": 100.5, "p90": 100.5, "p99": 198.4}
+    assert second.value is None
+
+    second.add(LogLine(size="1000"))
+    assert second.value == {"p50": 1.0, "p90": 1.0, "p99": 1.0}
+    assert first.merge(Percentiles("size")).value["p99"] == 198.4
@@ -1,29 +1,88 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+from .log_aggregates import AggregateFactory, HeavyHitters, Percentiles
+from .log_batch import LogBatch
+from .log_filters import Filters, FilterValue
+from .log_line import LogLine
+from .log_metrics import LATENCY_BUCKETS, NO_METRICS, MetricsRegistry
 from .log_store import DequeDataStore, LogStore
-from .log_utils import most_common_by, now_utc, percent
+from .log_utils import now_utc
+
+# Report keys for the heavy hitters tracked by `track_heavy_hitters`, and the
+# attribute each ranks
+HEAVY_HITTERS = {
+    "top_paths": "path",
+    "top_ips": "ip_address",
+    "top_users": "username",
+}
 
 
 class LogAnalyzer:
-    def __init__(self, datastore: Optional[LogStore] = None) -> None:
+    """
+    Answers the monitors' questions about recent traffic from the datastore.
+
+    The latency of reports and counts is recorded in `metrics`, labeled
+    with the store's `label`, if given.
+    """
+
+    def __init__(self,
+                 datastore: Optional[LogStore] = None,
+                 metrics: MetricsRegistry = NO_METRICS,
+                 label: Optional[str] = None) -> None:
         self.store: LogStore = datastore or DequeDataStore()
+        labels = {"store": label} if label else {}
+        self.report_timer = metrics.histogram(
+            "report_seconds", "Time to summarize a window for a report.",
+            buckets=LATENCY_BUCKETS, **labels)
+        self.count_timer = metrics.histogram(
+            "count_seconds", "Time to count the entries in a window.",
+            buckets=LATENCY_BUCKETS, **labels)
 
     def requests_per_second(self,
                             since: datetime,
                             current_time: Optional[datetime] = None) -> float:
         """
-        Query the datastore for entries since the given time `since` and
-        compute the average number of requests per second over that interval.
+        Query the datastore for the number of entries since the given time
+        `since` and compute the average number of requests per second over
+        that interval.
         """
-        current_time = current_time or now_utc()
-        hits_over_interval = len(self.store.peek(since))
-        seconds_in_interval = (current_time - since).total_seconds()
+        with self.count_timer.time():
+            hits_over_interval = self.store.count(since)
+        return self.__average_per_second(hits_over_interval, since,
+                                         current_time)
 
-        if not seconds_in_interval:
-            return 0.0
+    def count(self, since: datetime, **filters: FilterValue) -> int:
+        """
+        Query the datastore for the number of entries since the given time
+        `since` matching every one of the given `filters`: field names (see
+        log_filters.FILTER_FIELDS) mapped to the value, or collection of
+        values, to accept.
 
-        return round(hits_over_interval / seconds_in_interval, 1)
+        e.g. analyzer.count(since, status_class="5", section="api")
+        """
+        with self.count_timer.time():
+            if not filters:
+                return self.store.count(since)
+            return self.store.count_matching(since, filters)
+
+    def percent(self, since: datetime, where: Filters,
+                within: Optional[Filters] = None) -> float:
+        """
+        The percentage of the entries since the given time `since` matching
+        the filters `within` that also match the filters `where`, rounded to
+        one decimal point. A field in both takes its value from `where`.
+
+        e.g. the 5xx rate of the api section:
+        analyzer.percent(since, {"status_class": "5"}, {"section": "api"})
+        """
+        within = within or {}
+        total = self.count(since, **within)
+        if not total:
+            return 0.0
+        matching = self.count(since, **{**within, **where})
+        return round(100 * matching / total, 1)
 
     def report(self, since: datetime) -> Dict[str, Any]:
         """
@@ -40,19 +99,99 @@ class LogAnalyzer:
         - Percentage of requests with 3xx responses
         - Percentage of requests with 4xx responses
         - Percentage of requests with 5xx responses
+        - Total bytes served since the cutoff time
+        - The value of each registered aggregate, by name
+
+        All entries are computed in a single pass over the window.
 
         Return a dict.
         """
-        entries = self.store.peek(since)
-        most_common = most_common_by(lambda e: e.site_section, entries)
-
-        return {
-            "most_popular_section": most_common["value"],
-            "most_popular_count": most_common["count"],
-            "requests_processed": len(entries),
-            "requests_per_second": self.requests_per_second(since),
-            "response_2xx_pct": percent(lambda e: e.status[0] == "2", entries),
-            "response_3xx_pct": percent(lambda e: e.status[0] == "3", entries),
-            "response_4xx_pct": percent(lambda e: e.status[0] == "4", entries),
-            "response_5xx_pct": percent(lambda e: e.status[0] == "5", entries),
+        with self.report_timer.time():
+            summary = self.store.summarize(since)
+        section, section_count = summary.most_popular_section
+
+        stats = {
+            "most_popular_section": section,
+            "most_popular_count": section_count,
+            "requests_processed": summary.hits,
+            "requests_per_second": self.__average_per_second(
+                summary.hits, since),
+            "response_2xx_pct": summary.percent("2"),
+            "response_3xx_pct": summary.percent("3"),
+            "response_4xx_pct": summary.percent("4"),
+            "response_5xx_pct": summary.percent("5"),
+            "bytes_served": summary.bytes,
         }
+        for name, extra in summary.extras.items():
+            stats[name] = extra.value
+
+        return stats
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]) -> None:
+        """
+        Hand `batch`, a list of LogLines or a LogBatch, to the datastore to be
+        merged in a single operation.
+        """
+        self.store.add_many(batch)
+
+    def track_window(self, length_sec: int) -> None:
+        """
+        Have the datastore keep a running count of entries over the most recent
+        `length_sec` seconds, so that `requests_per_second` over that window
+        costs O(1).
+        """
+        self.store.track_window(length_sec)
+
+    def track_heavy_hitters(self, n: int = 3, capacity: int = 64) -> None:
+        """
+        Add the estimated `n` most common paths, client IP addresses and
+        users to every report, as `top_paths`, `top_ips` and `top_users`.
+        Each is kept by a HeavyHitters sketch of at most `capacity` counters,
+        updated on ingest by stores that keep aggregates, so reports never
+        count every distinct value in the window.
+        """
+        for name, attribute in HEAVY_HITTERS.items():
+            self.register_aggregate(
+                name, partial(HeavyHitters, attribute, n, capacity))
+
+    def track_percentiles(self,
+                          quantiles: Sequence[float] = (0.5, 0.9, 0.99),
+                          relative_accuracy: float = 0.01) -> None:
+        """
+        Add the estimated `quantiles` of the response size, in bytes, and of
+        the request time, in milliseconds (for logs that record it), to every
+        report, as `size_percentiles` and `request_time_ms_percentiles`. Each
+        is kept by a Percentiles sketch per bucket, updated on ingest by
+        stores that keep aggregates and merged over the window, so reports
+        never sort raw values.
+        """
+        self.register_aggregate(
+            "size_percentiles",
+            partial(Percentiles, "size", quantiles, 1, relative_accuracy))
+        self.register_aggregate(
+            "request_time_ms_percentiles",
+            partial(Percentiles, "request_time", quantiles, 1000,
+                    relative_accuracy))
+
+    def register_aggregate(self, name: str, factory: AggregateFactory) -> None:
+        """
+        Add the Aggregate built by `factory` to every report, under the key
+        `name`, computed in the same pass as the built-in statistics.
+        """
+        self.store.register_aggregate(name, factory)
+
+    def __average_per_second(self,
+                             hits: int,
+                             since: datetime,
+                             current_time: Optional[datetime] = None) -> float:
+        """
+        Internal. The average of `hits` per second between `since` and
+        `current_time`, rounded to tenths.
+        """
+        current_time = current_time or now_utc()
+        seconds_in_interval = (current_time - since).total_seconds()
+
+        if not seconds_in_interval:
+            return 0.0
+
+        return round(hits / seconds_in_interval, 1)
@@ -1,8 +1,18 @@
 from collections import namedtuple
+from functools import partial
+from itertools import product
 
+import pytest
 from freezegun import freeze_time
 
+from .log_aggregates import BytesSum, TopN
 from .log_analyzer import LogAnalyzer
+from .log_batch import LogBatch
+from .log_entry_format import CLF_ENTRY_FORMAT
+from .log_line import LogLine
+from .log_store import (BitmapDataStore, BucketedDataStore,
+                        DataFrameDataStore, DequeDataStore, RollupDataStore,
+                        SqliteDataStore, TeeDataStore)
 from .log_utils import now_utc
 
 
@@ -20,26 +30,172 @@ def test_requests_per_second_returns_zero_if_no_hits_over_interval():
 
 @freeze_time("11:30:59")
 def test_requests_per_second_returns_value_rounded_to_tenths_place(mocker):
-    fakestore = namedtuple("fakestore", "peek")
+    fakestore = namedtuple("fakestore", "count")
     analyzer = LogAnalyzer(fakestore)
     one_minute_ago = now_utc(second=0)
 
-    log_entries = list(range(120))
-    mocker.patch.object(fakestore, "peek", return_value=log_entries)
+    mocker.patch.object(fakestore, "count", return_value=120)
     avg_reqs_per_sec = analyzer.requests_per_second(since=one_minute_ago)
     assert avg_reqs_per_sec == 2.0
 
-    log_entries = list(range(90))
-    mocker.patch.object(fakestore, "peek", return_value=log_entries)
+    mocker.patch.object(fakestore, "count", return_value=90)
     avg_reqs_per_sec = analyzer.requests_per_second(since=one_minute_ago)
     assert avg_reqs_per_sec == 1.5
 
-    log_entries = list(range(60))
-    mocker.patch.object(fakestore, "peek", return_value=log_entries)
+    mocker.patch.object(fakestore, "count", return_value=60)
     avg_reqs_per_sec = analyzer.requests_per_second(since=one_minute_ago)
     assert avg_reqs_per_sec == 1.0
 
-    log_entries = list(range(30))
-    mocker.patch.object(fakestore, "peek", return_value=log_entries)
+    mocker.patch.object(fakestore, "count", return_value=30)
     avg_reqs_per_sec = analyzer.requests_per_second(since=one_minute_ago)
     assert avg_reqs_per_sec == 0.5
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_report_summarizes_traffic_since_given_time(sample_log_path):
+    store = DequeDataStore()
+    with open(sample_log_path) as sample_log:
+        for line in sample_log:
+            store.add(LogLine.from_log_line(line))
+
+    report = LogAnalyzer(store).report(since=now_utc(minute=29, second=50))
+
+    assert report == {
+        "most_popular_section": "pages",
+        "most_popular_count": 4,
+        "requests_processed": 9,
+        "requests_per_second": 0.9,
+        "response_2xx_pct": 55.6,
+        "response_3xx_pct": 0.0,
+        "response_4xx_pct": 22.2,
+        "response_5xx_pct": 22.2,
+        "bytes_served": 2635,
+    }
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_report_is_identical_for_deque_and_bucketed_stores(sample_log_path):
+    deque_store = DequeDataStore()
+    bucketed_store = BucketedDataStore(window_sec=60)
+    with open(sample_log_path) as sample_log:
+        for line in sample_log:
+            deque_store.add(LogLine.from_log_line(line))
+            bucketed_store.add(LogLine.from_log_line(line))
+
+    since = now_utc(minute=29, second=50)
+    assert (LogAnalyzer(deque_store).report(since) == LogAnalyzer(
+        bucketed_store).report(since))
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_report_includes_registered_aggregates(sample_log_path):
+    for store in (DequeDataStore(), BucketedDataStore(window_sec=60)):
+        analyzer = LogAnalyzer(store)
+        analyzer.register_aggregate("bytes_served", BytesSum)
+        analyzer.register_aggregate("top_users", lambda: TopN("username", 1))
+
+        with open(sample_log_path) as sample_log:
+            for line in sample_log:
+                store.add(LogLine.from_log_line(line))
+
+        report = analyzer.report(since=now_utc(minute=29, second=50))
+        assert report["bytes_served"] == 2635
+        assert report["top_users"] == [("james", 4)]
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_report_includes_heavy_hitters_when_tracked(sample_log_path):
+    for store in (DequeDataStore(), BucketedDataStore(window_sec=60),
+                  DataFrameDataStore()):
+        analyzer = LogAnalyzer(store)
+        analyzer.track_heavy_hitters(n=2)
+
+        with open(sample_log_path) as sample_log:
+            store.add_many(
+                [LogLine.from_log_line(line) for line in sample_log])
+
+        report = analyzer.report(since=now_utc(minute=29, second=50))
+        assert report["top_users"][0] == ("james", 4)
+        assert report["top_ips"] == [("127.0.0.1", 9)]
+        assert sorted(report["top_paths"]) == [("/api/pages", 3),
+                                               ("/pages/delete", 3)]
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_report_includes_percentiles_when_tracked(tmp_path, sample_log_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.read().splitlines()
+    # the same traffic, with request times of 0.010s to 0.100s
+    timed_lines = [f"{line} 0.{i:02}0" for i, line in enumerate(lines, 1)]
+
+    entries = [
+        LogLine.from_log_line(line, CLF_ENTRY_FORMAT) for line in timed_lines
+    ]
+
+    new_stores = (DequeDataStore, partial(BucketedDataStore, window_sec=60),
+                  DataFrameDataStore, SqliteDataStore, BitmapDataStore)
+    for new_store, batched in product(new_stores, (False, True)):
+        store = new_store()
+        analyzer = LogAnalyzer(store)
+        analyzer.track_percentiles()
+        store.add_many(LogBatch.from_entries(entries) if batched else entries)
+
+        report = analyzer.report(since=now_utc(minute=29, second=50))
+        assert report["size_percentiles"] == {
+            "p50": pytest.approx(274, rel=0.01),
+            "p90": pytest.approx(402, rel=0.01),
+            "p99": pytest.approx(402, rel=0.01),
+        }
+        assert report["request_time_ms_percentiles"] == {
+            "p50": pytest.approx(60, rel=0.01),
+            "p90": pytest.approx(90, rel=0.01),
+            "p99": pytest.approx(90, rel=0.01),
+        }
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_filtered_counts_agree_across_stores(sample_log_path):
+    since = now_utc(minute=29, second=50)
+    for store in (DequeDataStore(), BitmapDataStore(), DataFrameDataStore(),
+                  SqliteDataStore()):
+        with open(sample_log_path) as sample_log:
+            store.add_many(
+                [LogLine.from_log_line(line) for line in sample_log])
+        analyzer = LogAnalyzer(store)
+
+        assert analyzer.count(since) == 9
+        assert analyzer.count(since, section="pages") == 4
+        assert analyzer.count(since, section="pages", status_class="5") == 2
+        assert analyzer.count(since, status_class=("4", "5")) == 4
+        assert analyzer.count(since, username="nobody") == 0
+        assert analyzer.count(since, verb="GET", section="pages") == 4
+        assert analyzer.percent(since, {"status_class": "5"},
+                                {"section": "pages"}) == 50.0
+        assert analyzer.percent(since, {"status_class": "4"},
+                                {"section": "nowhere"}) == 0.0
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_aggregate_stores_count_by_status_class_and_section(sample_log_path):
+    since = now_utc(minute=29, second=50)
+    for store in (BucketedDataStore(window_sec=60), RollupDataStore(),
+                  TeeDataStore(RollupDataStore(), DequeDataStore())):
+        with open(sample_log_path) as sample_log:
+            store.add_many(
+                [LogLine.from_log_line(line) for line in sample_log])
+        analyzer = LogAnalyzer(store)
+
+        assert analyzer.count(since, section="pages") == 4
+        assert analyzer.count(since, section="pages", status_class="5") == 2
+        assert analyzer.count(since, status_class=("4", "5")) == 4
+        assert analyzer.percent(since, {"status_class": "5"},
+                                {"section": "pages"}) == 50.0
+        with pytest.raises(ValueError, match="Cannot filter on username"):
+            analyzer.count(since, section="pages", username="nobody")
+
+
+def test_filtering_on_unknown_fields_raises():
+    with pytest.raises(ValueError):
+        LogAnalyzer(BitmapDataStore()).count(now_utc(), ip_address="1.2.3.4")
+    with pytest.raises(ValueError, match="Cannot filter on ip_address"):
+        LogAnalyzer(DataFrameDataStore()).count(now_utc(), ip_address="::1")
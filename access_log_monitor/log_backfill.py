@@ -0,0 +1,136 @@
+import os
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (BinaryIO, Deque, Iterable, Iterator, List, Optional,
+                    Pattern, Tuple)
+
+from .log_batch import LogBatch
+from .log_line import LogLine
+from .log_manager import split_lines
+from .log_store import LogStore
+
+# The most bytes of the log parsed into a single batch on backfill
+RANGE_BYTES = 16 * 1024 * 1024
+
+
+def byte_ranges(path: str, parts: int, stop: int) -> List[Tuple[int, int]]:
+    """
+    Split the complete lines in the first `stop` bytes of the file at `path`
+    into at most `parts` (start, stop) byte ranges of similar size, each
+    ending just after a newline.
+    """
+    with open(path, "rb") as log:
+        end = line_end_before(log, stop)
+        boundaries = [0]
+        for part in range(1, parts):
+            log.seek(end * part // parts)
+            log.readline()
+            boundaries.append(min(log.tell(), end))
+        boundaries.append(end)
+
+    return [(start, stop) for start, stop in zip(boundaries, boundaries[1:])
+            if stop > start]
+
+
+def line_end_before(log: BinaryIO, stop: int) -> int:
+    """
+    The offset just after the last newline before the byte offset `stop` of
+    the binary file `log`, or 0 if there is none.
+    """
+    while stop > 0:
+        start = max(stop - 64 * 1024, 0)
+        log.seek(start)
+        newline = log.read(stop - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        stop = start
+    return 0
+
+
+def parse_range(path: str, start: int, stop: int,
+                entry_format: Optional[Pattern] = None) -> LogBatch:
+    """
+    Parse the complete lines between the byte offsets `start` and `stop` of
+    the file at `path` into a LogBatch, dropping lines that fail to parse.
+    Run in worker processes: batches pickle as raw column bytes plus a
+    single table of distinct strings, so returning one is cheap.
+    """
+    with open(path, "rb") as log:
+        log.seek(start)
+        lines, _ = split_lines(log.read(stop - start), final=True)
+    return LogBatch.from_entries(
+        LogLine.from_log_line(line, entry_format) for line in lines)
+
+
+def backfill(path: str,
+             stop: int,
+             datastore: LogStore,
+             entry_format: Optional[Pattern] = None,
+             workers: Optional[int] = None) -> int:
+    """
+    Parse the first `stop` bytes of the log at `path` in parallel into
+    `datastore`: split them into newline-aligned byte ranges of at most about
+    RANGE_BYTES, parse each range into a LogBatch in one of `workers` worker
+    processes, and add the batches to the store one at a time, in timestamp
+    order (see `in_order`), as they arrive. Only a few ranges' entries are
+    held in memory at once, however long the log.
+
+    Return the offset of the end of the last complete line parsed, from
+    which tailing should resume.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = byte_ranges(path, max(workers, -(-stop // RANGE_BYTES)), stop)
+    for batch in in_order(parse_ranges(path, ranges, entry_format, workers)):
+        datastore.add_many(batch)
+    return ranges[-1][1] if ranges else 0
+
+
+def parse_ranges(path: str,
+                 ranges: List[Tuple[int, int]],
+                 entry_format: Optional[Pattern] = None,
+                 workers: int = 1) -> Iterator[LogBatch]:
+    """
+    Yield a LogBatch of each of the byte `ranges` of the file at `path`, in
+    order, parsed by `workers` worker processes (in this one, if 1). At most
+    two ranges per worker are parsed ahead of the batch last yielded.
+    """
+    if workers == 1:
+        for start, stop in ranges:
+            yield parse_range(path, start, stop, entry_format)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for start, stop in ranges:
+            pending.append(
+                executor.submit(parse_range, path, start, stop, entry_format))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def in_order(batches: Iterable[LogBatch]) -> Iterator[LogBatch]:
+    """
+    Yield the entries of `batches`, each parsed from the part of the log
+    after the one before, as batches in timestamp order: each batch is
+    sorted, and the entries of a batch logged later than the next one's
+    earliest entry are held back and merged into the next. (The log is
+    taken to be out of order only across neighboring batches.)
+    """
+    held: Optional[LogBatch] = None
+    for batch in batches:
+        if not len(batch):
+            continue
+        batch = batch.sorted()
+        if held is not None:
+            cut = bisect_right(held.epochs, batch.epochs[0])
+            if cut:
+                yield held.slice(0, cut)
+            if cut < len(held):
+                merged = LogBatch().extend(held.slice(cut, len(held)))
+                batch = merged.extend(batch).sorted()
+        held = batch
+    if held is not None:
+        yield held
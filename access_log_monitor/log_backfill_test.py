@@ -0,0 +1,101 @@
+from typing import List
+
+from . import log_backfill
+from .log_backfill import backfill, byte_ranges, in_order
+from .log_batch import LogBatch
+from .log_line import LogLine
+from .log_manager import LogManager
+from .log_store import DequeDataStore
+
+
+def write_log(tmp_path, lines):
+    path = tmp_path / "access.log"
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return str(path)
+
+
+def test_byte_ranges_are_newline_aligned(sample_log_path):
+    with open(sample_log_path, "rb") as sample_log:
+        contents = sample_log.read()
+
+    ranges = byte_ranges(sample_log_path, 3, len(contents) - 5)
+
+    assert len(ranges) == 3
+    assert ranges[0][0] == 0
+    for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+        assert stop == start
+    for _, stop in ranges:
+        assert contents[stop - 1:stop] == b"\n"
+    assert ranges[-1][1] == contents.rindex(b"\n", 0, len(contents) - 1) + 1
+
+
+def test_byte_ranges_skip_empty_ranges(sample_log_path):
+    with open(sample_log_path, "rb") as sample_log:
+        contents = sample_log.read()
+
+    assert len(byte_ranges(sample_log_path, 50, len(contents))) == 10
+    assert byte_ranges(sample_log_path, 4, 10) == []
+
+
+class BatchRecorder(DequeDataStore):
+    """Stands in for a LogStore, recording the batches added to it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: List[LogBatch] = []
+
+    def add_many(self, batch):
+        self.batches.append(batch)
+        return self
+
+
+def test_backfill_matches_parsing_in_order(monkeypatch, sample_log_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.read().splitlines()
+    expected = LogBatch.from_entries(
+        LogLine.from_log_line(line) for line in lines).sorted()
+    monkeypatch.setattr(log_backfill, "RANGE_BYTES", 300)
+
+    for workers in (1, 3):
+        store = BatchRecorder()
+        offset = backfill(sample_log_path, 10**6, store, workers=workers)
+        assert len(store.batches) > 1
+        assert [epoch for batch in store.batches
+                for epoch in batch.epochs] == list(expected.epochs)
+        assert [path for batch in store.batches
+                for path in batch.string_column("paths")
+                ] == expected.string_column("paths")
+        assert offset == sum(len(line) + 1 for line in lines)
+
+
+def test_in_order_merges_entries_logged_out_of_order(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    batches = [
+        LogBatch.from_entries([entries[i] for i in indexes])
+        for indexes in ([0, 1, 5], [], [3, 2, 4, 6], [7, 8, 9])
+    ]
+
+    merged = list(in_order(batches))
+
+    assert [len(batch) for batch in merged] == [2, 5, 3]
+    assert [entry for batch in merged for entry in batch.lines()] == entries
+
+
+def test_tailing_resumes_where_backfill_stopped(tmp_path, sample_log_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.read().splitlines()
+    path = write_log(tmp_path, lines[:5])
+    with open(path, "a") as log:
+        log.write(lines[5][:20])
+
+    log_mgr = LogManager(path)
+    store = BatchRecorder()
+    log_mgr.seek(backfill(path, log_mgr.offset, store, workers=2))
+    with open(path, "a") as log:
+        log.write(lines[5][20:] + "\n")
+
+    assert sum(len(batch) for batch in store.batches) == 5
+    assert [entry.path for entry in log_mgr.read_entries()] == [
+        LogLine.from_log_line(lines[5]).path
+    ]
@@ -0,0 +1,197 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .log_line import LogLine, LogRecord, section_of
+from .log_timestamps import decode_epoch
+
+# Columns holding ids into the batch's StringTable
+STRING_COLUMNS = ("ip_addresses", "usernames", "timestamps", "verbs", "paths",
+                  "versions", "sections", "request_times")
+
+
+class StringTable:
+    """
+    Interns strings as small integer ids, so that a column of repeated
+    strings can be stored as an array of ids.
+    """
+
+    __slots__ = ("ids", "values")
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def id_of(self, value: str) -> int:
+        """Return the id of `value`, assigning the next id if it is new."""
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return string_id
+
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values: List[str]) -> None:
+        self.values = values
+        self.ids = {value: string_id for string_id, value in enumerate(values)}
+
+
+class LogBatch:
+    """
+    A columnar batch of parsed log entries.
+
+    Numeric fields (epoch seconds, status code, response size) are kept in
+    typed arrays and string fields as arrays of ids into a shared StringTable,
+    so a retained entry costs a few dozen bytes rather than a LogLine and its
+    eight strings. The site section is computed once per entry, on append.
+
+    Batches pickle compactly (arrays are pickled as raw bytes), so they are
+    cheap to pass between processes.
+    """
+
+    __slots__ = ("epochs", "statuses", "sizes", "strings") + STRING_COLUMNS
+
+    def __init__(self) -> None:
+        self.epochs = array("q")
+        self.statuses = array("H")
+        self.sizes = array("Q")
+        self.strings = StringTable()
+        # string columns (see STRING_COLUMNS)
+        self.ip_addresses = array("I")
+        self.usernames = array("I")
+        self.timestamps = array("I")
+        self.verbs = array("I")
+        self.paths = array("I")
+        self.versions = array("I")
+        self.sections = array("I")
+        self.request_times = array("I")
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[LogLine]) -> "LogBatch":
+        """Build a batch from the LogLine `entries`, skipping falsy ones."""
+        batch = cls()
+        for entry in entries:
+            if entry:
+                batch.append(entry)
+        return batch
+
+    def append(self, entry: LogLine) -> "LogBatch":
+        """Add the LogLine `entry` to the end of the batch."""
+        id_of = self.strings.id_of
+        self.epochs.append(decode_epoch(entry.timestamp,
+                                        entry.timestamp_format))
+        self.statuses.append(int(entry.status or 0))
+        self.sizes.append(int(entry.size or 0))
+        self.ip_addresses.append(id_of(entry.ip_address))
+        self.usernames.append(id_of(entry.username))
+        self.timestamps.append(id_of(entry.timestamp))
+        self.verbs.append(id_of(entry.verb))
+        self.paths.append(id_of(entry.path))
+        self.versions.append(id_of(entry.version))
+        self.sections.append(id_of(section_of(entry.path)))
+        self.request_times.append(id_of(entry.request_time))
+        return self
+
+    def extend(self, other: "LogBatch") -> "LogBatch":
+        """
+        Append every entry of the batch `other`, remapping its string ids into
+        this batch's StringTable (unless the batches share one).
+        """
+        self.epochs.extend(other.epochs)
+        self.statuses.extend(other.statuses)
+        self.sizes.extend(other.sizes)
+        if other.strings is self.strings:
+            for column in STRING_COLUMNS:
+                getattr(self, column).extend(getattr(other, column))
+            return self
+
+        remap = [self.strings.id_of(value) for value in other.strings.values]
+        for column in STRING_COLUMNS:
+            getattr(self, column).extend(
+                map(remap.__getitem__, getattr(other, column)))
+        return self
+
+    def sorted(self) -> "LogBatch":
+        """
+        Return the batch ordered by epoch second, oldest first, keeping
+        entries logged in the same second in their original order. Returns
+        the batch itself if it is already in order.
+        """
+        epochs = self.epochs
+        if all(epochs[i] <= epochs[i + 1] for i in range(len(epochs) - 1)):
+            return self
+
+        order = sorted(range(len(epochs)), key=epochs.__getitem__)
+        batch = LogBatch.__new__(LogBatch)
+        batch.strings = self.strings
+        for name in ("epochs", "statuses", "sizes") + STRING_COLUMNS:
+            column = getattr(self, name)
+            setattr(batch, name,
+                    array(column.typecode, [column[i] for i in order]))
+        return batch
+
+    def slice(self, start: int, stop: int) -> "LogBatch":
+        """
+        Return a batch of the entries from index `start` up to `stop`, sharing
+        this batch's StringTable.
+        """
+        batch = LogBatch.__new__(LogBatch)
+        batch.strings = self.strings
+        for name in ("epochs", "statuses", "sizes") + STRING_COLUMNS:
+            setattr(batch, name, getattr(self, name)[start:stop])
+        return batch
+
+    def epoch_runs(self) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (epoch second, start, stop) for each run of consecutive entries
+        logged in the same second. For a sorted batch, there is one run per
+        distinct second.
+        """
+        epochs = self.epochs
+        start = 0
+        for i in range(1, len(epochs) + 1):
+            if i == len(epochs) or epochs[i] != epochs[start]:
+                yield epochs[start], start, i
+                start = i
+
+    def string_column(self, column: str) -> List[str]:
+        """The values of the string column named `column`, as strings."""
+        values = self.strings.values
+        return [values[string_id] for string_id in getattr(self, column)]
+
+    def record(self, i: int) -> LogRecord:
+        """The entry at index `i`, as a LogRecord."""
+        values = self.strings.values
+        return LogRecord(values[self.ip_addresses[i]],
+                         values[self.usernames[i]],
+                         values[self.timestamps[i]], values[self.verbs[i]],
+                         values[self.paths[i]], values[self.versions[i]],
+                         str(self.statuses[i]), str(self.sizes[i]),
+                         self.epochs[i], values[self.request_times[i]])
+
+    def records(self) -> Iterator[LogRecord]:
+        """Yield every entry in the batch, in order, as LogRecords."""
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def lines(self) -> Iterator[LogLine]:
+        """Yield every entry in the batch, in order, as LogLines."""
+        values = self.strings.values
+        for i in range(len(self)):
+            yield LogLine(values[self.ip_addresses[i]],
+                          values[self.usernames[i]],
+                          values[self.timestamps[i]], values[self.verbs[i]],
+                          values[self.paths[i]], values[self.versions[i]],
+                          str(self.statuses[i]), str(self.sizes[i]),
+                          values[self.request_times[i]])
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
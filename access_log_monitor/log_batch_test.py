@@ -0,0 +1,76 @@
+import pickle
+
+from .log_batch import LogBatch
+from .log_line import LogLine
+from .log_summary import LogSummary
+
+
+def sample_entries(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        return [LogLine.from_log_line(line) for line in sample_log]
+
+
+def test_from_entries_stores_columns(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    batch = LogBatch.from_entries(entries + [None])
+
+    assert len(batch) == 10
+    assert batch.epochs[0] == 1536636589
+    assert list(batch.statuses[:3]) == [201, 200, 201]
+    assert list(batch.sizes[:3]) == [214, 402, 219]
+    assert batch.string_column("sections")[:3] == ["pages", "api", "settings"]
+    assert batch.string_column("usernames") == [e.username for e in entries]
+
+
+def test_string_columns_are_interned(sample_log_path):
+    batch = LogBatch.from_entries(sample_entries(sample_log_path))
+    assert len(set(batch.ip_addresses)) == 1
+    assert len(batch.strings.values) < 5 * len(batch)
+
+
+def test_records_reproduce_entries(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    batch = LogBatch.from_entries(entries)
+
+    for entry, record in zip(entries, batch.records()):
+        assert record.ip_address == entry.ip_address
+        assert record.username == entry.username
+        assert record.timestamp == entry.timestamp
+        assert record.path == entry.path
+        assert record.status == entry.status
+        assert record.size == entry.size
+        assert record.site_section == entry.site_section
+
+
+def test_lines_reproduce_entries(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    assert list(LogBatch.from_entries(entries).lines()) == entries
+
+
+def test_extend_remaps_string_ids(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    batch = LogBatch.from_entries(entries[5:])
+    batch.extend(LogBatch.from_entries(entries[:5]))
+
+    expected = [e.path for e in entries[5:] + entries[:5]]
+    assert batch.string_column("paths") == expected
+
+
+def test_batches_survive_pickling(sample_log_path):
+    batch = LogBatch.from_entries(sample_entries(sample_log_path))
+    unpickled = pickle.loads(pickle.dumps(batch))
+
+    assert list(unpickled.epochs) == list(batch.epochs)
+    assert unpickled.string_column("paths") == batch.string_column("paths")
+    assert unpickled.strings.id_of("/report") == len(batch.strings.values)
+
+
+def test_summary_of_batch_matches_summary_of_entries(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    from_batch = LogSummary.of(LogBatch.from_entries(entries))
+    from_entries = LogSummary.of(entries)
+
+    assert from_batch.hits == from_entries.hits
+    assert from_batch.status_classes == from_entries.status_classes
+    assert from_batch.sections == from_entries.sections
+    assert from_batch.bytes == from_entries.bytes
@@ -0,0 +1,282 @@
+from collections import defaultdict
+from typing import (Any, Dict, FrozenSet, Iterable, Iterator, List, Optional,
+                    Tuple)
+
+from .log_aggregates import AggregateFactories
+from .log_batch import LogBatch
+from .log_line import LogRecord
+from .log_summary import LogSummary
+
+# Fields with a bitmap per distinct value
+INDEXED_FIELDS = ("status_class", "section", "verb", "username")
+
+
+def popcount(bitmap: int) -> int:
+    """The number of set bits in the non-negative int `bitmap`."""
+    return bin(bitmap).count("1")
+
+
+# int.bit_count is much faster, where available (Python 3.10+)
+popcount = getattr(int, "bit_count", popcount)
+
+
+def bitmap_of(positions: List[int]) -> int:
+    """An int with the bits at each of the given `positions` set."""
+    if len(positions) < 8:
+        bitmap = 0
+        for position in positions:
+            bitmap |= 1 << position
+        return bitmap
+
+    bits = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def set_bits(bitmap: int) -> Iterator[int]:
+    """Yield the positions of the set bits of `bitmap`, lowest first."""
+    for position, bit in enumerate(reversed(bin(bitmap)[2:])):
+        if bit == "1":
+            yield position
+
+
+class BitmapChunk:
+    """
+    A run of up to `capacity` consecutive log entries, kept as a LogBatch,
+    with a bitmap over the chunk's row numbers for every distinct value of
+    each indexed field, and for every epoch second. Bitmaps are Python ints,
+    so intersections and popcounts run in C.
+    """
+
+    __slots__ = ("capacity", "batch", "bitmaps", "seconds", "second_bytes",
+                 "oldest", "latest")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.batch = LogBatch()
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            field: {}
+            for field in INDEXED_FIELDS
+        }
+        self.seconds: Dict[int, int] = {}
+        self.second_bytes: Dict[int, int] = defaultdict(int)
+        self.oldest: Optional[int] = None
+        self.latest: Optional[int] = None
+
+    @property
+    def room(self) -> int:
+        """The number of entries that can still be added to the chunk."""
+        return self.capacity - len(self.batch)
+
+    def extend(self, batch: LogBatch) -> "BitmapChunk":
+        """
+        Append the entries of `batch`, which must fit, and index them: group
+        the new row numbers by value, then OR each group's bitmap into the
+        value's bitmap.
+        """
+        first = len(self.batch)
+        self.batch.extend(batch)
+
+        values = batch.strings.values
+        columns = {
+            "status_class": [str(status)[:1] for status in batch.statuses],
+            "section": [values[i] for i in batch.sections],
+            "verb": [values[i] for i in batch.verbs],
+            "username": [values[i] for i in batch.usernames],
+        }
+        for field, column in columns.items():
+            self.__index(self.bitmaps[field], column, first)
+        self.__index(self.seconds, batch.epochs, first)
+
+        for epoch, size in zip(batch.epochs, batch.sizes):
+            self.second_bytes[epoch] += size
+        if len(batch):
+            oldest, latest = min(batch.epochs), max(batch.epochs)
+            if self.oldest is None or oldest < self.oldest:
+                self.oldest = oldest
+            if self.latest is None or latest > self.latest:
+                self.latest = latest
+
+        return self
+
+    def mask_since(self, since: int) -> int:
+        """The bitmap of rows logged from the epoch second `since` onward."""
+        if self.oldest is None or self.latest is None or self.latest < since:
+            return 0
+        if self.oldest >= since:
+            return (1 << len(self.batch)) - 1
+
+        mask = 0
+        for epoch, bitmap in self.seconds.items():
+            if epoch >= since:
+                mask |= bitmap
+        return mask
+
+    def bytes_since(self, since: int) -> int:
+        """The bytes served from the epoch second `since` onward."""
+        return sum(size for epoch, size in self.second_bytes.items()
+                   if epoch >= since)
+
+    def matching(self, mask: int, filters: Dict[str, FrozenSet[str]]) -> int:
+        """
+        Narrow the row bitmap `mask` to the rows with one of the accepted
+        values for every field in the normalized `filters`.
+        """
+        for field, accepted in filters.items():
+            if not mask:
+                return 0
+            bitmaps = self.bitmaps[field]
+            field_mask = 0
+            for value in accepted:
+                field_mask |= bitmaps.get(value, 0)
+            mask &= field_mask
+        return mask
+
+    @staticmethod
+    def __index(bitmaps: Dict[Any, int], column: Iterable,
+                first: int) -> None:
+        """
+        Internal. OR the row numbers, offset by `first`, of each value in
+        `column` into that value's bitmap in `bitmaps`.
+        """
+        positions: Dict[Any, List[int]] = defaultdict(list)
+        for row, value in enumerate(column, first):
+            positions[value].append(row)
+        for value, rows in positions.items():
+            bitmaps[value] = bitmaps.get(value, 0) | bitmap_of(rows)
+
+
+class LogBitmaps:
+    """
+    A data structure designed to hold log entries in fixed-capacity chunks,
+    each indexed by a bitmap per distinct value of the status class, site
+    section, verb and username (see BitmapChunk).
+
+    A filtered count, like "5xx responses for the api section in the last 10
+    minutes", is a handful of bitmap ANDs and a popcount per chunk, with no
+    per-entry work. Chunks wholly inside the queried window use an all-ones
+    time mask; at most a few chunks straddling its start need the per-second
+    bitmaps.
+
+    If `retention_sec` is given, chunks whose entries are all more than
+    `retention_sec` seconds older than the latest entry are discarded.
+    """
+
+    def __init__(self,
+                 retention_sec: Optional[int] = None,
+                 chunk_size: int = 1 << 16) -> None:
+        self.retention_sec = retention_sec
+        self.chunk_size = chunk_size
+        self.chunks: List[BitmapChunk] = []
+        self.latest: Optional[int] = None
+
+    def extend(self, batch: LogBatch) -> "LogBitmaps":
+        """
+        Append the entries of `batch`, sorted by time, filling the latest
+        chunk before starting another.
+        """
+        batch = batch.sorted()
+        start = 0
+        while start < len(batch):
+            if not self.chunks or not self.chunks[-1].room:
+                self.chunks.append(BitmapChunk(self.chunk_size))
+            chunk = self.chunks[-1]
+            stop = min(len(batch), start + chunk.room)
+            chunk.extend(batch.slice(start, stop))
+            start = stop
+
+        if len(batch):
+            latest = batch.epochs[-1]
+            if self.latest is None or latest > self.latest:
+                self.latest = latest
+            if self.retention_sec is not None:
+                self.expire(before=self.latest - self.retention_sec)
+
+        return self
+
+    def expire(self, before: int) -> None:
+        """
+        Discard every chunk holding only entries logged before the epoch
+        second `before`.
+        """
+        self.chunks = [
+            chunk for chunk in self.chunks
+            if chunk.latest is not None and chunk.latest >= before
+        ]
+
+    def count(self,
+              since: int,
+              filters: Optional[Dict[str, FrozenSet[str]]] = None) -> int:
+        """
+        Count the entries from the epoch second `since` onward with one of the
+        accepted values for every field in the normalized `filters`.
+        """
+        hits = 0
+        for chunk, mask in self.__masks_since(since):
+            if filters:
+                mask = chunk.matching(mask, filters)
+            hits += popcount(mask)
+        return hits
+
+    def summarize(self,
+                  since: int,
+                  aggregates: Optional[AggregateFactories] = None
+                  ) -> LogSummary:
+        """
+        Summarize the entries from the epoch second `since` onward by
+        popcounts of the intersections of the status class and section
+        bitmaps. Entries are only materialized, as LogRecords, if there are
+        `aggregates` to feed.
+        """
+        summary = LogSummary(aggregates)
+        for chunk, mask in self.__masks_since(since):
+            summary.hits += popcount(mask)
+            summary.bytes += chunk.bytes_since(since)
+            status_sections: Dict[Tuple[str, str], int] = {}
+            bitmaps = chunk.bitmaps
+            for status_class, statuses in bitmaps["status_class"].items():
+                statuses &= mask
+                if not statuses:
+                    continue
+                for section, sections in bitmaps["section"].items():
+                    hits = popcount(statuses & sections)
+                    if hits:
+                        status_sections[status_class, section] = hits
+            summary.count_pairs(status_sections)
+            if summary.extras:
+                for row in set_bits(mask):
+                    record = chunk.batch.record(row)
+                    for extra in summary.extras.values():
+                        extra.add(record)
+        return summary
+
+    def records(self, since: int) -> Iterator[LogRecord]:
+        """
+        Yield the entries from the epoch second `since` onward, in the order
+        they were added, as LogRecords.
+        """
+        for chunk, mask in self.__masks_since(since):
+            for row in set_bits(mask):
+                yield chunk.batch.record(row)
+
+    def per_second_hits(self) -> List[Tuple[int, int]]:
+        """(epoch second, hits) pairs for every second with entries."""
+        hits: Dict[int, int] = defaultdict(int)
+        for chunk in self.chunks:
+            for epoch, bitmap in chunk.seconds.items():
+                hits[epoch] += popcount(bitmap)
+        return sorted(hits.items())
+
+    def __masks_since(self, since: int) -> Iterator[Tuple[BitmapChunk, int]]:
+        """
+        Internal. Yield each chunk holding entries from the epoch second
+        `since` onward, with the bitmap of those entries.
+        """
+        for chunk in self.chunks:
+            mask = chunk.mask_since(since)
+            if mask:
+                yield chunk, mask
+
+    def __len__(self):
+        return sum(len(chunk.batch) for chunk in self.chunks)
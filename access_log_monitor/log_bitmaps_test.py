@@ -0,0 +1,72 @@
+from .log_aggregates import TopN
+from .log_batch import LogBatch
+from .log_bitmaps import LogBitmaps, bitmap_of, popcount, set_bits
+from .log_filters import normalize
+from .log_line import LogLine
+
+
+def entry(second, status="200", path="/api/user", username="jill"):
+    timestamp = f"11/Sep/2018:03:{second // 60:02}:{second % 60:02} +0000"
+    return LogLine(
+        username=username,
+        timestamp=timestamp.replace(":", " ", 1),
+        verb="GET",
+        path=path,
+        status=status,
+        size="10")
+
+
+def test_bitmap_helpers_agree():
+    positions = [0, 3, 64, 65, 1000, 1001, 1002, 1003, 4095]
+    assert list(set_bits(bitmap_of(positions))) == positions
+    assert list(set_bits(bitmap_of(positions[:3]))) == positions[:3]
+    assert popcount(bitmap_of(positions)) == len(positions)
+
+
+def test_filtered_counts_span_chunks():
+    bitmaps = LogBitmaps(chunk_size=4)
+    entries = [
+        entry(second, status="500" if second % 3 == 0 else "200")
+        for second in range(10)
+    ]
+    bitmaps.extend(LogBatch.from_entries(reversed(entries)))
+    first = entries[0]
+    since = int(LogBatch.from_entries([first]).epochs[0])
+
+    assert len(bitmaps.chunks) == 3
+    assert bitmaps.count(since) == 10
+    assert bitmaps.count(since + 5) == 5
+    assert bitmaps.count(since, normalize({"status_class": "5"})) == 4
+    assert bitmaps.count(since + 5, normalize({"status_class": "5"})) == 2
+    assert bitmaps.count(since, normalize({"section": "pages"})) == 0
+
+
+def test_summarize_matches_summary_of_entries():
+    entries = [
+        entry(1, status="404", path="/pages/create"),
+        entry(1, username="mary"),
+        entry(2, status="500", path="/pages/edit"),
+        entry(3, status="301"),
+    ]
+    bitmaps = LogBitmaps(chunk_size=3).extend(LogBatch.from_entries(entries))
+    since = int(LogBatch.from_entries(entries).epochs[0])
+    aggregates = {"top_users": lambda: TopN("username", n=1)}
+
+    summary = bitmaps.summarize(since + 1, aggregates)
+    assert summary.hits == 2
+    assert summary.bytes == 20
+    assert summary.status_classes == {"5": 1, "3": 1}
+    assert summary.sections == {"pages": 1, "api": 1}
+    assert summary.extras["top_users"].value == [("jill", 2)]
+    assert [record.status for record in bitmaps.records(since)] == [
+        "404", "200", "500", "301"
+    ]
+
+
+def test_retention_discards_whole_chunks():
+    bitmaps = LogBitmaps(retention_sec=5, chunk_size=4)
+    entries = [entry(second) for second in range(20)]
+    bitmaps.extend(LogBatch.from_entries(entries))
+
+    assert len(bitmaps) == 8
+    assert bitmaps.per_second_hits()[0][1] == 1
@@ -0,0 +1,235 @@
+from collections import Counter
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from .log_aggregates import AggregateFactories
+from .log_summary import LogSummary
+
+
+class LogBuckets:
+    """
+    A data structure designed to hold aggregated log entries in per-second
+    buckets spanning the most recent `window_sec` seconds.
+
+    Uses a fixed-size circular array indexed by epoch second, so adding an
+    entry costs O(1) and summarizing a window costs O(seconds in the window),
+    regardless of request volume. Memory is bounded by the window length.
+    Entries older than the window are discarded.
+
+    Buckets may instead each span `resolution_sec` seconds, aligned to
+    multiples of `resolution_sec` since the epoch; a window then costs
+    O(window_sec / resolution_sec). Queries for a time within a bucket count
+    the whole bucket. If `max_sections` is given, each bucket keeps counts
+    for only that many of its most popular sections once a later bucket has
+    been started.
+
+    Each bucket also keeps an instance of every aggregate in `aggregates`.
+    Aggregates registered after a bucket was created are absent from it.
+    """
+
+    def __init__(self,
+                 window_sec: int,
+                 aggregates: Optional[AggregateFactories] = None,
+                 resolution_sec: int = 1,
+                 max_sections: Optional[int] = None) -> None:
+        self.aggregates = aggregates if aggregates is not None else {}
+        self.resolution_sec = resolution_sec
+        self.max_sections = max_sections
+        self.size = window_sec // resolution_sec + 1
+        # The bucket number (epoch second // resolution_sec) held by each slot
+        self.seconds: List[Optional[int]] = [None] * self.size
+        self.summaries: List[Optional[LogSummary]] = [None] * self.size
+        self.latest: Optional[int] = None
+
+    def add(self, epoch: int, entry) -> "LogBuckets":
+        """
+        Add a log entry logged at the epoch second `epoch` to the bucket for
+        that second, evicting whatever the bucket previously held if it was
+        for an earlier second.
+        """
+        bucket = self.__bucket(epoch)
+        if bucket is not None:
+            bucket.add(entry)
+        return self
+
+    def merge(self, epoch: int, summary: LogSummary) -> "LogBuckets":
+        """
+        Fold `summary`, a LogSummary of entries logged at the epoch second
+        `epoch`, into the bucket for that second in a single operation.
+        """
+        bucket = self.__bucket(epoch)
+        if bucket is not None:
+            bucket.merge(summary)
+        return self
+
+    @property
+    def oldest(self) -> Optional[int]:
+        """
+        The first epoch second of the oldest bucket the window can still
+        hold, or None if nothing has been added.
+        """
+        if self.latest is None:
+            return None
+        return (self.latest - self.size + 1) * self.resolution_sec
+
+    def summarize(self, since: int, until: Optional[int] = None) -> LogSummary:
+        """
+        Merge the buckets for every second from the epoch second `since`
+        onward (and before the second `until`, if given), newest first, into
+        a single LogSummary.
+        """
+        summary = LogSummary(self.aggregates)
+        for bucket in self.__buckets_since(since, until):
+            summary.merge(bucket)
+        return summary
+
+    def count(self, since: int, until: Optional[int] = None) -> int:
+        """
+        Count the entries from the epoch second `since` onward (and before the
+        second `until`, if given).
+        """
+        return sum(
+            bucket.hits for bucket in self.__buckets_since(since, until))
+
+    def count_matching(self,
+                       since: int,
+                       filters: Dict[str, FrozenSet[str]],
+                       until: Optional[int] = None) -> int:
+        """
+        Count the entries from the epoch second `since` onward (and before the
+        second `until`, if given) matching every one of the normalized
+        `filters`, which may be on status class and section only (see
+        LogSummary.count_matching).
+        """
+        return sum(bucket.count_matching(filters)
+                   for bucket in self.__buckets_since(since, until))
+
+    def buckets(self,
+                since: int,
+                until: Optional[int] = None
+                ) -> Iterator[Tuple[int, LogSummary]]:
+        """
+        Yield (epoch second, LogSummary) pairs for the live buckets for every
+        second from the epoch second `since` onward (and before `until`, if
+        given), oldest first, each at its first second.
+        """
+        for number in reversed(self.__numbers_since(since, until)):
+            slot = number % self.size
+            if self.seconds[slot] == number:
+                yield (number * self.resolution_sec,
+                       self.summaries[slot])  # type: ignore
+
+    def per_second_hits(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (epoch second, hits) pairs for every live bucket, counting each
+        bucket's hits at its first second.
+        """
+        if self.latest is None:
+            return
+
+        for number in range(self.latest - self.size + 1, self.latest + 1):
+            slot = number % self.size
+            if self.seconds[slot] == number:
+                yield (number * self.resolution_sec,
+                       self.summaries[slot].hits)  # type: ignore
+
+    def snapshot(self) -> list:
+        """
+        The live buckets as plain data, for checkpoints (see log_checkpoint):
+        an [epoch second, LogSummary snapshot] pair per bucket, oldest first.
+        """
+        if self.latest is None:
+            return []
+
+        return [[number * self.resolution_sec,
+                 self.summaries[number % self.size].snapshot()]  # type: ignore
+                for number in range(self.latest - self.size + 1,
+                                    self.latest + 1)
+                if self.seconds[number % self.size] == number]
+
+    def restore(self, snapshot: list) -> "LogBuckets":
+        """
+        Merge the buckets of `snapshot` into the window. Buckets that have
+        since fallen out of the window are discarded, as on `merge`; those
+        restored into empty buckets replace them rather than being merged.
+        """
+        for epoch, state in snapshot:
+            bucket = self.__bucket(epoch)
+            if bucket is None:
+                continue
+            summary = LogSummary.from_snapshot(state, self.aggregates)
+            if bucket.hits:
+                bucket.merge(summary)
+            else:
+                slot = (epoch // self.resolution_sec) % self.size
+                self.summaries[slot] = summary
+        return self
+
+    def __bucket(self, epoch: int) -> Optional[LogSummary]:
+        """
+        Internal. Return the bucket for the epoch second `epoch`, evicting
+        whatever the slot previously held if it was for an earlier bucket.
+        Returns None if `epoch` has already fallen out of the window.
+        """
+        number = epoch // self.resolution_sec
+        if self.latest is not None and number <= self.latest - self.size:
+            return None
+
+        slot = number % self.size
+        if self.seconds[slot] != number:
+            self.seconds[slot] = number
+            self.summaries[slot] = LogSummary(self.aggregates)
+
+        if self.latest is None or number > self.latest:
+            if self.max_sections is not None and self.latest is not None:
+                self.__trim(self.latest)
+            self.latest = number
+
+        return self.summaries[slot]
+
+    def __trim(self, number: int) -> None:
+        """
+        Internal. Drop all but the `max_sections` most popular sections from
+        the bucket `number`, if it is live, from its per-section and per-pair
+        counts alike.
+        """
+        slot = number % self.size
+        summary = self.summaries[slot]
+        if (self.seconds[slot] == number and summary is not None
+                and len(summary.sections) > self.max_sections):  # type: ignore
+            summary.sections = Counter(
+                dict(summary.sections.most_common(self.max_sections)))
+            summary.status_sections = Counter({
+                pair: hits
+                for pair, hits in summary.status_sections.items()
+                if pair[1] in summary.sections
+            })
+
+    def __buckets_since(self, since: int,
+                        until: Optional[int] = None) -> Iterator[LogSummary]:
+        """
+        Internal. Yield the live buckets for every second from the epoch
+        second `since` onward (and before `until`, if given), newest first.
+        """
+        for number in self.__numbers_since(since, until):
+            slot = number % self.size
+            if self.seconds[slot] == number:
+                yield self.summaries[slot]  # type: ignore
+
+    def __numbers_since(self, since: int,
+                        until: Optional[int] = None) -> range:
+        """
+        Internal. The numbers of the buckets the window can hold for every
+        second from the epoch second `since` onward (and before `until`, if
+        given), newest first.
+        """
+        if self.latest is None:
+            return range(0)
+
+        newest = self.latest
+        if until is not None:
+            newest = min(newest, (until - 1) // self.resolution_sec)
+        oldest = max(since // self.resolution_sec, self.latest - self.size + 1)
+        return range(newest, oldest - 1, -1)
+
+    def __len__(self):
+        return self.count(since=0)
@@ -0,0 +1,56 @@
+from .log_buckets import LogBuckets
+from .log_line import LogLine
+
+
+def entry(status="200", path="/pages/create"):
+    return LogLine(path=path, status=status, size="100")
+
+
+def test_summarize_aggregates_entries_since_given_second():
+    buckets = (LogBuckets(window_sec=60)
+               .add(1000, entry())
+               .add(1000, entry(status="404"))
+               .add(1001, entry(path="/api/user"))
+               .add(1010, entry(status="500")))  # yapf: disable
+
+    summary = buckets.summarize(since=1001)
+    assert summary.hits == 2
+    assert summary.status_classes == {"2": 1, "5": 1}
+    assert summary.sections == {"pages": 1, "api": 1}
+
+    assert buckets.summarize(since=0).hits == 4
+    assert buckets.summarize(since=1011).hits == 0
+
+
+def test_count_counts_entries_since_given_second():
+    buckets = LogBuckets(window_sec=60).add(1000, entry()).add(1005, entry())
+    assert buckets.count(since=1000) == 2
+    assert buckets.count(since=1001) == 1
+    assert len(buckets) == 2
+
+
+def test_add_accepts_out_of_order_entries_within_window():
+    buckets = LogBuckets(window_sec=60).add(1005, entry()).add(1000, entry())
+    assert buckets.count(since=1000) == 2
+
+
+def test_entries_older_than_window_are_discarded():
+    buckets = LogBuckets(window_sec=10).add(1000, entry()).add(1010, entry())
+    assert len(buckets) == 2
+
+    # reuses the slot for second 1000
+    buckets.add(1011, entry())
+    assert len(buckets) == 2
+    assert buckets.count(since=0) == 2
+
+    # too old to record
+    buckets.add(1000, entry())
+    assert len(buckets) == 2
+
+
+def test_memory_is_bounded_by_window_length():
+    buckets = LogBuckets(window_sec=10)
+    for second in range(1000):
+        buckets.add(second, entry())
+    assert len(buckets.summaries) == 11
+    assert len(buckets) == 11
@@ -0,0 +1,224 @@
+import os
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+
+# A checkpoint file is MAGIC, a version byte, the encoded state and a CRC-32
+# of everything before it
+MAGIC = b"ALMC"
+VERSION = 1
+
+# Type tags of encoded values
+NONE, FALSE, TRUE, INT, FLOAT, STR, BYTES, LIST, DICT = range(9)
+
+FLOAT_FORMAT = struct.Struct("<d")
+CRC_FORMAT = struct.Struct("<I")
+
+
+class CheckpointEncoder:
+    """
+    Encodes plain data (None, bools, ints, floats, strings, bytes, and lists,
+    tuples and dicts of them) compactly: each value is a one-byte type tag
+    followed by its payload, integers (and lengths) are zigzag varints, and
+    every distinct string is written once, to a table preceding the values,
+    and referred to by its index thereafter.
+
+    Section names, statuses and the like recur in every time bucket, so the
+    string table keeps the state of a window to a few bytes per bucket.
+    """
+
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.body = bytearray()
+
+    def encode(self, value: Any) -> bytes:
+        """Return the string table and the encoding of `value`."""
+        self.__value(value)
+        table = bytearray()
+        write_varint(table, len(self.strings))
+        for string in self.strings:
+            encoded = string.encode("utf-8")
+            write_varint(table, len(encoded))
+            table += encoded
+        return bytes(table + self.body)
+
+    def __value(self, value: Any) -> None:
+        """Internal. Append the tag and payload of `value` to the body."""
+        body = self.body
+        if value is None:
+            body.append(NONE)
+        elif value is True or value is False:
+            body.append(TRUE if value else FALSE)
+        elif isinstance(value, int):
+            body.append(INT)
+            write_varint(body, value)
+        elif isinstance(value, float):
+            body.append(FLOAT)
+            body += FLOAT_FORMAT.pack(value)
+        elif isinstance(value, str):
+            body.append(STR)
+            write_varint(body, self.strings.setdefault(value,
+                                                       len(self.strings)))
+        elif isinstance(value, (bytes, bytearray)):
+            body.append(BYTES)
+            write_varint(body, len(value))
+            body += value
+        elif isinstance(value, (list, tuple)):
+            body.append(LIST)
+            write_varint(body, len(value))
+            for item in value:
+                self.__value(item)
+        elif isinstance(value, dict):
+            body.append(DICT)
+            write_varint(body, len(value))
+            for key, item in value.items():
+                self.__value(key)
+                self.__value(item)
+        else:
+            raise TypeError(f"Cannot checkpoint {type(value).__name__}")
+
+
+class CheckpointDecoder:
+    """
+    Decodes values encoded by a CheckpointEncoder from `data`. Tuples are
+    decoded as lists. Raises ValueError if `data` is malformed.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+        self.strings: List[str] = []
+
+    def decode(self) -> Any:
+        """Return the value encoded in the data."""
+        try:
+            for _ in range(self.__varint()):
+                length = self.__varint()
+                self.strings.append(self.__bytes(length).decode("utf-8"))
+            value = self.__value()
+        except (IndexError, UnicodeDecodeError, struct.error) as err:
+            raise ValueError(f"Malformed checkpoint: {err}") from err
+        if self.position != len(self.data):
+            raise ValueError("Malformed checkpoint: trailing data")
+        return value
+
+    def __value(self) -> Any:
+        """Internal. Decode the value at the current position."""
+        data, position = self.data, self.position
+        tag = data[position]
+        if tag == INT and data[position + 1] < 0x80:
+            # most integers are small enough for a single byte
+            byte = data[position + 1]
+            self.position = position + 2
+            return (byte >> 1) ^ -(byte & 1)
+        self.position = position + 1
+        if tag == NONE:
+            return None
+        if tag in (FALSE, TRUE):
+            return tag == TRUE
+        if tag == INT:
+            return self.__varint()
+        if tag == FLOAT:
+            return FLOAT_FORMAT.unpack(self.__bytes(FLOAT_FORMAT.size))[0]
+        if tag == STR:
+            return self.strings[self.__varint()]
+        if tag == BYTES:
+            return self.__bytes(self.__varint())
+        if tag == LIST:
+            return [self.__value() for _ in range(self.__varint())]
+        if tag == DICT:
+            value = {}
+            for _ in range(self.__varint()):
+                key = self.__value()
+                value[key] = self.__value()
+            return value
+        raise ValueError(f"Malformed checkpoint: unknown tag {tag}")
+
+    def __varint(self) -> int:
+        """Internal. Decode the zigzag varint at the current position."""
+        result = shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return (result >> 1) ^ -(result & 1)
+            shift += 7
+
+    def __bytes(self, length: int) -> bytes:
+        """Internal. The next `length` bytes."""
+        end = self.position + length
+        if end > len(self.data):
+            raise IndexError("truncated")
+        chunk = self.data[self.position:end]
+        self.position = end
+        return bytes(chunk)
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """
+    Append the (signed) integer `value` to `buffer` as a zigzag varint: 7
+    bits per byte, low bits first, so small magnitudes take a single byte.
+    """
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def encode(state: Any) -> bytes:
+    """Encode the plain data `state` as a checkpoint."""
+    data = MAGIC + bytes([VERSION]) + CheckpointEncoder().encode(state)
+    return data + CRC_FORMAT.pack(zlib.crc32(data))
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode the checkpoint `data`. Raises ValueError if it is not a checkpoint
+    of this version, or has been corrupted or truncated.
+    """
+    header = len(MAGIC) + 1
+    if len(data) < header + CRC_FORMAT.size or not data.startswith(MAGIC):
+        raise ValueError("Not a checkpoint")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {data[len(MAGIC)]}")
+    payload, crc = data[:-CRC_FORMAT.size], data[-CRC_FORMAT.size:]
+    if zlib.crc32(payload) != CRC_FORMAT.unpack(crc)[0]:
+        raise ValueError("Corrupt checkpoint: checksum mismatch")
+    return CheckpointDecoder(payload[header:]).decode()
+
+
+def write_checkpoint(path: str, state: Any) -> int:
+    """
+    Atomically replace the file at `path` with a checkpoint of `state`: the
+    checkpoint is written and fsynced to a temporary file alongside it, then
+    renamed over it, so that a crash mid-write leaves the previous checkpoint
+    intact. Return the checkpoint's size in bytes.
+    """
+    data = encode(state)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as checkpoint:
+        checkpoint.write(data)
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+    os.replace(temporary, path)
+
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+    return len(data)
+
+
+def read_checkpoint(path: str) -> Optional[Any]:
+    """
+    Return the state checkpointed at `path`, or None if there is no
+    checkpoint there. Raises ValueError if the checkpoint is unreadable.
+    """
+    try:
+        with open(path, "rb") as checkpoint:
+            return decode(checkpoint.read())
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from .log_checkpoint import decode, encode, read_checkpoint, write_checkpoint
+
+
+def test_plain_data_round_trips():
+    state = {
+        "logs": {"/var/log/access.log": [64_768, 2**40, 0, b"200 12\n"]},
+        "stores": [[1_536_636_589, [3, -1, 0.25, None, True, False]]],
+        "": ("tuples", "become", "lists"),
+    }
+
+    assert decode(encode(state)) == {
+        "logs": {"/var/log/access.log": [64_768, 2**40, 0, b"200 12\n"]},
+        "stores": [[1_536_636_589, [3, -1, 0.25, None, True, False]]],
+        "": ["tuples", "become", "lists"],
+    }
+
+
+def test_strings_are_written_once():
+    buckets = [{"pages": 1, "api": 2, "report": 3}] * 50
+
+    # each further bucket costs 2 bytes of tag and length, then 2 bytes of
+    # tag and string index and 2 of tag and count per section
+    assert len(encode(buckets)) - len(encode(buckets[:1])) == 49 * 14
+
+
+def test_decode_rejects_foreign_corrupt_and_truncated_data():
+    data = encode({"offset": 1_024})
+
+    with pytest.raises(ValueError, match="Not a checkpoint"):
+        decode(b"line 1\nline 2\n")
+    with pytest.raises(ValueError, match="version"):
+        decode(data[:4] + bytes([99]) + data[5:])
+    with pytest.raises(ValueError, match="checksum"):
+        decode(data[:-5] + bytes([data[-5] ^ 1]) + data[-4:])
+    with pytest.raises(ValueError, match="checksum"):
+        decode(data[:-6] + data[-4:])
+    with pytest.raises(TypeError):
+        encode({"since": object()})
+
+
+def test_write_checkpoint_replaces_the_checkpoint_atomically(tmp_path):
+    path = str(tmp_path / "monitor.ckpt")
+    assert read_checkpoint(path) is None
+
+    write_checkpoint(path, {"offset": 1})
+    size = write_checkpoint(path, {"offset": 2})
+
+    assert read_checkpoint(path) == {"offset": 2}
+    assert os.path.getsize(path) == size
+    assert os.listdir(tmp_path) == ["monitor.ckpt"]
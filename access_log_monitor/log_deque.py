@@ -1,8 +1,11 @@
+import heapq
 from collections import deque
 from datetime import datetime
-from typing import Optional
+from itertools import islice
+from operator import itemgetter
+from typing import Iterator, List, Optional, Tuple
 
-from .log_line import LogLine
+from .log_line import Entry
 
 
 class LogDeque:
@@ -11,12 +14,15 @@ class LogDeque:
     from newest to oldest in left-to-right fashion.
 
     Uses a bounded-length deque for efficient inserting and memory consumption.
+    Pass `maxlen=None` for an unbounded deque.
     """
 
-    def __init__(self, entries: Optional[list] = None) -> None:
-        self.entries: deque = deque(entries or [], maxlen=10_000)
+    def __init__(self,
+                 entries: Optional[list] = None,
+                 maxlen: Optional[int] = 10_000) -> None:
+        self.entries: deque = deque(entries or [], maxlen=maxlen)
 
-    def add(self, timestamp: datetime, entry: LogLine):
+    def add(self, timestamp: datetime, entry: Entry):
         """
         Add a log entry with timestamp `timestamp` to the LogDeque.
         Inserts in chronological order from latest to oldest.
@@ -33,25 +39,57 @@ class LogDeque:
                 break
             curr_entry_time, _ = self.entries[i]
 
+        if len(self.entries) == self.entries.maxlen:
+            if i == len(self.entries):
+                return self
+            self.entries.pop()
+
         self.entries.insert(i, (timestamp, entry))
         return self
 
+    def add_many(self, entries: List[Tuple[datetime, Entry]]) -> "LogDeque":
+        """
+        Merge the (timestamp, entry) pairs `entries`, already ordered from
+        latest to oldest, into the LogDeque in a single pass.
+
+        A batch no older than the current latest entry (the common case when
+        tailing a log) is prepended in one operation; otherwise the batch and
+        the existing entries are merged. Either way, once the deque is full
+        the oldest entries are discarded.
+        """
+        if not entries:
+            return self
+
+        oldest_added, _ = entries[-1]
+        if not self.entries or oldest_added >= self.entries[0][0]:
+            self.entries.extendleft(reversed(entries))
+            return self
+
+        maxlen = self.entries.maxlen
+        merged = heapq.merge(entries,
+                             self.entries,
+                             key=itemgetter(0),
+                             reverse=True)
+        self.entries = deque(islice(merged, maxlen), maxlen=maxlen)
+        return self
+
     def peek(self, since_time: datetime) -> list:
         """
         Return all entries added to the LogDeque since the given time
         `since_time`. Exploits the latest-to-oldest ordering of entries to
         avoid unnecessary iteration.
         """
-        peeked_entries: deque = deque()
+        return list(self.iter_since(since_time))
 
+    def iter_since(self, since_time: datetime) -> Iterator:
+        """
+        Lazily yield all entries added to the LogDeque since the given time
+        `since_time`, latest first, without copying them.
+        """
         for timestamp, entry in self.entries:
-            entry_was_on_or_after_requested_time = since_time <= timestamp
-            if entry_was_on_or_after_requested_time:
-                peeked_entries.append(entry)
-            else:
-                break
-
-        return list(peeked_entries)
+            if timestamp < since_time:
+                return
+            yield entry
 
     def __len__(self):
         return len(self.entries)
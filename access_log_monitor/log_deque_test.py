@@ -62,3 +62,35 @@ def test_add_inserts_in_descending_chrono_order_when_inserted_in_mixed_order():
     actual_ordering = [entry for time, entry in store]
     expected_ordering = ["hours ago", "days ago", "years ago", "decades ago"]
     assert actual_ordering == expected_ordering
+
+
+def test_add_to_a_full_deque_discards_the_oldest_entry():
+    store = (LogDeque(maxlen=2)
+             .add(now_utc(year=2010), "years ago")
+             .add(now_utc(day=5), "days ago")
+             .add(now_utc(hour=11), "hours ago")
+             .add(now_utc(year=1990), "decades ago"))  # yapf: disable
+
+    assert [entry for time, entry in store] == ["hours ago", "days ago"]
+
+
+def test_add_many_merges_a_batch_older_than_the_latest_entry():
+    store = LogDeque(maxlen=3).add(now_utc(day=5), "days ago")
+    store.add_many([
+        (now_utc(hour=11), "hours ago"),
+        (now_utc(year=2010), "years ago"),
+        (now_utc(year=1990), "decades ago"),
+    ])
+
+    assert [entry for time, entry in store] == [
+        "hours ago", "days ago", "years ago"
+    ]
+    assert store.entries.maxlen == 3
+
+
+def test_add_many_prepends_a_batch_newer_than_the_latest_entry():
+    store = LogDeque(maxlen=2).add(now_utc(year=2010), "years ago")
+    store.add_many([(now_utc(hour=11), "hours ago"),
+                    (now_utc(day=5), "days ago")])
+
+    assert [entry for time, entry in store] == ["hours ago", "days ago"]
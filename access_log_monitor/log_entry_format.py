@@ -20,6 +20,35 @@ HTTP/(?P<http_version>.+)   # protocol version
 (?P<size>\d+)               # response payload size
 """, re.VERBOSE)
 
+# Equivalent to W3C_ENTRY_FORMAT for well-formed common log format lines, but
+# each field is matched by a class excluding its delimiter (space, `]`, `"`),
+# so matching never backtracks, and fields are separated by single spaces, as
+# the format has them, rather than any whitespace. Also matches an optional
+# trailing request time, in seconds, as logged by nginx's $request_time or
+# Apache's %T.
+CLF_ENTRY_FORMAT = re.compile(r"""
+(?P<ip_address>[^ ]+)       # source ip address
+[ ]-[ ]
+(?P<username>\w+)           # requesting user
+[ ]\[
+(?P<date>[^:\]]+):          # timestamp date
+(?P<time>\d\d:\d\d:\d\d)     # timestamp time
+[ ](?P<offset>[-+]\d{4})     # timestamp utc offset
+\][ ]"
+(?P<verb>[^ "]+)            # http verb
+[ ]
+(?P<path>[^ "]+)            # endpoint path
+[ ]
+HTTP/(?P<http_version>[^"]+) # protocol version
+"[ ]
+(?P<response_status>\d+)    # response status code
+[ ]
+(?P<size>\d+)               # response payload size
+(?:[ ](?P<request_time>\d+(?:\.\d+)?))?  # request time in seconds, if logged
+""", re.VERBOSE)
+
+ENTRY_FORMATS = {"w3c": W3C_ENTRY_FORMAT, "clf": CLF_ENTRY_FORMAT}
+
 TIMESTAMP_FORMAT = "%d/%b/%Y %H:%M:%S %z"
 
 PATH_FORMAT = re.compile(r"^/(?P<base_path>\w+)/?.*$")
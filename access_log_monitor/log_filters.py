@@ -0,0 +1,42 @@
+from typing import Callable, Collection, Dict, FrozenSet, Union
+
+# Filterable fields, and how to read each from a LogLine-like entry
+FILTER_FIELDS: Dict[str, Callable] = {
+    "status_class": lambda entry: entry.status[:1],
+    "section": lambda entry: entry.site_section,
+    "verb": lambda entry: entry.verb,
+    "username": lambda entry: entry.username,
+}
+
+# An accepted value, or collection of accepted values
+FilterValue = Union[str, Collection[str]]
+Filters = Dict[str, FilterValue]
+
+
+def normalize(filters: Filters,
+              fields: Collection[str] = tuple(FILTER_FIELDS)
+              ) -> Dict[str, FrozenSet[str]]:
+    """
+    Return `filters` with every accepted value given as a frozenset.
+
+    Raises ValueError for fields not in `fields`, the fields a store can
+    filter on (by default, all of FILTER_FIELDS).
+    """
+    unknown = set(filters) - set(fields)
+    if unknown:
+        raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))} "
+                         f"(only on {', '.join(sorted(fields))})")
+
+    return {
+        field: frozenset([values] if isinstance(values, str) else values)
+        for field, values in filters.items()
+    }
+
+
+def matches(entry, filters: Dict[str, FrozenSet[str]]) -> bool:
+    """
+    Whether the LogLine-like `entry` has one of the accepted values for every
+    field in the normalized `filters`.
+    """
+    return all(FILTER_FIELDS[field](entry) in values
+               for field, values in filters.items())
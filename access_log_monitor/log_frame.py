@@ -0,0 +1,286 @@
+from typing import (Dict, FrozenSet, Iterator, List, NamedTuple, Optional,
+                    Tuple)
+
+from .log_aggregates import AggregateFactories
+from .log_batch import LogBatch, StringTable
+from .log_summary import LogSummary
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+# Column names and dtypes, in row order
+COLUMNS = (
+    ("epochs", "int64"),
+    ("statuses", "uint16"),
+    ("sections", "uint32"),
+    ("usernames", "uint32"),
+    ("sizes", "uint64"),
+    ("ip_addresses", "uint32"),
+    ("verbs", "uint32"),
+    ("paths", "uint32"),
+    ("request_times", "uint32"),
+)
+NAMES = [name for name, _ in COLUMNS]
+
+# The columns of string ids holding each filterable field but status class
+STRING_FILTER_COLUMNS = {
+    "section": "sections",
+    "verb": "verbs",
+    "username": "usernames",
+}
+
+
+class FrameRow(NamedTuple):
+    """
+    A LogLine-like view of a row of a LogFrame, holding only the fields the
+    frame retains. Used to feed registered aggregates.
+    """
+
+    username: str
+    status: str
+    size: str
+    site_section: str
+    epoch: int
+    ip_address: str
+    verb: str
+    path: str
+    request_time: str
+
+
+class LogFrame:
+    """
+    A data structure designed to hold log entries as parallel NumPy columns
+    (epoch second, status code, section id, username id, bytes, IP address
+    id, verb id, path id, request time id), ordered by epoch second, oldest
+    first. Ids index into the frame's StringTable.
+
+    Columns are growable arrays with amortized doubling, so appends are
+    cheap. Because rows are time-ordered, the rows logged since a given second
+    are a contiguous tail found by binary search (`searchsorted`), and a
+    window is summarized with vectorized reductions (`bincount`, `sum`)
+    rather than a Python loop over entries.
+
+    If `retention_sec` is given, rows more than `retention_sec` seconds older
+    than the latest row are discarded as new rows arrive.
+
+    Raises ImportError if NumPy is not installed.
+    """
+
+    def __init__(self,
+                 retention_sec: Optional[int] = None,
+                 capacity: int = 1024) -> None:
+        if np is None:
+            raise ImportError("LogFrame requires numpy")
+
+        self.retention_sec = retention_sec
+        self.strings = StringTable()
+        self.start = 0
+        self.stop = 0
+        # columns (see COLUMNS)
+        self.epochs: np.ndarray = np.zeros(capacity, dtype="int64")
+        self.statuses: np.ndarray = np.zeros(capacity, dtype="uint16")
+        self.sections: np.ndarray = np.zeros(capacity, dtype="uint32")
+        self.usernames: np.ndarray = np.zeros(capacity, dtype="uint32")
+        self.sizes: np.ndarray = np.zeros(capacity, dtype="uint64")
+        self.ip_addresses: np.ndarray = np.zeros(capacity, dtype="uint32")
+        self.verbs: np.ndarray = np.zeros(capacity, dtype="uint32")
+        self.paths: np.ndarray = np.zeros(capacity, dtype="uint32")
+        self.request_times: np.ndarray = np.zeros(capacity, dtype="uint32")
+
+    def append(self,
+               epoch: int,
+               status: int,
+               section: str,
+               username: str,
+               size: int,
+               ip_address: str = "",
+               verb: str = "",
+               path: str = "",
+               request_time: str = "") -> "LogFrame":
+        """Add a single row, keeping the frame in time order."""
+        id_of = self.strings.id_of
+        row = (epoch, status, id_of(section), id_of(username), size,
+               id_of(ip_address), id_of(verb), id_of(path),
+               id_of(request_time))
+        return self.extend(*(np.array([value], dtype=dtype)
+                             for value, (_, dtype) in zip(row, COLUMNS)))
+
+    def extend_batch(self, batch: LogBatch) -> "LogFrame":
+        """
+        Add every entry of the LogBatch `batch`, remapping its string ids into
+        the frame's StringTable without materializing any entries.
+        """
+        if not len(batch):
+            return self
+
+        remap = np.array([self.strings.id_of(value)
+                          for value in batch.strings.values], dtype="uint32")
+        return self.extend(
+            np.frombuffer(batch.epochs, dtype="int64"),
+            np.frombuffer(batch.statuses, dtype="uint16"),
+            remap[np.frombuffer(batch.sections, dtype="uint32")],
+            remap[np.frombuffer(batch.usernames, dtype="uint32")],
+            np.frombuffer(batch.sizes, dtype="uint64"),
+            *(remap[np.frombuffer(getattr(batch, name), dtype="uint32")]
+              for name in ("ip_addresses", "verbs", "paths",
+                           "request_times")))
+
+    def extend(self, epochs, statuses, sections, usernames, sizes,
+               ip_addresses, verbs, paths, request_times) -> "LogFrame":
+        """
+        Add rows given as equal-length arrays, one per column, in any order.
+        Rows no older than the current latest row are appended; otherwise the
+        overlapping tail of the frame is re-sorted with the new rows. Rows
+        logged in the same second keep the order they were added in.
+        """
+        count = len(epochs)
+        if not count:
+            return self
+
+        new_columns = [epochs, statuses, sections, usernames, sizes,
+                       ip_addresses, verbs, paths, request_times]
+        order = np.argsort(epochs, kind="stable")
+        new_columns = [np.asarray(column)[order] for column in new_columns]
+        oldest_added = new_columns[0][0]
+
+        # Rows from `offset` onward (relative to `start`) are newer than some
+        # of the added rows, and are re-sorted with them.
+        offset = len(self)
+        if offset and oldest_added < self.epochs[self.stop - 1]:
+            offset = int(
+                np.searchsorted(self.live("epochs"), oldest_added,
+                                side="right"))
+        tail = [column[offset:].copy() for column in map(self.live, NAMES)]
+
+        self.__reserve(count)
+        insert_at = self.start + offset
+        if len(tail[0]):
+            merged_epochs = np.concatenate([tail[0], new_columns[0]])
+            order = np.argsort(merged_epochs, kind="stable")
+            new_columns = [
+                np.concatenate([old, new])[order]
+                for old, new in zip(tail, new_columns)
+            ]
+
+        self.stop = insert_at + len(new_columns[0])
+        for name, column in zip(NAMES, new_columns):
+            getattr(self, name)[insert_at:self.stop] = column
+
+        if self.retention_sec is not None:
+            latest = int(self.epochs[self.stop - 1])
+            self.expire(before=latest - self.retention_sec)
+        return self
+
+    def expire(self, before: int) -> None:
+        """Discard every row logged before the epoch second `before`."""
+        self.start = self.index_since(before)
+
+    def index_since(self, since: int) -> int:
+        """The index of the first row logged at or after the epoch `since`."""
+        return self.start + int(
+            np.searchsorted(self.live("epochs"), since, side="left"))
+
+    def live(self, name: str):
+        """A view of the retained rows of the column named `name`."""
+        return getattr(self, name)[self.start:self.stop]
+
+    def count(self, since: int) -> int:
+        """Count the rows from the epoch second `since` onward."""
+        return self.stop - self.index_since(since)
+
+    def count_matching(self, since: int,
+                       filters: Dict[str, FrozenSet[str]]) -> int:
+        """
+        Count the rows from the epoch second `since` onward with one of the
+        accepted values for every field in the normalized `filters`.
+        """
+        first = self.index_since(since)
+        mask = np.ones(self.stop - first, dtype=bool)
+        for field, accepted in filters.items():
+            if field == "status_class":
+                column = self.statuses[first:self.stop] // 100
+                values = [int(value) for value in accepted if value.isdigit()]
+            else:
+                name = STRING_FILTER_COLUMNS[field]
+                column = getattr(self, name)[first:self.stop]
+                ids = self.strings.ids
+                values = [ids[value] for value in accepted if value in ids]
+            mask &= np.isin(column, values)
+        return int(np.count_nonzero(mask))
+
+    def summarize(self,
+                  since: int,
+                  aggregates: Optional[AggregateFactories] = None
+                  ) -> LogSummary:
+        """
+        Summarize the rows from the epoch second `since` onward with
+        vectorized reductions over the column slices. Rows are materialized,
+        as FrameRows, only if there are `aggregates` to feed.
+        """
+        first = self.index_since(since)
+        summary = LogSummary(aggregates)
+        summary.hits = self.stop - first
+        if not summary.hits:
+            return summary
+
+        status_classes = self.statuses[first:self.stop].astype("int64") // 100
+        sections = self.sections[first:self.stop].astype("int64")
+        summary.bytes = int(self.sizes[first:self.stop].sum())
+
+        # count (status class, section) pairs as one id per pair
+        width = int(sections.max()) + 1
+        pair_hits = np.bincount(status_classes * width + sections)
+        values = self.strings.values
+        summary.count_pairs({
+            (str(pair // width), values[pair % width]): int(pair_hits[pair])
+            for pair in np.flatnonzero(pair_hits)
+        })
+
+        if summary.extras:
+            for row in self.rows(first):
+                for extra in summary.extras.values():
+                    extra.add(row)
+
+        return summary
+
+    def per_second_hits(self) -> List[Tuple[int, int]]:
+        """(epoch second, hits) pairs for every second with retained rows."""
+        seconds, hits = np.unique(self.live("epochs"), return_counts=True)
+        return list(zip(seconds.tolist(), hits.tolist()))
+
+    def rows(self, first: Optional[int] = None) -> Iterator[FrameRow]:
+        """Yield the rows from index `first` onward, oldest first."""
+        first = self.start if first is None else first
+        values = self.strings.values
+        columns = zip(*(getattr(self, name)[first:self.stop].tolist()
+                        for name in NAMES))
+        for (epoch, status, section, username, size, ip_address, verb, path,
+             request_time) in columns:
+            yield FrameRow(values[username], str(status), str(size),
+                           values[section], epoch, values[ip_address],
+                           values[verb], values[path], values[request_time])
+
+    def __reserve(self, count: int) -> None:
+        """
+        Internal. Ensure there is room for `count` more rows, first by moving
+        the retained rows to the front of the columns, then by doubling their
+        capacity.
+        """
+        capacity = len(self.epochs)
+        if self.stop + count <= capacity:
+            return
+
+        live = self.stop - self.start
+        while live + count > capacity:
+            capacity *= 2
+
+        for name, dtype in COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            column[:live] = getattr(self, name)[self.start:self.stop]
+            setattr(self, name, column)
+        self.start, self.stop = 0, live
+
+    def __len__(self):
+        return self.stop - self.start
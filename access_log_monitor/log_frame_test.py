@@ -0,0 +1,96 @@
+import pytest
+from freezegun import freeze_time
+
+from .log_aggregates import TopN
+from .log_batch import LogBatch
+from .log_frame import LogFrame
+from .log_line import LogLine
+from .log_store import DataFrameDataStore, DequeDataStore
+from .log_utils import now_utc
+
+pytest.importorskip("numpy")
+
+
+def sample_entries(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        return [LogLine.from_log_line(line) for line in sample_log]
+
+
+def test_extend_keeps_rows_in_time_order():
+    frame = LogFrame(capacity=2)
+    frame.append(1005, 200, "api", "jill", 10)
+    frame.append(1001, 404, "pages", "james", 20)
+    frame.append(1005, 500, "api", "mary", 30)
+    frame.append(1003, 200, "api", "frank", 40)
+
+    assert len(frame) == 4
+    assert frame.live("epochs").tolist() == [1001, 1003, 1005, 1005]
+    assert [row.username for row in frame.rows()] == [
+        "james", "frank", "jill", "mary"
+    ]
+
+
+def test_count_and_summarize_since_given_second():
+    frame = LogFrame()
+    frame.append(1000, 200, "api", "jill", 10)
+    frame.append(1001, 404, "pages", "james", 20)
+    frame.append(1002, 500, "pages", "mary", 30)
+
+    assert frame.count(since=1001) == 2
+    summary = frame.summarize(since=1001)
+    assert summary.hits == 2
+    assert summary.bytes == 50
+    assert summary.status_classes == {"4": 1, "5": 1}
+    assert summary.most_popular_section == ("pages", 2)
+    assert frame.summarize(since=2000).hits == 0
+
+
+def test_retention_discards_old_rows():
+    frame = LogFrame(retention_sec=10, capacity=4)
+    for second in range(1000, 1100):
+        frame.append(second, 200, "api", "jill", 10)
+
+    assert len(frame) == 11
+    assert frame.count(since=0) == 11
+    assert len(frame.epochs) <= 32
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_store_matches_deque_store(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    since = now_utc(minute=29, second=50)
+    deque_store = DequeDataStore()
+    frame_stores = [DataFrameDataStore() for _ in range(3)]
+    for store in [deque_store] + frame_stores:
+        store.register_aggregate("top_users", lambda: TopN("username", n=1))
+
+    for entry in entries:
+        deque_store.add(entry)
+        frame_stores[0].add(entry)
+    frame_stores[1].add_many(entries[5:] + entries[:5])
+    frame_stores[2].add_many(LogBatch.from_entries(entries))
+
+    expected = deque_store.summarize(since)
+    for store in frame_stores:
+        assert store.count(since) == deque_store.count(since) == 9
+        assert len(store.peek(since)) == 9
+        summary = store.summarize(since)
+        assert summary.hits == expected.hits
+        assert summary.status_classes == expected.status_classes
+        assert summary.sections == expected.sections
+        assert summary.bytes == expected.bytes
+        assert (summary.extras["top_users"].value ==
+                expected.extras["top_users"].value)
+        assert [(row.ip_address, row.verb, row.path)
+                for row in store.peek(since)] == [
+                    (entry.ip_address, entry.verb, entry.path)
+                    for entry in entries[1:]
+                ]
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_store_seeds_tracked_windows(sample_log_path):
+    store = DataFrameDataStore().add_many(sample_entries(sample_log_path))
+    store.track_window(10)
+
+    assert store.windowed_count(now_utc(minute=29, second=50)) == 9
@@ -1,8 +1,15 @@
-from typing import Pattern
+from functools import lru_cache
+from sys import intern
+from typing import Optional, Pattern, Union
 
 from dataclasses import dataclass
 
 from .log_entry_format import PATH_FORMAT, TIMESTAMP_FORMAT, W3C_ENTRY_FORMAT
+from .log_timestamps import decode_epoch
+
+# The groups of an entry format, in order. A request time may follow.
+ENTRY_FIELDS = ("ip_address", "username", "date", "time", "offset", "verb",
+                "path", "http_version", "response_status", "size")
 
 
 @dataclass
@@ -15,39 +22,101 @@ class LogLine:
     version: str = ""
     status: str = ""
     size: str = ""
+    request_time: str = ""
     timestamp_format: str = TIMESTAMP_FORMAT
     entry_format: Pattern = W3C_ENTRY_FORMAT
 
     @property
     def site_section(self) -> str:
         """The section of the site indicated by the log entry's `path`."""
-        match = PATH_FORMAT.match(self.path)
-        if match:
-            return match.group("base_path")
-        return ""
+        return section_of(self.path)
 
     @classmethod
-    def from_log_line(cls, log_line: str):
+    def from_log_line(cls,
+                      log_line: str,
+                      entry_format: Optional[Pattern] = None):
         """
-        Parse the given log line into a LogLine model instance.
+        Parse the given log line into a LogLine model instance, using the
+        pattern `entry_format` if given, else the class's `entry_format`.
         If parsing is successful, return a LogLine. Else return None.
         """
-        match = cls.entry_format.match(log_line)
+        match = (entry_format or cls.entry_format).match(log_line)
         if not match:
             return None
 
-        date = match.group("date")
-        time = match.group("time")
-        offset = match.group("offset")
-
-        entry = cls(
-            ip_address=match.group("ip_address"),
-            username=match.group("username"),
-            timestamp=f"{date} {time} {offset}",
-            verb=match.group("verb"),
-            path=match.group("path"),
-            version=match.group("http_version"),
-            status=match.group("response_status"),
-            size=match.group("size"))
-
-        return entry
+        # the pattern's groups are the ENTRY_FIELDS, in order, then the
+        # request time, where it has one: all fetched at once and read by
+        # position, measurably faster than by name
+        fields = match.groups()
+        request_time = (fields[10] or "") if len(fields) > 10 else ""
+
+        # positional arguments, in field order: measurably faster than kwargs
+        return cls(fields[0], fields[1],
+                   f"{fields[2]} {fields[3]} {fields[4]}", fields[5],
+                   fields[6], fields[7], fields[8], fields[9], request_time)
+
+    def compact(self) -> "LogRecord":
+        """Return a compact LogRecord copy of this entry."""
+        return LogRecord(self.ip_address, self.username, self.timestamp,
+                         self.verb, self.path, self.version, self.status,
+                         self.size, decode_epoch(self.timestamp,
+                                                 self.timestamp_format),
+                         self.request_time)
+
+
+class LogRecord:
+    """
+    A compact, read-only stand-in for a LogLine, for retaining large numbers
+    of entries. Slotted (no per-instance dict), with its strings interned so
+    that entries repeating an address, user, path, status, etc. share a
+    single string object. The site section is computed once, on creation,
+    and the timestamp is also kept as epoch seconds in `epoch`.
+    """
+
+    __slots__ = ("ip_address", "username", "timestamp", "verb", "path",
+                 "version", "status", "size", "site_section", "epoch",
+                 "request_time")
+
+    def __init__(self,
+                 ip_address: str,
+                 username: str,
+                 timestamp: str,
+                 verb: str,
+                 path: str,
+                 version: str,
+                 status: str,
+                 size: str,
+                 epoch: int,
+                 request_time: str = "") -> None:
+        self.ip_address = intern(ip_address)
+        self.username = intern(username)
+        self.timestamp = intern(timestamp)
+        self.verb = intern(verb)
+        self.path = intern(path)
+        self.version = intern(version)
+        self.status = intern(status)
+        self.size = intern(size)
+        self.site_section = intern(section_of(path))
+        self.epoch = epoch
+        self.request_time = request_time
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"LogRecord({fields})"
+
+
+# A parsed log entry, either in full or in compact form
+Entry = Union[LogLine, LogRecord]
+
+
+@lru_cache(maxsize=4096)
+def section_of(path: str) -> str:
+    """
+    Return the section of the site indicated by `path`, or "" if it has none.
+    Cached, since a site's paths repeat heavily across log entries.
+    """
+    match = PATH_FORMAT.match(path)
+    if match:
+        return match.group("base_path")
+    return ""
@@ -1,4 +1,8 @@
-from .log_line import LogLine
+import os
+
+from .log_entry_format import (CLF_ENTRY_FORMAT, ENTRY_FORMATS,
+                               W3C_ENTRY_FORMAT)
+from .log_line import ENTRY_FIELDS, LogLine
 
 
 def test_site_section_parses_base_path():
@@ -21,3 +25,72 @@ def test_site_section_returns_empty_string_if_parse_fails():
 
     entry = LogLine(path="https://google.com/mail")
     assert entry.site_section == ""
+
+
+def test_from_log_line_parses_entry_fields():
+    line = ("127.0.0.1 - mary [11/Sep/2018:03:29:52 +0000] "
+            '"GET /pages/create HTTP/1.0" 404 401')
+    entry = LogLine.from_log_line(line)
+    assert entry == LogLine(
+        ip_address="127.0.0.1",
+        username="mary",
+        timestamp="11/Sep/2018 03:29:52 +0000",
+        verb="GET",
+        path="/pages/create",
+        version="1.0",
+        status="404",
+        size="401")
+
+
+def test_clf_entry_format_parses_a_trailing_request_time():
+    line = ("127.0.0.1 - mary [11/Sep/2018:03:29:52 +0000] "
+            '"GET /pages/create HTTP/1.0" 404 401')
+    timed = LogLine.from_log_line(f"{line} 0.042", CLF_ENTRY_FORMAT)
+    assert timed.request_time == "0.042"
+    assert timed.size == "401"
+    assert timed.compact().request_time == "0.042"
+
+    assert LogLine.from_log_line(line, CLF_ENTRY_FORMAT).request_time == ""
+
+
+def test_entry_formats_capture_the_entry_fields_in_order():
+    for entry_format in ENTRY_FORMATS.values():
+        assert list(entry_format.groupindex)[:len(ENTRY_FIELDS)] == list(
+            ENTRY_FIELDS)
+        assert entry_format.groups in (len(ENTRY_FIELDS),
+                                       len(ENTRY_FIELDS) + 1)
+
+
+def test_from_log_line_returns_none_if_parse_fails():
+    assert LogLine.from_log_line("not a log line") is None
+    assert LogLine.from_log_line("not a log line", CLF_ENTRY_FORMAT) is None
+
+
+def test_clf_entry_format_parses_identically_to_w3c(sample_log_path,
+                                                    project_root):
+    fixtures = [
+        sample_log_path,
+        os.path.join(project_root, "access_log_monitor", "test_fixtures",
+                     "logged_1rps.log")
+    ]
+    for fixture in fixtures:
+        with open(fixture) as log:
+            for line in log:
+                expected = LogLine.from_log_line(line, W3C_ENTRY_FORMAT)
+                actual = LogLine.from_log_line(line, CLF_ENTRY_FORMAT)
+                assert expected is not None
+                assert actual == expected
+
+
+def test_compact_returns_interned_record_with_precomputed_section():
+    line = ("127.0.0.1 - mary [11/Sep/2018:03:29:52 +0000] "
+            '"GET /pages/create HTTP/1.0" 404 401')
+    record = LogLine.from_log_line(line).compact()
+    other = LogLine.from_log_line(line).compact()
+
+    assert record.path == "/pages/create"
+    assert record.site_section == "pages"
+    assert record.status == "404"
+    assert record.epoch == 1536636592
+    assert record.path is other.path
+    assert not hasattr(record, "__dict__")
@@ -1,19 +1,63 @@
+import gzip
 import os
-from typing import Optional
+from typing import BinaryIO, List, Optional, Pattern, Tuple
 
 from . import log_utils
 from .log_line import LogLine
+from .log_metrics import NO_METRICS, MetricsRegistry
+from .log_mmap import MappedLog
+
+# How many of the last bytes read to keep, to recognize the file read from
+# after copytruncate rotation or a restart
+LAST_BYTES = 64
 
 
 class LogManager:
     """
     Models the log file at the given path.
     The path is overridable. Maintains the time of the most recent update.
+
+    Keeps a persistent binary file handle and the byte offset of the last
+    complete line read, so that every line appended to the log is ingested
+    exactly once. Reading begins at the end of the file as it stood when the
+    manager was created.
+
+    Follows the log across rotation: the inode and size of the open file are
+    tracked so that renames (logrotate's default create mode) and in-place
+    truncation (copytruncate) are detected, and lines written to the old file
+    before rotation are drained rather than lost.
+
+    Lines are parsed with the pattern `entry_format` if given, else with the
+    LogLine default.
+
+    Lines read, lines dropped for failing to parse and the ingest lag are
+    recorded in `metrics`, labeled with the log's path.
     """
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str,
+                 entry_format: Optional[Pattern] = None,
+                 metrics: MetricsRegistry = NO_METRICS) -> None:
         self.path = path
+        self.entry_format = entry_format
         self.mru_time = self.last_updated_at
+        self.file: BinaryIO
+        self.inode: Tuple[int, int]
+        self.offset: int
+        self.partial_line = b""
+        self.last_bytes = b""
+        self.__open(at_end=True)
+
+        self.lines_read = metrics.counter(
+            "lines_read_total", "Complete lines read from the log.", log=path)
+        self.parse_failures = metrics.counter(
+            "parse_failures_total",
+            "Lines read from the log that failed to parse and were dropped.",
+            log=path)
+        metrics.gauge(
+            "ingest_lag_bytes",
+            "Bytes appended to the log but not yet read.",
+            lambda: self.ingest_lag,
+            log=path)
 
     @property
     def last_entry(self) -> Optional[LogLine]:
@@ -31,11 +75,321 @@ class LogManager:
         If the target log file has been updated since the last time it was
         checked, record the new most-recent-update time and return True. Else
         return False.
+
+        Returns False while the log is missing, e.g. mid-rotation.
         """
-        last_update = self.last_updated_at
+        try:
+            last_update = self.last_updated_at
+        except FileNotFoundError:
+            return False
 
         if last_update > self.mru_time:
             self.mru_time = last_update
             return True
 
         return False
+
+    @property
+    def ingest_lag(self) -> int:
+        """
+        The number of bytes appended to the log but not yet read: its size
+        minus the offset read up to. 0 while the log is missing.
+        """
+        try:
+            return max(os.stat(self.path).st_size - self.offset, 0)
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def rotated_paths(self) -> List[str]:
+        """
+        Paths of the log's rotated siblings (`<path>.1`, `<path>.2.gz`, ...),
+        most recently rotated first.
+        """
+        paths: List[str] = []
+        existing = self.__rotated_path(1)
+        while existing:
+            paths.append(existing)
+            existing = self.__rotated_path(len(paths) + 1)
+        return paths
+
+    def read_lines(self) -> List[str]:
+        """
+        Read every complete line appended to the log since the last read, in
+        a single buffered read from the stored offset.
+
+        A trailing line without a newline is held back and prepended to the
+        next read, so partially-written lines are never returned.
+
+        If the log has been rotated since the last read, the remainder of the
+        old file is drained before switching to the new one. If it has been
+        truncated (it is shorter than the offset, or the bytes before the
+        offset are no longer the last bytes read, as when it has been written
+        past the offset again since), the lines copied to `<path>.1` but not
+        yet read are recovered and reading restarts from the beginning of the
+        file.
+        """
+        lines: List[str] = []
+        if not is_preceded_by(self.file, self.offset, self.last_bytes,
+                              shorter=False):
+            lines += self.__read_copied_remainder()
+            self.offset = 0
+            self.partial_line = self.last_bytes = b""
+        lines += self.__read_new_lines()
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return lines
+
+        if (stat.st_dev, stat.st_ino) != self.inode:
+            lines += self.__read_new_lines(final=True)
+            self.file.close()
+            try:
+                self.__open(at_end=False)
+            except FileNotFoundError:
+                return lines
+            lines += self.__read_new_lines()
+
+        return lines
+
+    def read_entries(self) -> List[LogLine]:
+        """
+        Parse every complete line appended since the last read into LogLine
+        instances. Lines that fail to parse are dropped (and counted).
+        """
+        lines = self.read_lines()
+        entries = self.parse(lines)
+        self.lines_read.inc(len(lines))
+        self.parse_failures.inc(len(lines) - len(entries))
+        return entries
+
+    def parse(self, lines: List[str]) -> List[LogLine]:
+        """
+        Parse the given `lines` into LogLine instances with the manager's
+        entry format, dropping lines that fail to parse.
+        """
+        entries = (LogLine.from_log_line(line, self.entry_format)
+                   for line in lines)
+        return [entry for entry in entries if entry]
+
+    def read_entries_since(self, epoch: int) -> List[LogLine]:
+        """
+        Parse the entries logged from the epoch second `epoch` up to where
+        tailing resumes, jumping to them by binary search over a memory map
+        of the log, so the cost is proportional to the entries read rather
+        than the size of the log. The file mapped is the one open, which may
+        be a rotated sibling of the log (see `restore`).
+        """
+        with MappedLog(self.file.name, stop=self.offset) as log:
+            return log.entries_since(epoch, self.entry_format)
+
+    def read_rotated_lines(self, files: int = 1) -> List[str]:
+        """
+        Read every line from the `files` most recently rotated siblings of the
+        log, oldest first. Gzipped siblings are decompressed transparently.
+        """
+        lines: List[str] = []
+        for path in reversed(self.rotated_paths[:files]):
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rb") as rotated:
+                lines += split_lines(rotated.read(), final=True)[0]
+        return lines
+
+    def read_existing_lines(self) -> List[str]:
+        """
+        Read every complete line of the open file before the offset reading
+        has reached: on startup, the lines already in the log.
+        """
+        self.file.seek(0)
+        chunk = self.file.read(self.offset - len(self.partial_line))
+        return split_lines(chunk)[0]
+
+    def seek(self, offset: int) -> None:
+        """
+        Resume reading the open file from the byte `offset`, which should be
+        the start of a line, e.g. where a backfill of the log stopped.
+        """
+        self.offset = offset
+        self.partial_line = b""
+        start = self.file.seek(max(offset - LAST_BYTES, 0))
+        self.last_bytes = self.file.read(offset - start)
+
+    def snapshot(self) -> list:
+        """
+        Where reading has reached, as plain data, for checkpoints (see
+        log_checkpoint): the device and inode of the open file, the offset of
+        the end of the last complete line read, and the bytes preceding it.
+        """
+        last_bytes = self.last_bytes
+        if self.partial_line:
+            last_bytes = last_bytes[:-len(self.partial_line)]
+        return [*self.inode, self.offset - len(self.partial_line), last_bytes]
+
+    def restore(self, snapshot: list) -> bool:
+        """
+        Resume reading from the position `snapshot`, taken by `snapshot`, if
+        the file it was taken of is still at the path, or has since been
+        rotated to `<path>.1`; in the latter case its remainder is drained
+        before the new file is read, as on rotation. Return False, leaving
+        the position unchanged, if the file is no longer to be found.
+
+        The file is recognized by its inode and, since inodes are reused, by
+        the bytes preceding the position, unless it has since been truncated.
+        """
+        device, inode, offset, last_bytes = snapshot
+        if (device, inode) == self.inode:
+            file = self.file
+        else:
+            rotated = self.__open_rotated(device, inode)
+            if rotated is None:
+                return False
+            file = rotated
+
+        if not is_preceded_by(file, offset, last_bytes):
+            if file is not self.file:
+                file.close()
+            return False
+
+        if file is not self.file:
+            self.file.close()
+            self.file = file
+            self.inode = (device, inode)
+        self.seek(offset)
+        self.last_bytes = last_bytes
+        return True
+
+    def read_lines_from(self, snapshot: list) -> Optional[List[str]]:
+        """
+        Read every complete line from the position `snapshot`, taken by
+        `snapshot`, up to where reading has reached (none, if it is yet to
+        reach the position), or return None if the file it was taken of is
+        no longer to be found (see `restore`). If that file has since been
+        rotated to `<path>.1`, the rest of it is read before the open file's
+        existing lines.
+        """
+        device, inode, offset, last_bytes = snapshot
+        if (device, inode) == self.inode:
+            stop = self.offset - len(self.partial_line)
+            if not is_preceded_by(self.file, offset, last_bytes,
+                                  shorter=False):
+                return None
+            self.file.seek(offset)
+            return split_lines(self.file.read(max(stop - offset, 0)))[0]
+
+        rotated = self.__open_rotated(device, inode)
+        if rotated is None:
+            return None
+        with rotated:
+            if not is_preceded_by(rotated, offset, last_bytes, shorter=False):
+                return None
+            rotated.seek(offset)
+            lines = split_lines(rotated.read(), final=True)[0]
+        return lines + self.read_existing_lines()
+
+    def close(self) -> None:
+        """Close the underlying file handle."""
+        self.file.close()
+
+    def __rotated_path(self, n: int) -> Optional[str]:
+        """
+        Internal. The path of the `n`th rotated sibling of the log, plain or
+        gzipped, or None if there is none.
+        """
+        for path in (f"{self.path}.{n}", f"{self.path}.{n}.gz"):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def __open_rotated(self, device: int, inode: int) -> Optional[BinaryIO]:
+        """
+        Internal. Open `<path>.1` if it is the file with the inode `inode` on
+        the device `device`, else return None.
+        """
+        try:
+            file = open(f"{self.path}.1", "rb")
+        except FileNotFoundError:
+            return None
+        stat = os.fstat(file.fileno())
+        if (stat.st_dev, stat.st_ino) != (device, inode):
+            file.close()
+            return None
+        return file
+
+    def __open(self, at_end: bool) -> None:
+        """
+        Internal. Open the file currently at `self.path` and record its
+        identity, starting either from its end (as if its last bytes had
+        been read) or its beginning.
+        """
+        self.file = open(self.path, "rb")
+        stat = os.fstat(self.file.fileno())
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.seek(self.file.seek(0, os.SEEK_END) if at_end else 0)
+
+    def __read_new_lines(self, final: bool = False) -> List[str]:
+        """
+        Internal. Read from the stored offset to the end of the open file.
+        If `final`, the file will not be written to again, so a trailing
+        partial line is returned as-is.
+        """
+        self.file.seek(self.offset)
+        chunk = self.file.read()
+        self.offset += len(chunk)
+        if chunk:
+            self.last_bytes = (self.last_bytes + chunk)[-LAST_BYTES:]
+
+        lines, self.partial_line = split_lines(self.partial_line + chunk,
+                                               final)
+        return lines
+
+    def __read_copied_remainder(self) -> List[str]:
+        """
+        Internal. After a copytruncate rotation, read the lines that were
+        written between the last read and the truncation from the copy at
+        `<path>.1`. The copy is only trusted if the bytes preceding the stored
+        offset match the last bytes read from the live file.
+        """
+        try:
+            with open(f"{self.path}.1", "rb") as copy:
+                start = self.offset - len(self.last_bytes)
+                if start < 0:
+                    return []
+                copy.seek(start)
+                if copy.read(len(self.last_bytes)) != self.last_bytes:
+                    return []
+                chunk = copy.read()
+        except FileNotFoundError:
+            return []
+
+        lines, _ = split_lines(self.partial_line + chunk, final=True)
+        return lines
+
+
+def is_preceded_by(file: BinaryIO, offset: int, last_bytes: bytes,
+                   shorter: bool = True) -> bool:
+    """
+    Whether the bytes preceding the byte `offset` of the binary `file` are
+    `last_bytes`. If the file is now shorter than `offset`, return `shorter`.
+    False if fewer than `len(last_bytes)` bytes precede `offset`.
+    """
+    if os.fstat(file.fileno()).st_size < offset:
+        return shorter
+    if offset < len(last_bytes):
+        return False
+    file.seek(offset - len(last_bytes))
+    return file.read(len(last_bytes)) == last_bytes
+
+
+def split_lines(chunk: bytes, final: bool = False) -> Tuple[List[str], bytes]:
+    """
+    Split the bytes `chunk` into decoded lines, returning the list of complete
+    lines and the trailing partial line (as bytes). If `final`, the partial
+    line is included in the returned lines.
+    """
+    *lines, partial_line = chunk.split(b"\n")
+    if final:
+        lines.append(partial_line)
+        partial_line = b""
+    decoded = [line.decode("utf-8", "replace") for line in lines if line]
+    return decoded, partial_line
@@ -1,3 +1,4 @@
+import gzip
 import os
 from random import randint
 from time import sleep
@@ -6,6 +7,7 @@ import pytest
 
 from .log_line import LogLine
 from .log_manager import LogManager
+from .log_metrics import MetricsRegistry
 
 
 def test_constructor_raises_if_file_doesnt_exist():
@@ -77,3 +79,339 @@ def test_has_been_updated_returns_false_if_log_hasnt_been_updated():
 
     # remove temp file
     os.remove(temp_file_path)
+
+
+def test_read_lines_starts_at_end_of_existing_file(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\nline 2\n")
+
+    log = LogManager(str(temp_file_path))
+    assert log.read_lines() == []
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 3\n")
+
+    assert log.read_lines() == ["line 3"]
+
+
+def test_read_lines_returns_every_line_appended_since_last_read(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\nline 2\nline 3\n")
+
+    assert log.read_lines() == ["line 1", "line 2", "line 3"]
+    assert log.read_lines() == []
+    assert log.offset == temp_file_path.stat().st_size
+
+
+def test_read_lines_holds_partial_lines_until_newline_arrives(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\nline")
+
+    assert log.read_lines() == ["line 1"]
+
+    with open(temp_file_path, "a") as templog:
+        templog.write(" 2\n")
+
+    assert log.read_lines() == ["line 2"]
+
+
+def test_read_entries_parses_lines_and_drops_failures(sample_log_path,
+                                                      tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(sample_log_path) as sample, open(temp_file_path, "a") as templog:
+        templog.write("not a log line\n")
+        templog.write(sample.read())
+
+    entries = log.read_entries()
+    assert len(entries) == 10
+    assert all(isinstance(entry, LogLine) for entry in entries)
+    assert entries[-1].path == "/pages/delete"
+
+
+def test_read_entries_counts_lines_read_and_parse_failures(
+        sample_log_path, tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    metrics = MetricsRegistry()
+    log = LogManager(str(temp_file_path), metrics=metrics)
+
+    with open(sample_log_path) as sample, open(temp_file_path, "a") as templog:
+        templog.write("not a log line\n")
+        templog.write(sample.read())
+        templog.write("partial")
+
+    path = str(temp_file_path)
+    lag = metrics.gauge("ingest_lag_bytes", "", log=path)
+    assert lag.value == log.ingest_lag == os.path.getsize(path)
+
+    log.read_entries()
+    assert metrics.counter("lines_read_total", "", log=path).value == 11
+    assert metrics.counter("parse_failures_total", "", log=path).value == 1
+    assert lag.value == 0
+
+
+def test_read_lines_drains_old_file_then_follows_renamed_rotation(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\n")
+    assert log.read_lines() == ["line 1"]
+
+    # written after the last read, just before rotation
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+
+    os.rename(temp_file_path, f"{temp_file_path}.1")
+    temp_file_path.write_text("line 3\n")
+
+    assert log.read_lines() == ["line 2", "line 3"]
+    assert log.read_lines() == []
+
+
+def test_read_lines_tolerates_missing_file_during_rotation(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\n")
+    os.rename(temp_file_path, f"{temp_file_path}.1")
+
+    assert log.read_lines() == ["line 1"]
+    assert log.has_been_updated is False
+
+    temp_file_path.write_text("line 2\n")
+    assert log.read_lines() == ["line 2"]
+
+
+def test_read_lines_recovers_lines_copied_before_truncation(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\n")
+    assert log.read_lines() == ["line 1"]
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+
+    # logrotate copytruncate
+    with open(f"{temp_file_path}.1", "wb") as copy:
+        copy.write(temp_file_path.read_bytes())
+    with open(temp_file_path, "r+") as templog:
+        templog.truncate(0)
+
+    assert log.read_lines() == ["line 2"]
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 3\n")
+    assert log.read_lines() == ["line 3"]
+
+
+def test_read_lines_ignores_unrelated_copy_after_truncation(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\n")
+    assert log.read_lines() == ["line 1"]
+
+    with open(f"{temp_file_path}.1", "w") as copy:
+        copy.write("older 1\nolder 2\n")
+    with open(temp_file_path, "r+") as templog:
+        templog.truncate(0)
+
+    assert log.read_lines() == []
+
+
+def test_read_lines_detects_truncation_refilled_past_the_offset(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\n")
+    assert log.read_lines() == ["line 1"]
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+
+    # logrotate copytruncate, then more written than was read before
+    with open(f"{temp_file_path}.1", "wb") as copy:
+        copy.write(temp_file_path.read_bytes())
+    with open(temp_file_path, "r+") as templog:
+        templog.truncate(0)
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 3, a longer one\n")
+
+    assert log.read_lines() == ["line 2", "line 3, a longer one"]
+
+
+def test_read_existing_lines_reads_the_log_up_to_the_start(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\nline 2\npartial")
+    log = LogManager(str(temp_file_path))
+
+    with open(temp_file_path, "a") as templog:
+        templog.write(" line\nline 3\n")
+
+    assert log.read_existing_lines() == ["line 1", "line 2"]
+    assert log.read_lines() == [" line", "line 3"]
+
+
+def test_read_rotated_lines_reads_plain_and_gzipped_siblings(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 5\n")
+    with open(f"{temp_file_path}.1", "w") as rotated:
+        rotated.write("line 3\nline 4\n")
+    with gzip.open(f"{temp_file_path}.2.gz", "wt") as rotated:
+        rotated.write("line 1\nline 2\n")
+
+    log = LogManager(str(temp_file_path))
+    assert log.rotated_paths == [
+        f"{temp_file_path}.1", f"{temp_file_path}.2.gz"
+    ]
+    assert log.read_rotated_lines() == ["line 3", "line 4"]
+    assert log.read_rotated_lines(files=2) == [
+        "line 1", "line 2", "line 3", "line 4"
+    ]
+    assert log.read_lines() == []
+
+
+def test_restore_resumes_after_the_last_complete_line_read(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 1\nline")
+    assert log.read_lines() == ["line 1"]
+    snapshot = log.snapshot()
+
+    with open(temp_file_path, "a") as templog:
+        templog.write(" 2\nline 3\n")
+
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.restore(snapshot) is True
+    assert restarted.read_lines() == ["line 2", "line 3"]
+
+
+def test_restore_drains_the_file_rotated_since(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\n")
+    log = LogManager(str(temp_file_path))
+    snapshot = log.snapshot()
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+    os.rename(temp_file_path, f"{temp_file_path}.1")
+    temp_file_path.write_text("line 3\n")
+
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.restore(snapshot) is True
+    assert restarted.read_lines() == ["line 2", "line 3"]
+    assert restarted.read_lines() == []
+
+
+def test_read_lines_from_reads_on_from_a_position_up_to_the_start(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\n")
+    log = LogManager(str(temp_file_path))
+    snapshot = log.snapshot()
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+    restarted = LogManager(str(temp_file_path))
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 3\n")
+    assert restarted.read_lines_from(snapshot) == ["line 2"]
+
+    os.rename(temp_file_path, f"{temp_file_path}.1")
+    temp_file_path.write_text("line 4\n")
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.read_lines_from(snapshot) == [
+        "line 2", "line 3", "line 4"
+    ]
+
+    os.remove(f"{temp_file_path}.1")
+    assert restarted.read_lines_from(snapshot) is None
+
+
+def test_restore_fails_once_the_file_is_gone(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\n")
+    snapshot = LogManager(str(temp_file_path)).snapshot()
+
+    os.remove(temp_file_path)
+    temp_file_path.write_text("line 2\n")
+
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.restore(snapshot) is False
+    assert restarted.offset == temp_file_path.stat().st_size
+
+
+def test_restore_resumes_in_the_file_rotated_to(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+    with open(temp_file_path, "a") as templog:
+        templog.write("a longer line, from before the log was rotated\n")
+    os.rename(temp_file_path, f"{temp_file_path}.1")
+    temp_file_path.write_text("line 1\n")
+    assert len(log.read_lines()) == 2
+    snapshot = log.snapshot()
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.restore(snapshot) is True
+    assert restarted.read_lines() == ["line 2"]
+
+
+def test_restore_resumes_in_the_file_truncated_to(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("")
+    log = LogManager(str(temp_file_path))
+    with open(temp_file_path, "a") as templog:
+        templog.write("a longer line, from before the log was truncated\n")
+    assert log.read_lines() == [
+        "a longer line, from before the log was truncated"
+    ]
+
+    with open(temp_file_path, "r+") as templog:
+        templog.truncate(0)
+        templog.write("line 1\n")
+    assert log.read_lines() == ["line 1"]
+    snapshot = log.snapshot()
+
+    with open(temp_file_path, "a") as templog:
+        templog.write("line 2\n")
+
+    restarted = LogManager(str(temp_file_path))
+    assert restarted.restore(snapshot) is True
+    assert restarted.read_lines() == ["line 2"]
+
+
+def test_restore_rejects_a_position_its_bytes_cannot_precede(tmp_path):
+    temp_file_path = tmp_path / "access.log"
+    temp_file_path.write_text("line 1\n")
+    log = LogManager(str(temp_file_path))
+    device, inode, offset, _ = log.snapshot()
+
+    assert log.restore([device, inode, offset, b"\n" * 64]) is False
+    assert log.offset == offset
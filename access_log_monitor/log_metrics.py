@@ -0,0 +1,290 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (Callable, ContextManager, Dict, Iterator, List, Optional,
+                    Sequence, Tuple, Union)
+
+# Upper bounds, in seconds, of the buckets of latency histograms
+LATENCY_BUCKETS: Sequence[float] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                                    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Upper bounds of the buckets of per-tick size histograms
+COUNT_BUCKETS: Sequence[float] = (0, 1, 10, 100, 1_000, 10_000, 100_000)
+
+# The prefix of every exported metric name
+NAMESPACE = "access_log_monitor"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """A monotonically increasing count."""
+
+    __slots__ = ("value", )
+    kind = "counter"
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """
+    A value that goes up and down: either set, or computed by `function`
+    whenever it is read.
+    """
+
+    __slots__ = ("function", "current")
+    kind = "gauge"
+
+    def __init__(self, function: Optional[Callable[[], float]] = None) -> None:
+        self.function = function
+        self.current = 0.0
+
+    def set(self, value: float) -> None:
+        self.current = value
+
+    @property
+    def value(self) -> float:
+        return self.function() if self.function else self.current
+
+
+class Histogram:
+    """
+    Counts of observations in buckets with the upper bounds `buckets`, plus
+    their sum: e.g. the latency of an operation, in seconds.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+    kind = "histogram"
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> ContextManager:
+        """A context manager observing the seconds spent within it."""
+        return Timer(self)
+
+
+class Timer:
+    """Observes the seconds spent within the context in a Histogram."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    """
+    The monitor's own metrics: counters, gauges and histograms, by name and
+    labels, exported in the Prometheus text format (`render`).
+
+    Instruments are created on first use and shared thereafter, so
+    components can look them up by name wherever they record. Gauges may be
+    computed from a function when read, e.g. the size of a datastore.
+
+    Reads happen on other threads (see `serve`), so writers that change the
+    state such functions read hold `lock` while they do.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.metrics: Dict[str, Tuple[str, Dict[Labels, Metric]]] = {}
+
+    def counter(self, name: str, description: str, **labels: str) -> Counter:
+        return self.__get(name, description, labels, Counter)  # type: ignore
+
+    def gauge(self,
+              name: str,
+              description: str,
+              function: Optional[Callable[[], float]] = None,
+              **labels: str) -> Gauge:
+        gauge = self.__get(name, description, labels, Gauge)
+        if function:
+            gauge.function = function  # type: ignore
+        return gauge  # type: ignore
+
+    def histogram(self,
+                  name: str,
+                  description: str,
+                  buckets: Sequence[float] = LATENCY_BUCKETS,
+                  **labels: str) -> Histogram:
+        return self.__get(name, description, labels,
+                          lambda: Histogram(buckets))  # type: ignore
+
+    def series(self) -> Iterator[Tuple[str, str, Labels, Metric]]:
+        """
+        Yield (name, description, labels, metric) for every metric, by name.
+        Hold `lock` while iterating.
+        """
+        for name in sorted(self.metrics):
+            description, by_labels = self.metrics[name]
+            for labels in sorted(by_labels):
+                yield name, description, labels, by_labels[labels]
+
+    def render(self) -> str:
+        """Every metric, in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self.lock:
+            previous = None
+            for name, description, labels, metric in self.series():
+                full_name = f"{NAMESPACE}_{name}"
+                if name != previous:
+                    lines.append(f"# HELP {full_name} {description}")
+                    lines.append(f"# TYPE {full_name} {metric.kind}")
+                    previous = name
+                if isinstance(metric, Histogram):
+                    lines += histogram_lines(full_name, labels, metric)
+                else:
+                    lines.append(f"{full_name}{format_labels(labels)} "
+                                 f"{format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve `render` at http://`host`:`port`/metrics from a daemon thread.
+        Return the server, to be shut down when done.
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type",
+                                 "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def __get(self, name: str, description: str, labels: Dict[str, str],
+              factory: Callable[[], Metric]) -> Metric:
+        """
+        Internal. The metric `name` with the given `labels`, created with
+        `factory` if it does not exist yet.
+        """
+        key = tuple(sorted(labels.items()))
+        named = self.metrics.get(name)
+        metric = named[1].get(key) if named else None
+        if metric is None:
+            with self.lock:
+                _, by_labels = self.metrics.setdefault(name,
+                                                       (description, {}))
+                metric = by_labels.setdefault(key, factory())
+        return metric
+
+
+class NullMetric:
+    """Accepts, and discards, everything recorded to any kind of metric."""
+
+    __slots__ = ()
+    value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def time(self) -> ContextManager:
+        return NULL_CONTEXT
+
+
+NULL_CONTEXT = nullcontext()
+NULL_METRIC = NullMetric()
+
+
+class NullMetricsRegistry(MetricsRegistry):
+    """
+    A MetricsRegistry that records nothing, for when metrics are disabled:
+    every instrument is a shared NullMetric, and `lock` a no-op, so
+    instrumented code costs a method call per recording.
+    """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = NULL_CONTEXT  # type: ignore
+
+    def counter(self, name, description, **labels):
+        return NULL_METRIC
+
+    def gauge(self, name, description, function=None, **labels):
+        return NULL_METRIC
+
+    def histogram(self, name, description, buckets=LATENCY_BUCKETS,
+                  **labels):
+        return NULL_METRIC
+
+
+NO_METRICS = NullMetricsRegistry()
+
+
+def histogram_lines(name: str, labels: Labels,
+                    histogram: Histogram) -> List[str]:
+    """The Prometheus series of `histogram`: cumulative buckets, sum, count."""
+    lines = []
+    cumulative = 0
+    bounds = [format_value(bound) for bound in histogram.buckets] + ["+Inf"]
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        bucket_labels = format_labels(labels + (("le", bound), ))
+        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labels)} "
+                 f"{format_value(histogram.sum)}")
+    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    return lines
+
+
+def format_labels(labels: Labels) -> str:
+    """`labels` in the Prometheus notation, e.g. {log="access.log"}."""
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", r"\\").replace("\n", r"\n").replace(
+        '"', r"\"") for _, value in labels)
+    pairs = (f'{key}="{value}"' for (key, _), value in zip(labels, escaped))
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    """`value` as Prometheus writes it: integral values without a point."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
@@ -0,0 +1,82 @@
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from .log_metrics import NO_METRICS, MetricsRegistry
+
+
+def test_instruments_are_shared_by_name_and_labels():
+    metrics = MetricsRegistry()
+    metrics.counter("lines_read_total", "Lines read.", log="a.log").inc(3)
+    metrics.counter("lines_read_total", "Lines read.", log="a.log").inc()
+    metrics.counter("lines_read_total", "Lines read.", log="b.log").inc()
+
+    assert metrics.counter("lines_read_total", "", log="a.log").value == 4
+    assert metrics.counter("lines_read_total", "", log="b.log").value == 1
+
+
+def test_render_uses_the_prometheus_text_format():
+    metrics = MetricsRegistry()
+    metrics.counter("ticks_total", "Ticks.").inc(2)
+    metrics.gauge("lag_bytes", "Lag.", lambda: 1_024, log='say "hi"')
+    latency = metrics.histogram("tick_seconds", "Tick time.", (0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2):
+        latency.observe(seconds)
+
+    assert metrics.render().splitlines() == [
+        "# HELP access_log_monitor_lag_bytes Lag.",
+        "# TYPE access_log_monitor_lag_bytes gauge",
+        'access_log_monitor_lag_bytes{log="say \\"hi\\""} 1024',
+        "# HELP access_log_monitor_tick_seconds Tick time.",
+        "# TYPE access_log_monitor_tick_seconds histogram",
+        'access_log_monitor_tick_seconds_bucket{le="0.1"} 2',
+        'access_log_monitor_tick_seconds_bucket{le="1"} 3',
+        'access_log_monitor_tick_seconds_bucket{le="+Inf"} 4',
+        "access_log_monitor_tick_seconds_sum 2.65",
+        "access_log_monitor_tick_seconds_count 4",
+        "# HELP access_log_monitor_ticks_total Ticks.",
+        "# TYPE access_log_monitor_ticks_total counter",
+        "access_log_monitor_ticks_total 2",
+    ]
+
+
+def test_timers_observe_the_time_spent_within_them():
+    metrics = MetricsRegistry()
+    with metrics.histogram("tick_seconds", "Tick time.").time():
+        pass
+
+    histogram = metrics.histogram("tick_seconds", "Tick time.")
+    assert histogram.count == 1
+    assert 0 <= histogram.sum < 0.1
+    assert histogram.counts[0] == 1
+
+
+def test_disabled_metrics_record_nothing():
+    NO_METRICS.counter("ticks_total", "Ticks.").inc()
+    NO_METRICS.gauge("lag_bytes", "Lag.").set(1)
+    with NO_METRICS.lock, NO_METRICS.histogram("tick_seconds", "").time():
+        pass
+
+    assert NO_METRICS.counter("ticks_total", "Ticks.").value == 0
+    assert NO_METRICS.metrics == {}
+    assert NO_METRICS.render() == "\n"
+
+
+def test_serve_exposes_metrics_over_http():
+    metrics = MetricsRegistry()
+    metrics.counter("ticks_total", "Ticks.").inc()
+    server = metrics.serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b"access_log_monitor_ticks_total 1\n" in response.read()
+
+        with pytest.raises(HTTPError) as err:
+            urlopen(f"{url}/")
+        assert err.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
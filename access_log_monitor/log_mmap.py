@@ -0,0 +1,140 @@
+import mmap
+import os
+import re
+from typing import Iterator, List, Optional, Pattern
+
+from .log_line import LogLine
+from .log_timestamps import decode_epoch
+
+# The bracketed timestamp of an access log line, e.g. [11/Sep/2018:03:29:49
+# +0000], with the date and time split as LogLine.timestamp expects
+TIMESTAMP_BYTES = re.compile(rb"\[([^\]:]+):([^\]]+)\]")
+
+# How many unparseable lines to skip, looking for a timestamp, per probe
+MAX_SKIPPED_LINES = 100
+
+
+class MappedLog:
+    """
+    A read-only memory map of the log at `path`, up to the byte offset `stop`
+    (by default, the whole file as it stood when mapped), for scanning its
+    history without reading it all.
+
+    Lines are found by searching the mapped buffer for newlines and are
+    returned as undecoded bytes; timestamps are read from bytes too, so only
+    lines that are actually parsed are ever decoded. Since access logs are
+    written in time order, the first line logged at or after a given time
+    is found by binary search over byte offsets, touching only O(log n)
+    lines; reading the lines since then costs O(bytes since then).
+
+    Use as a context manager, or call `close`.
+    """
+
+    def __init__(self, path: str, stop: Optional[int] = None) -> None:
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.stop = size if stop is None else min(stop, size)
+        self.buffer = (mmap.mmap(
+            self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+
+    def line_start(self, offset: int) -> int:
+        """
+        The offset of the first line starting at or after the byte `offset`,
+        or `stop` if there is none.
+        """
+        if offset <= 0:
+            return 0
+        newline = self.buffer.find(b"\n", offset - 1, self.stop)
+        return self.stop if newline < 0 else newline + 1
+
+    def line_end(self, start: int) -> int:
+        """
+        The offset just past the newline ending the line starting at byte
+        `start`, or `stop` if the line is incomplete.
+        """
+        newline = self.buffer.find(b"\n", start, self.stop)
+        return self.stop if newline < 0 else newline + 1
+
+    def epoch_at(self, start: int) -> Optional[int]:
+        """
+        The epoch second logged by the first line with a timestamp starting
+        at or after the byte `start`, or None if there is none nearby. Lines
+        whose bracketed text is not a timestamp are skipped.
+        """
+        for _ in range(MAX_SKIPPED_LINES):
+            if start >= self.stop:
+                return None
+            end = self.line_end(start)
+            match = TIMESTAMP_BYTES.search(self.buffer, start, end)
+            if match:
+                date, time = match.groups()
+                try:
+                    return decode_epoch(f"{date.decode()} {time.decode()}")
+                except ValueError:
+                    pass
+            start = end
+        return None
+
+    def offset_since(self, epoch: int) -> int:
+        """
+        The offset of the first line logged at or after the epoch second
+        `epoch`, found by binary search, or `stop` if there is none.
+        """
+        low, high = 0, self.stop
+        while low < high:
+            middle = (low + high) // 2
+            logged_at = self.epoch_at(self.line_start(middle))
+            if logged_at is None or logged_at >= epoch:
+                high = middle
+            else:
+                low = middle + 1
+        return self.line_start(low)
+
+    def lines(self, start: int = 0) -> Iterator[bytes]:
+        """
+        Yield every complete line from the byte `start` up to `stop`, without
+        its newline, as bytes.
+        """
+        while start < self.stop:
+            end = self.buffer.find(b"\n", start, self.stop)
+            if end < 0:
+                return
+            if end > start:
+                yield self.buffer[start:end]
+            start = end + 1
+
+    def entries_since(self,
+                      epoch: int,
+                      entry_format: Optional[Pattern] = None) -> List[LogLine]:
+        """
+        Parse every complete line logged from the epoch second `epoch`
+        onward. Only these lines are decoded, each with a single decode.
+        Lines that fail to parse are dropped.
+        """
+        entries = (LogLine.from_log_line(line.decode("utf-8", "replace"),
+                                         entry_format)
+                   for line in self.lines(self.offset_since(epoch)))
+        return [entry for entry in entries if entry]
+
+    def last_line(self) -> bytes:
+        """
+        The last non-empty line before `stop`, complete or not, without its
+        newline, or b"" if there is none.
+        """
+        end = self.stop
+        while end > 0 and self.buffer[end - 1:end] == b"\n":
+            end -= 1
+        start = self.buffer.rfind(b"\n", 0, end) + 1
+        return self.buffer[start:end]
+
+    def close(self) -> None:
+        """Unmap the log and close it."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+    def __enter__(self) -> "MappedLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
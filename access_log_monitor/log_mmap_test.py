@@ -0,0 +1,84 @@
+from .log_line import LogLine
+from .log_manager import LogManager
+from .log_mmap import MappedLog
+from .log_timestamps import decode_epoch
+
+
+def sample_lines(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        return sample_log.read().splitlines()
+
+
+def epoch_of(line):
+    entry = LogLine.from_log_line(line)
+    return decode_epoch(entry.timestamp)
+
+
+def test_offset_since_finds_first_line_logged_at_or_after(sample_log_path):
+    lines = sample_lines(sample_log_path)
+    with MappedLog(sample_log_path) as log:
+        first = epoch_of(lines[0])
+        assert log.offset_since(first - 10) == 0
+        assert log.offset_since(first + 1) == len(lines[0]) + 1
+        assert log.offset_since(first + 4) == sum(
+            len(line) + 1 for line in lines[:5])
+        assert log.offset_since(first + 60) == log.stop
+
+
+def test_offset_since_skips_unparseable_lines(tmp_path, sample_log_path):
+    lines = sample_lines(sample_log_path)
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(lines[:3] + ["garbage"] * 3 + lines[3:]) + "\n")
+
+    with MappedLog(str(path)) as log:
+        start = log.offset_since(epoch_of(lines[3]))
+        assert next(log.lines(start)) == b"garbage"
+        entries = log.entries_since(epoch_of(lines[3]))
+    assert entries == [LogLine.from_log_line(line) for line in lines[3:]]
+
+
+def test_offset_since_skips_bracketed_text_that_is_not_a_timestamp(
+        tmp_path, sample_log_path):
+    lines = sample_lines(sample_log_path)
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(lines[:3] + ["bad line [note: x]"] + lines[3:]) +
+                    "\n")
+
+    with MappedLog(str(path)) as log:
+        entries = log.entries_since(epoch_of(lines[3]))
+    assert entries == [LogLine.from_log_line(line) for line in lines[3:]]
+
+
+def test_lines_stop_at_the_last_complete_line(tmp_path, sample_log_path):
+    lines = sample_lines(sample_log_path)
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(lines))
+
+    with MappedLog(str(path)) as log:
+        assert len(list(log.lines())) == len(lines) - 1
+        assert log.last_line() == lines[-1].encode()
+    with MappedLog(str(path), stop=len(lines[0]) + 1) as log:
+        assert list(log.lines()) == [lines[0].encode()]
+
+
+def test_empty_logs_can_be_mapped(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text("")
+    with MappedLog(str(path)) as log:
+        assert log.offset_since(0) == 0
+        assert log.entries_since(0) == []
+        assert log.last_line() == b""
+
+
+def test_manager_reads_entries_since_up_to_its_offset(tmp_path,
+                                                      sample_log_path):
+    lines = sample_lines(sample_log_path)
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(lines[:8]) + "\n")
+    log_mgr = LogManager(str(path))
+    with open(path, "a") as log:
+        log.write("\n".join(lines[8:]) + "\n")
+
+    entries = log_mgr.read_entries_since(epoch_of(lines[5]))
+    assert entries == [LogLine.from_log_line(line) for line in lines[5:8]]
+    assert len(log_mgr.read_entries()) == 2
@@ -1,25 +1,219 @@
-from typing import List
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
 
 from .log_analyzer import LogAnalyzer
 from .log_manager import LogManager
+from .log_metrics import COUNT_BUCKETS, NO_METRICS, MetricsRegistry
 from .log_monitors import LogMonitor
 from .log_store import LogStore
+from .log_utils import epoch_seconds, now_utc
+from .log_watcher import LogWatcher
 
+# Descriptions of the metrics recorded by the monitoring loop
+TICK_SECONDS = "Time per iteration of the monitoring loop."
+TICKS_TOTAL = "Iterations of the monitoring loop."
+READ_SECONDS = "Time to read and parse the lines appended to the log."
+STORE_WRITE_SECONDS = "Time to write a batch of entries to the datastore."
+ENTRIES_PER_TICK = "Entries ingested from the log per iteration."
+MONITOR_SECONDS = "Time per run of a monitor."
 
-def perform_monitoring(log: LogManager, datastore: LogStore,
+
+def catch_up(log: LogManager,
+             datastore: LogStore,
+             window_sec: int,
+             current_time: Optional[datetime] = None) -> int:
+    """
+    Seed the datastore with the entries already in the log that were logged
+    in the last `window_sec` seconds, so that monitors start from a full
+    window rather than an empty one. The log is binary-searched for the start
+    of the window, so the cost is proportional to the window, not the log.
+
+    Return the number of entries loaded.
+    """
+    since = epoch_seconds(current_time or now_utc()) - window_sec
+    entries = log.read_entries_since(since)
+    datastore.add_many(entries)
+    return len(entries)
+
+
+def resume_history(log: LogManager, datastore: LogStore) -> List[LogStore]:
+    """
+    Load into each of the stores `datastore` writes to that survives a
+    restart the entries logged from where it last read `log` up to (see
+    LogStore.history_until) to where tailing resumes, so that it holds each
+    entry exactly once.
+
+    Return the stores still to be loaded with history as if empty: those
+    that hold none of the log, or whose position in it can no longer be found
+    (e.g. the log has since been rotated twice).
+    """
+    fresh = []
+    for store in datastore.members():
+        position = store.history_until(log.path)
+        lines = log.read_lines_from(position) if position else None
+        if lines is None:
+            fresh.append(store)
+        else:
+            store.add_many(log.parse(lines))
+            store.mark_history(log.path, log.snapshot())
+    return fresh
+
+
+def perform_monitoring(log: LogManager,
+                       datastore: LogStore,
                        analyzer: LogAnalyzer,
-                       monitors: List[LogMonitor]) -> None:
+                       monitors: List[LogMonitor],
+                       metrics: MetricsRegistry = NO_METRICS) -> int:
     """
     Perform a single iteration of log monitoring.
 
-    When the file has been updated, read the most recent entry and persist it
-    to the datastore.
+    Read every complete line appended to the log since the previous iteration
+    and persist the parsed entries to the datastore as a single batch.
 
     At every iteration, perform monitoring tasks delegated to LogMonitor
     objects.
+
+    The iteration, and each of its stages, is timed in `metrics`. Return the
+    number of entries ingested.
+    """
+    with metrics.lock, metrics.histogram("tick_seconds",
+                                         TICK_SECONDS).time():
+        ingested = ingest(log, datastore, metrics)
+        for monitor in monitors:
+            run_monitor(monitor, analyzer, metrics)
+    metrics.counter("ticks_total", TICKS_TOTAL).inc()
+    return ingested
+
+
+def ingest(log: LogManager,
+           datastore: LogStore,
+           metrics: MetricsRegistry = NO_METRICS) -> int:
     """
-    if log.has_been_updated:
-        entry = log.last_entry
-        datastore.add(entry)
-    for monitor in monitors:
+    Read every complete line appended to `log` since the last read, and
+    persist the parsed entries to `datastore` as a single batch, timing
+    both in `metrics`, then mark where the log was read up to (see
+    LogStore.mark_history). Return the number of entries.
+    """
+    with metrics.histogram("read_seconds", READ_SECONDS, log=log.path).time():
+        entries = log.read_entries()
+    with metrics.histogram("store_write_seconds", STORE_WRITE_SECONDS,
+                           log=log.path).time():
+        datastore.add_many(entries)
+        if entries:
+            datastore.mark_history(log.path, log.snapshot())
+    metrics.histogram("entries_per_tick", ENTRIES_PER_TICK, COUNT_BUCKETS,
+                      log=log.path).observe(len(entries))
+    return len(entries)
+
+
+def run_monitor(monitor: LogMonitor,
+                analyzer: LogAnalyzer,
+                metrics: MetricsRegistry = NO_METRICS) -> None:
+    """Process `monitor` with `analyzer`, timing it in `metrics`."""
+    with metrics.histogram("monitor_seconds", MONITOR_SECONDS,
+                           monitor=type(monitor).__name__).time():
         monitor.process(analyzer)
+
+
+def monitor_continuously(log: LogManager,
+                         datastore: LogStore,
+                         analyzer: LogAnalyzer,
+                         monitors: List[LogMonitor],
+                         watcher: LogWatcher,
+                         tick_sec: float = 1.0,
+                         metrics: MetricsRegistry = NO_METRICS,
+                         duration_sec: Optional[float] = None,
+                         max_entries: Optional[int] = None) -> int:
+    """
+    Perform log monitoring indefinitely, or, if given, until `duration_sec`
+    seconds have passed or `max_entries` entries have been ingested. Return
+    the number of entries ingested.
+
+    Between iterations, block on `watcher` until the log changes, waking at
+    least every `tick_sec` seconds (or sooner, if a monitor is due) so that
+    time-based monitors still fire on schedule while the log is idle.
+    """
+    stop_at = deadline(duration_sec)
+    ingested = 0
+    while True:
+        ingested += perform_monitoring(
+            log=log,
+            datastore=datastore,
+            analyzer=analyzer,
+            monitors=monitors,
+            metrics=metrics)
+        remaining = stop_at - time.monotonic()
+        if remaining <= 0 or (max_entries is not None
+                              and ingested >= max_entries):
+            return ingested
+        timeout = min([tick_sec, remaining] +
+                      [m.seconds_until_due() for m in monitors])
+        watcher.wait(timeout=timeout)
+
+
+def perform_monitoring_many(logs: Iterable[Tuple[LogManager, LogStore]],
+                            monitors: Iterable[Tuple[LogMonitor, LogAnalyzer]],
+                            changed: Optional[Set[str]] = None,
+                            metrics: MetricsRegistry = NO_METRICS) -> int:
+    """
+    Perform a single iteration of monitoring several logs at once.
+
+    Read every complete line appended to each of the `logs` whose path is in
+    `changed` (or to all of them, if `changed` is None), persisting each
+    log's entries to its datastore as a single batch. Idle logs are not read.
+
+    Then perform every monitoring task, each with its own analyzer.
+
+    The iteration, and each of its stages, is timed in `metrics`. Return the
+    number of entries ingested.
+    """
+    ingested = 0
+    with metrics.lock, metrics.histogram("tick_seconds",
+                                         TICK_SECONDS).time():
+        for log, datastore in logs:
+            if changed is None or log.path in changed:
+                ingested += ingest(log, datastore, metrics)
+        for monitor, analyzer in monitors:
+            run_monitor(monitor, analyzer, metrics)
+    metrics.counter("ticks_total", TICKS_TOTAL).inc()
+    return ingested
+
+
+def monitor_many(logs: List[Tuple[LogManager, LogStore]],
+                 monitors: List[Tuple[LogMonitor, LogAnalyzer]],
+                 watcher: LogWatcher,
+                 tick_sec: float = 1.0,
+                 metrics: MetricsRegistry = NO_METRICS,
+                 duration_sec: Optional[float] = None,
+                 max_entries: Optional[int] = None) -> int:
+    """
+    Perform monitoring of several logs in one loop, indefinitely, or, if
+    given, until `duration_sec` seconds have passed or `max_entries` entries
+    have been ingested. Return the number of entries ingested.
+
+    Between iterations, block on `watcher`, which watches every log, until
+    any of them changes, waking at least every `tick_sec` seconds (or sooner,
+    if a monitor is due). Only the logs the watcher reports changed are read.
+    """
+    stop_at = deadline(duration_sec)
+    ingested = 0
+    changed: Optional[Set[str]] = None
+    while True:
+        ingested += perform_monitoring_many(
+            logs=logs, monitors=monitors, changed=changed, metrics=metrics)
+        remaining = stop_at - time.monotonic()
+        if remaining <= 0 or (max_entries is not None
+                              and ingested >= max_entries):
+            return ingested
+        timeout = min([tick_sec, remaining] +
+                      [m.seconds_until_due() for m, _ in monitors])
+        watcher.wait(timeout=timeout)
+        changed = watcher.changed
+
+
+def deadline(duration_sec: Optional[float]) -> float:
+    """The monotonic time `duration_sec` seconds from now, or inf if None."""
+    if duration_sec is None:
+        return float("inf")
+    return time.monotonic() + duration_sec
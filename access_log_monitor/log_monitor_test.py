@@ -5,9 +5,12 @@ from freezegun import freeze_time
 
 from .log_analyzer import LogAnalyzer
 from .log_manager import LogManager
-from .log_monitor import perform_monitoring
+from .log_metrics import MetricsRegistry
+from .log_monitor import (catch_up, perform_monitoring,
+                          perform_monitoring_many, resume_history)
 from .log_monitors import AlertingMonitor
-from .log_store import DequeDataStore
+from .log_store import DequeDataStore, SqliteDataStore, TeeDataStore
+from .log_utils import now_utc
 
 
 @pytest.mark.skip("TBD")
@@ -126,3 +129,131 @@ def test_return_to_normal_traffic_alerting(capsys, project_root):
 
     # teardown temp file
     os.remove(temp_file)
+
+
+@freeze_time("2018-09-11 3:30:00", tz_offset=0)
+def test_catch_up_seeds_the_window_from_the_log(tmp_path, sample_log_path):
+    temp_file = tmp_path / "access.log"
+    with open(sample_log_path) as sample_log:
+        temp_file.write_text(sample_log.read())
+
+    log_mgr = LogManager(path=str(temp_file))
+    datastore = DequeDataStore()
+    analyzer = LogAnalyzer(datastore)
+
+    assert catch_up(log_mgr, datastore, window_sec=8) == 6
+    assert analyzer.count(since=now_utc(minute=29, second=52)) == 6
+    assert log_mgr.read_entries() == []
+
+
+@freeze_time("2018-09-11 3:30:00", tz_offset=0)
+def test_resume_history_loads_only_what_a_persistent_store_lacks(
+        tmp_path, sample_log_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    log_path, database = tmp_path / "access.log", str(tmp_path / "log.db")
+    log_path.write_text("")
+
+    datastore = SqliteDataStore(database)
+    log_mgr = LogManager(path=str(log_path))
+    assert resume_history(log_mgr, datastore) == [datastore]
+    log_path.write_text("".join(lines[:6]))
+    perform_monitoring(log_mgr, datastore, LogAnalyzer(datastore), [])
+    datastore.datastore.close()
+
+    # restarted, after more was logged, some in the same second as the last
+    # entry held
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[6:])
+    datastore = SqliteDataStore(database)
+    assert resume_history(LogManager(path=str(log_path)), datastore) == []
+    assert datastore.count(since=now_utc(minute=29)) == 10
+    datastore.datastore.close()
+
+    datastore = SqliteDataStore(database)
+    assert resume_history(LogManager(path=str(log_path)), datastore) == []
+    assert datastore.count(since=now_utc(minute=29)) == 10
+
+    # the log replaced by one that does not continue it
+    datastore.datastore.close()
+    log_path.write_text("".join(lines[:4]))
+    datastore = SqliteDataStore(database)
+    assert resume_history(LogManager(path=str(log_path)),
+                          datastore) == [datastore]
+
+
+@freeze_time("2018-09-11 3:30:00", tz_offset=0)
+def test_resume_history_leaves_stores_that_start_empty_to_be_loaded(
+        tmp_path, sample_log_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    log_path, database = tmp_path / "access.log", str(tmp_path / "log.db")
+    log_path.write_text("")
+
+    log_mgr = LogManager(path=str(log_path))
+    datastore = TeeDataStore(DequeDataStore(), SqliteDataStore(database))
+    log_path.write_text("".join(lines[:5]))
+    perform_monitoring(log_mgr, datastore, LogAnalyzer(datastore), [])
+    datastore.stores[1].datastore.close()
+
+    # restarted, after more was logged
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[5:])
+    log_mgr = LogManager(path=str(log_path))
+    deque, sqlite = DequeDataStore(), SqliteDataStore(database)
+    assert resume_history(log_mgr, TeeDataStore(deque, sqlite)) == [deque]
+    assert sqlite.count(since=now_utc(minute=29)) == 10
+    assert deque.size() == 0
+    assert catch_up(log_mgr, deque, 60) == 10
+
+
+def test_perform_monitoring_many_reads_only_changed_logs(
+        tmp_path, sample_log_path):
+    paths = [str(tmp_path / "a.log"), str(tmp_path / "b.log")]
+    for path in paths:
+        open(path, "w").close()
+    logs = [LogManager(path=path) for path in paths]
+    merged = DequeDataStore()
+    own = [DequeDataStore() for _ in paths]
+    feeds = [(log, TeeDataStore(store, merged))
+             for log, store in zip(logs, own)]
+
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    for path in paths:
+        with open(path, "a") as log:
+            log.writelines(lines)
+
+    perform_monitoring_many(feeds, monitors=[], changed={paths[0]})
+    assert [len(store.datastore) for store in own] == [10, 0]
+    assert len(merged.datastore) == 10
+
+    perform_monitoring_many(feeds, monitors=[], changed=None)
+    assert [len(store.datastore) for store in own] == [10, 10]
+    assert len(merged.datastore) == 20
+
+
+def test_perform_monitoring_times_each_stage(tmp_path, sample_log_path):
+    temp_file = tmp_path / "access.log"
+    temp_file.write_text("")
+    metrics = MetricsRegistry()
+    log_mgr = LogManager(path=str(temp_file), metrics=metrics)
+    datastore = DequeDataStore()
+    analyzer = LogAnalyzer(datastore, metrics)
+    alerting = AlertingMonitor(threshold_rps=1, interval_sec=60)
+
+    with open(sample_log_path) as sample_log:
+        temp_file.write_text(sample_log.read())
+    for _ in range(2):
+        perform_monitoring(log_mgr, datastore, analyzer, [alerting], metrics)
+
+    path = str(temp_file)
+    assert metrics.counter("ticks_total", "").value == 2
+    assert metrics.histogram("tick_seconds", "").count == 2
+    assert metrics.histogram("read_seconds", "", log=path).count == 2
+    assert metrics.histogram("store_write_seconds", "", log=path).count == 2
+    assert metrics.histogram("entries_per_tick", "", log=path).sum == 10
+    assert metrics.histogram("count_seconds", "").count == 2
+    monitor = metrics.histogram("monitor_seconds", "",
+                                monitor="AlertingMonitor")
+    assert monitor.count == 2
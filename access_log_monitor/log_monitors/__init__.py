@@ -1,3 +1,5 @@
 from .alerting_monitor import AlertingMonitor  # noqa
+from .checkpoint_monitor import CheckpointMonitor  # noqa
 from .log_monitor import LogMonitor  # noqa
 from .reporting_monitor import ReportingMonitor  # noqa
+from .stats_monitor import StatsMonitor  # noqa
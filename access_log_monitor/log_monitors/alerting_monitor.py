@@ -1,8 +1,9 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from inspect import cleandoc
+from typing import Optional
 
 from access_log_monitor.log_analyzer import LogAnalyzer
-from access_log_monitor.log_utils import now_utc
+from access_log_monitor.log_utils import epoch_seconds, now_utc
 
 from .log_monitor import LogMonitor
 
@@ -16,17 +17,27 @@ class AlertingMonitor(LogMonitor):
     high-traffic alert. If and when traffic falls back below the threshold
     level, issues a recovery alert.
 
+    Has the analyzer track its window, so that each check costs O(1) rather
+    than a scan of the window.
+
+    Alerts name the monitored log(s) as `label`, if given.
+
     TODO: Extract printing
     """
 
-    def __init__(self, threshold_rps: int, interval_sec: int) -> None:
+    def __init__(self,
+                 threshold_rps: int,
+                 interval_sec: int,
+                 label: Optional[str] = None) -> None:
         self.threshold_rps = threshold_rps
         self.interval_sec = interval_sec
         self.interval_delta = timedelta(seconds=interval_sec)
         self.in_alerted_state = False
-        self.alert_start = None
+        self.alert_start: Optional[datetime] = None
+        self.tag = f" [{label}]" if label else ""
 
     def process(self, analyzer: LogAnalyzer) -> None:
+        analyzer.track_window(self.interval_sec)
         curr_time = now_utc()
         interval_start = curr_time - self.interval_delta
         avg_reqs_per_sec = analyzer.requests_per_second(
@@ -37,6 +48,18 @@ class AlertingMonitor(LogMonitor):
         else:
             self.__recover_from_alert(curr_time)
 
+    def snapshot(self) -> list:
+        """Whether an alert is in progress, and when it started (epoch)."""
+        alert_start = self.alert_start
+        return [self.in_alerted_state,
+                epoch_seconds(alert_start) if alert_start else None]
+
+    def restore(self, snapshot: list) -> None:
+        in_alerted_state, alert_start = snapshot
+        self.in_alerted_state = in_alerted_state
+        self.alert_start = (datetime.fromtimestamp(alert_start, timezone.utc)
+                            if alert_start is not None else None)
+
     def __trigger_alert(self, curr_time, avg_reqs_per_sec):
         """
         Internal. No-ops unless not currently in alerted state.
@@ -51,7 +74,7 @@ class AlertingMonitor(LogMonitor):
         self.alert_start = curr_time
 
         alert = f"""
-        [ALERT] High traffic generated an alert - hits/sec: {avg_reqs_per_sec}, triggered at {curr_time}.
+        [ALERT]{self.tag} High traffic generated an alert - hits/sec: {avg_reqs_per_sec}, triggered at {curr_time}.
         """
         print(cleandoc(alert), "\n")
 
@@ -71,6 +94,6 @@ class AlertingMonitor(LogMonitor):
         self.alert_start = None
 
         recover_message = f"""
-        [ALERT] High traffic alert recovered at {curr_time}. Duration: {alert_duration}s.
+        [ALERT]{self.tag} High traffic alert recovered at {curr_time}. Duration: {alert_duration}s.
         """
         print(cleandoc(recover_message), "\n")
@@ -48,3 +48,12 @@ def test_process_no_ops_if_alerted_and_above_threshold_rps(mocker, capsys):
 
     out, _ = capsys.readouterr()
     assert out == ""
+
+
+def test_process_tracks_window_of_interval_length(mocker):
+    fake_analyzer = mocker.Mock(**{"requests_per_second.return_value": 0.5})
+    monitor = AlertingMonitor(threshold_rps=1, interval_sec=30)
+
+    monitor.process(analyzer=fake_analyzer)
+
+    fake_analyzer.track_window.assert_called_with(30)
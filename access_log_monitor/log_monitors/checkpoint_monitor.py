@@ -0,0 +1,132 @@
+from datetime import timedelta
+from typing import Dict, List
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_checkpoint import read_checkpoint, write_checkpoint
+from access_log_monitor.log_manager import LogManager
+from access_log_monitor.log_metrics import NO_METRICS, MetricsRegistry
+from access_log_monitor.log_store import LogStore
+from access_log_monitor.log_utils import (epoch_seconds, is_interval_complete,
+                                          now_utc)
+
+from .log_monitor import LogMonitor
+
+
+class CheckpointMonitor(LogMonitor):
+    """
+    Checkpoints the monitor's state to the file `path` at set intervals of
+    length (in seconds) `interval_sec`, so that a restart can carry on from
+    the checkpoint (see `resume`) rather than replay the log or start blind:
+
+    - where reading each of `logs` had reached (see LogManager.snapshot)
+    - the traffic retained by each of `stores`, by name, for stores that can
+      be snapshotted (the aggregate stores: buckets and rollups)
+    - the state of each of `monitors`, by name: alerts in progress and the
+      start of the current reporting interval
+
+    Checkpoints are written atomically, in a compact binary format (see
+    log_checkpoint). Must be processed last in each iteration, after the logs
+    have been read and the other monitors processed, so that the positions,
+    stores and monitors checkpointed agree with one another.
+
+    Checkpoint write times and sizes are recorded in `metrics`.
+    """
+
+    def __init__(self,
+                 path: str,
+                 interval_sec: int,
+                 logs: List[LogManager],
+                 stores: Dict[str, LogStore],
+                 monitors: Dict[str, LogMonitor],
+                 metrics: MetricsRegistry = NO_METRICS) -> None:
+        self.path = path
+        self.interval_sec = interval_sec
+        self.interval_delta = timedelta(seconds=interval_sec)
+        self.interval_start = now_utc()
+        self.logs = logs
+        self.stores = stores
+        self.monitors = monitors
+        self.write_seconds = metrics.histogram(
+            "checkpoint_write_seconds", "Time to write a checkpoint.")
+        self.size_bytes = metrics.gauge(
+            "checkpoint_bytes", "Size of the most recent checkpoint.")
+
+    def process(self, analyzer: LogAnalyzer) -> None:
+        curr_time = now_utc()
+        if is_interval_complete(
+                start_time=self.interval_start,
+                delta=self.interval_delta,
+                current_time=curr_time):
+            self.write()
+            self.interval_start = curr_time
+
+    def write(self) -> int:
+        """Write a checkpoint now. Return its size in bytes."""
+        with self.write_seconds.time():
+            size = write_checkpoint(self.path, self.snapshot())
+        self.size_bytes.set(size)
+        return size
+
+    def snapshot(self) -> dict:
+        """The state to checkpoint, as plain data."""
+        return {
+            "written_at": epoch_seconds(now_utc()),
+            "logs": {log.path: log.snapshot()
+                     for log in self.logs},
+            "stores": {name: [type(store).__name__, store.snapshot()]
+                       for name, store in self.stores.items()},
+            "monitors": {name: monitor.snapshot()
+                         for name, monitor in self.monitors.items()},
+        }
+
+    def resume(self) -> bool:
+        """
+        Restore the state checkpointed at `path`, if any: each of the logs
+        resumes reading from its checkpointed position, if its file is still
+        to be found (see LogManager.restore), and, if every log resumed, each
+        of the monitors resumes from its checkpointed state.
+
+        Return True if the stores were restored too, so that nothing logged
+        before the checkpointed positions need be reloaded. That requires
+        every log to have resumed and every store to have been snapshotted
+        by a store of its kind. Otherwise the stores are left empty, to be
+        loaded from the logs up to wherever they resume.
+
+        An unreadable checkpoint is reported and ignored.
+        """
+        try:
+            state = read_checkpoint(self.path)
+        except ValueError as err:
+            print(f"[INFO] Ignoring checkpoint at {self.path}: {err}\n")
+            return False
+        if state is None:
+            return False
+
+        positions = state["logs"]
+        resumed = [
+            log.path in positions and log.restore(positions[log.path])
+            for log in self.logs
+        ]
+        if not all(resumed):
+            return False
+
+        for name, monitor in self.monitors.items():
+            if name in state["monitors"]:
+                monitor.restore(state["monitors"][name])
+
+        snapshots = {
+            name: snapshot
+            for name, (kind, snapshot) in state["stores"].items()
+            if name in self.stores and snapshot is not None
+            and self.stores[name].__class__.__name__ == kind
+        }
+        if snapshots.keys() != self.stores.keys():
+            return False
+
+        for name, store in self.stores.items():
+            store.restore(snapshots[name])
+        return True
+
+    def seconds_until_due(self) -> float:
+        elapsed = now_utc() - self.interval_start
+        return max((self.interval_delta - elapsed).total_seconds(), 0.0)
@@ -0,0 +1,131 @@
+import os
+from datetime import datetime, timezone
+
+from freezegun import freeze_time
+
+from ..log_manager import LogManager
+from ..log_monitor import ingest
+from ..log_store import BucketedDataStore, DequeDataStore
+from ..log_utils import now_utc
+from .alerting_monitor import AlertingMonitor
+from .checkpoint_monitor import CheckpointMonitor
+from .reporting_monitor import ReportingMonitor
+
+SINCE = datetime(2018, 9, 11, tzinfo=timezone.utc)
+
+
+def start(log_path, checkpoint_path, store):
+    """A monitor of `log_path` checkpointing to `checkpoint_path`."""
+    log = LogManager(str(log_path))
+    alerting = AlertingMonitor(threshold_rps=1, interval_sec=60)
+    reporting = ReportingMonitor(interval_sec=10)
+    checkpointer = CheckpointMonitor(
+        str(checkpoint_path), 5, [log], {"log": store}, {
+            "alerting": alerting,
+            "reporting": reporting
+        })
+    return log, alerting, reporting, checkpointer
+
+
+@freeze_time("3:00:00pm")
+def test_process_checkpoints_at_end_of_each_interval(mocker, tmp_path):
+    log_path, checkpoint_path = tmp_path / "access.log", tmp_path / "ckpt"
+    log_path.write_text("")
+    *_, checkpointer = start(log_path, checkpoint_path, BucketedDataStore(60))
+
+    with freeze_time("3:00:04pm"):
+        checkpointer.process(analyzer=mocker.Mock())
+        assert not checkpoint_path.exists()
+        assert checkpointer.seconds_until_due() == 1.0
+
+    with freeze_time("3:00:05pm"):
+        checkpointer.process(analyzer=mocker.Mock())
+        assert checkpoint_path.exists()
+        assert checkpointer.seconds_until_due() == 5.0
+
+
+def test_resume_restores_positions_stores_and_monitors(sample_log_path,
+                                                       tmp_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    log_path, checkpoint_path = tmp_path / "access.log", tmp_path / "ckpt"
+    log_path.write_text("")
+
+    store = BucketedDataStore(window_sec=60)
+    log, alerting, reporting, checkpointer = start(log_path, checkpoint_path,
+                                                   store)
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[:6])
+    ingest(log, store)
+    alerting.in_alerted_state, alerting.alert_start = True, now_utc()
+    checkpointer.write()
+
+    # logged while the monitor was down
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[6:])
+
+    restored = BucketedDataStore(window_sec=60)
+    log, alerting_2, reporting_2, checkpointer = start(
+        log_path, checkpoint_path, restored)
+    assert checkpointer.resume() is True
+    assert ingest(log, restored) == 4
+    assert restored.count(SINCE) == 10
+    assert alerting_2.in_alerted_state is True
+    assert alerting_2.alert_start == alerting.alert_start
+    assert reporting_2.interval_start == reporting.interval_start
+
+
+def test_resume_after_checkpointing_a_rotated_log(sample_log_path, tmp_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    log_path, checkpoint_path = tmp_path / "access.log", tmp_path / "ckpt"
+    log_path.write_text("")
+
+    store = BucketedDataStore(window_sec=60)
+    log, *_, checkpointer = start(log_path, checkpoint_path, store)
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[:6])
+    os.rename(log_path, f"{log_path}.1")
+    # the new log holds only part of its first line when checkpointed
+    log_path.write_text(lines[6][:10])
+    assert ingest(log, store) == 6
+    checkpointer.write()
+
+    with open(log_path, "a") as log_file:
+        log_file.writelines([lines[6][10:], *lines[7:]])
+
+    restored = BucketedDataStore(window_sec=60)
+    log, *_, checkpointer = start(log_path, checkpoint_path, restored)
+    assert checkpointer.resume() is True
+    assert ingest(log, restored) == 4
+    assert restored.count(SINCE) == 10
+
+
+def test_resume_leaves_entry_stores_to_be_reloaded(sample_log_path, tmp_path):
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.readlines()
+    log_path, checkpoint_path = tmp_path / "access.log", tmp_path / "ckpt"
+    log_path.write_text("".join(lines[:6]))
+
+    log, *_, checkpointer = start(log_path, checkpoint_path, DequeDataStore())
+    checkpointer.write()
+    with open(log_path, "a") as log_file:
+        log_file.writelines(lines[6:])
+
+    store = DequeDataStore()
+    log, *_, checkpointer = start(log_path, checkpoint_path, store)
+    assert checkpointer.resume() is False
+    assert len(log.read_entries_since(0)) == 6
+    assert ingest(log, store) == 4
+
+
+def test_resume_ignores_missing_and_unreadable_checkpoints(tmp_path, capsys):
+    log_path, checkpoint_path = tmp_path / "access.log", tmp_path / "ckpt"
+    log_path.write_text("")
+    *_, checkpointer = start(log_path, checkpoint_path, DequeDataStore())
+    assert checkpointer.resume() is False
+
+    checkpoint_path.write_bytes(b"ALMC\x01 torn")
+    assert checkpointer.resume() is False
+    out, _ = capsys.readouterr()
+    assert "[INFO] Ignoring checkpoint" in out
@@ -1,4 +1,6 @@
 import abc
+import asyncio
+from typing import Any
 
 from access_log_monitor.log_analyzer import LogAnalyzer
 
@@ -14,3 +16,30 @@ class LogMonitor(metaclass=abc.ABCMeta):
         Defines the logic to be performed by the monitor each time the target
         log is checked.
         """
+
+    async def process_async(self, analyzer: LogAnalyzer) -> None:
+        """
+        Awaitable variant of `process`, for the asyncio runtime. By default
+        runs `process` in the event loop's default executor, so that a slow
+        monitor never blocks the loop (and with it, ingestion).
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.process, analyzer)
+
+    def seconds_until_due(self) -> float:
+        """
+        The number of seconds until the monitor next has work to do when the
+        log is idle. Monitors with no schedule of their own are never due.
+        """
+        return float("inf")
+
+    def snapshot(self) -> Any:
+        """
+        The monitor's state as plain data, for checkpoints (see
+        log_checkpoint), so that a restarted monitor can carry on where it
+        left off. Monitors without state worth keeping return None.
+        """
+        return None
+
+    def restore(self, snapshot: Any) -> None:
+        """Resume from the state `snapshot`, taken by `snapshot`."""
@@ -1,8 +1,10 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from inspect import cleandoc
+from typing import Optional
 
 from access_log_monitor.log_analyzer import LogAnalyzer
-from access_log_monitor.log_utils import is_interval_complete, now_utc
+from access_log_monitor.log_utils import (epoch_seconds, is_interval_complete,
+                                          now_utc)
 
 from .log_monitor import LogMonitor
 
@@ -11,14 +13,17 @@ class ReportingMonitor(LogMonitor):
     """
     Reports summary statistics at set intervals of length (in seconds)
     `interval_sec` on recent site traffic derived from the target log.
+    Summaries name the monitored log(s) as `label`, if given.
 
     TODO: Extract printing
     """
 
-    def __init__(self, interval_sec: int) -> None:
+    def __init__(self, interval_sec: int,
+                 label: Optional[str] = None) -> None:
         self.interval_sec = interval_sec
         self.interval_delta = timedelta(seconds=interval_sec)
         self.interval_start = now_utc()
+        self.tag = f" [{label}]" if label else ""
 
     def process(self, analyzer: LogAnalyzer) -> None:
         curr_time = now_utc()
@@ -33,8 +38,19 @@ class ReportingMonitor(LogMonitor):
 
             entries = (": ".join(map(str, tup)) for tup in stats.items())
             summary = f"""
-            Traffic Summary {curr_time}
+            Traffic Summary {curr_time}{self.tag}
             ---------------------------
             """
             print(cleandoc(summary))
             print("\n".join(entries), "\n")
+
+    def seconds_until_due(self) -> float:
+        elapsed = now_utc() - self.interval_start
+        return max((self.interval_delta - elapsed).total_seconds(), 0.0)
+
+    def snapshot(self) -> int:
+        """The start of the current reporting interval (epoch)."""
+        return epoch_seconds(self.interval_start)
+
+    def restore(self, snapshot: int) -> None:
+        self.interval_start = datetime.fromtimestamp(snapshot, timezone.utc)
@@ -31,3 +31,15 @@ def test_process_prints_summary_at_end_of_each_interval(mocker, capsys):
         out, _ = capsys.readouterr()
         assert f"Summary {curr_time}" in out
         assert "hits: 10" in out
+
+
+@freeze_time("3:00:30pm")
+def test_seconds_until_due_counts_down_to_end_of_interval():
+    monitor = ReportingMonitor(interval_sec=30)
+    assert monitor.seconds_until_due() == 30.0
+
+    with freeze_time("3:00:50pm"):
+        assert monitor.seconds_until_due() == 10.0
+
+    with freeze_time("3:01:10pm"):
+        assert monitor.seconds_until_due() == 0.0
@@ -0,0 +1,86 @@
+from collections import Counter as Tally
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_metrics import (Histogram, Labels,
+                                            MetricsRegistry, format_labels,
+                                            format_value)
+from access_log_monitor.log_utils import is_interval_complete, now_utc
+
+from .log_monitor import LogMonitor
+
+
+class StatsMonitor(LogMonitor):
+    """
+    Prints a line of the monitor's own metrics at set intervals of length (in
+    seconds) `interval_sec`, so that whether it is keeping up with the log can
+    be seen at a glance:
+
+    - counters as their rate per second over the interval
+    - gauges as their current value
+    - latency histograms as their mean over the interval, in milliseconds,
+      and others as their mean observation over the interval
+
+    Labels are shown only for metrics with several series, e.g. one per log.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, interval_sec: int) -> None:
+        self.metrics = metrics
+        self.interval_sec = interval_sec
+        self.interval_delta = timedelta(seconds=interval_sec)
+        self.interval_start = now_utc()
+        self.previous: Dict[Tuple[str, Labels], Tuple[float, int]] = {}
+
+    def process(self, analyzer: LogAnalyzer) -> None:
+        curr_time = now_utc()
+        if is_interval_complete(
+                start_time=self.interval_start,
+                delta=self.interval_delta,
+                current_time=curr_time):
+            print(self.stats_line(curr_time), "\n")
+            self.interval_start = curr_time
+
+    def stats_line(self, curr_time: datetime) -> str:
+        """
+        The metrics, as of `curr_time`, in a single line. Rates and means
+        cover the time since the previous line.
+        """
+        elapsed = max((curr_time - self.interval_start).total_seconds(), 1.0)
+        stats: List[str] = []
+        with self.metrics.lock:
+            series = list(self.metrics.series())
+            named = Tally(name for name, _, _, _ in series)
+            for name, _, labels, metric in series:
+                shown = name
+                for unit in ("_total", "_seconds"):
+                    if shown.endswith(unit):
+                        shown = shown[:-len(unit)]
+                if named[name] > 1:
+                    shown += format_labels(labels)
+
+                value, count = ((metric.sum, metric.count) if isinstance(
+                    metric, Histogram) else (metric.value, 0))
+                last_value, last_count = self.previous.get((name, labels),
+                                                           (0.0, 0))
+                self.previous[(name, labels)] = (value, count)
+
+                if metric.kind == "counter":
+                    rate = (value - last_value) / elapsed
+                    stats.append(f"{shown}: {rate:.1f}/s")
+                elif metric.kind == "gauge":
+                    stats.append(f"{shown}: {format_value(value)}")
+                elif count == last_count:
+                    stats.append(f"{shown}: -")
+                elif name.endswith("_seconds"):
+                    mean = (value - last_value) / (count - last_count)
+                    stats.append(f"{shown}: {1_000 * mean:.2f}ms")
+                else:
+                    mean = (value - last_value) / (count - last_count)
+                    stats.append(f"{shown}: {mean:.1f}")
+
+        return f"[STATS] {curr_time} " + ", ".join(stats)
+
+    def seconds_until_due(self) -> float:
+        elapsed = now_utc() - self.interval_start
+        return max((self.interval_delta - elapsed).total_seconds(), 0.0)
@@ -0,0 +1,40 @@
+from freezegun import freeze_time
+
+from ..log_metrics import MetricsRegistry
+from .stats_monitor import StatsMonitor
+
+
+@freeze_time("3:00:00pm")
+def test_process_prints_rates_values_and_mean_latencies(mocker, capsys):
+    metrics = MetricsRegistry()
+    lines = metrics.counter("lines_read_total", "", log="a.log")
+    metrics.counter("lines_read_total", "", log="b.log")
+    metrics.gauge("ingest_lag_bytes", "").set(512)
+    tick = metrics.histogram("tick_seconds", "")
+    monitor = StatsMonitor(metrics, interval_sec=10)
+
+    lines.inc(100)
+    tick.observe(0.002)
+    tick.observe(0.004)
+    with freeze_time("3:00:10pm"):
+        monitor.process(analyzer=mocker.Mock())
+    out, _ = capsys.readouterr()
+    assert out.startswith("[STATS] ")
+    assert "ingest_lag_bytes: 512" in out
+    assert 'lines_read{log="a.log"}: 10.0/s' in out
+    assert 'lines_read{log="b.log"}: 0.0/s' in out
+    assert "tick: 3.00ms" in out
+
+    # not yet due
+    with freeze_time("3:00:15pm"):
+        monitor.process(analyzer=mocker.Mock())
+    out, _ = capsys.readouterr()
+    assert out == ""
+
+    # rates and means cover the latest interval only
+    lines.inc(50)
+    with freeze_time("3:00:20pm"):
+        monitor.process(analyzer=mocker.Mock())
+    out, _ = capsys.readouterr()
+    assert 'lines_read{log="a.log"}: 5.0/s' in out
+    assert "tick: -" in out
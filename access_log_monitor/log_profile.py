@@ -0,0 +1,209 @@
+import abc
+import cProfile
+import os
+import pstats
+import signal
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+Function = Tuple[str, str]  # (file name, function name)
+Handler = Union[Callable[[int, Optional[FrameType]], Any], int,
+                signal.Handlers, None]
+
+# The functions that make up each stage of the monitoring loop, by file name
+# and function name. Stages nest: store inserts decode timestamps, and
+# reports summarize the store, as peeks do
+STAGES: Dict[str, FrozenSet[Function]] = {
+    "read": frozenset({("log_manager.py", "read_lines")}),
+    "parse": frozenset({("log_line.py", "from_log_line")}),
+    "timestamp decode": frozenset({
+        ("log_timestamps.py", "decode_datetime"),
+        ("log_timestamps.py", "decode_epoch"),
+    }),
+    "store insert": frozenset({
+        ("log_store.py", "add"),
+        ("log_store.py", "add_many"),
+    }),
+    "peek": frozenset({
+        ("log_store.py", "peek"),
+        ("log_store.py", "count"),
+        ("log_store.py", "count_matching"),
+        ("log_store.py", "summarize"),
+    }),
+    "report": frozenset({("log_analyzer.py", "report")}),
+}
+
+
+class LogProfiler(metaclass=abc.ABCMeta):
+    """
+    Abstract base class for classes that profile the monitoring loop while
+    in use as a context manager, then write the profile to a file and break
+    down the time spent by stage of the loop (see STAGES).
+    """
+
+    extension: str = ""
+
+    def __enter__(self) -> "LogProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @abc.abstractmethod
+    def start(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def write(self, path: str) -> None:
+        """Write the profile to the file `path`."""
+
+    @abc.abstractmethod
+    def total_seconds(self) -> float:
+        """The CPU time profiled, in seconds."""
+
+    @abc.abstractmethod
+    def stage_seconds(self) -> Dict[str, float]:
+        """
+        The CPU time spent in each stage, in seconds, including the stages
+        it calls.
+        """
+
+    def breakdown(self) -> str:
+        """The time spent in each stage, and its share of the total."""
+        total = self.total_seconds() or 1.0
+        lines = [f"{'stage':<18} {'seconds':>9} {'share':>7}"]
+        for stage, seconds in self.stage_seconds().items():
+            lines.append(f"{stage:<18} {seconds:>9.3f} "
+                         f"{100 * seconds / total:>6.1f}%")
+        lines.append(f"{'total':<18} {self.total_seconds():>9.3f}")
+        return "\n".join(lines)
+
+
+class CProfileProfiler(LogProfiler):
+    """
+    Profiles every function call with cProfile, and writes the profile in
+    the pstats format, for `python -m pstats` or snakeviz.
+
+    Calls are timed in CPU time, as the samples of a SamplingProfiler are,
+    so that time spent blocked on the log is not charged to the stages. A
+    stage's time is the cumulative time of the calls into its functions from
+    outside it.
+    """
+
+    extension = ".pstats"
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile(time.process_time)
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def write(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+    def total_seconds(self) -> float:
+        return pstats.Stats(self.profile).total_tt  # type: ignore
+
+    def stage_seconds(self) -> Dict[str, float]:
+        stats = pstats.Stats(self.profile).stats  # type: ignore
+        seconds = {}
+        for stage, functions in STAGES.items():
+            members = {
+                key
+                for key in stats
+                if (os.path.basename(key[0]), key[2]) in functions
+            }
+            seconds[stage] = sum(
+                cumulative
+                for key in members
+                for caller, (_, _, _, cumulative) in stats[key][4].items()
+                if caller not in members)
+        return seconds
+
+
+class SamplingProfiler(LogProfiler):
+    """
+    Samples the main thread's call stack every `interval_sec` seconds of CPU
+    time, on SIGPROF, and writes the samples as collapsed stacks, one
+    `outermost;...;innermost count` line per distinct stack, for
+    flamegraph.pl, speedscope or inferno.
+
+    Much cheaper than cProfile, so the loop runs at close to full speed, at
+    the cost of attributing time statistically: a stage's time is the share
+    of the samples with one of its functions on the stack of the CPU time
+    profiled. (The kernel may coalesce short intervals, so the number of
+    samples alone understates it.)
+    """
+
+    extension = ".folded"
+
+    def __init__(self, interval_sec: float = 0.005) -> None:
+        self.interval_sec = interval_sec
+        self.samples: Counter = Counter()
+        self.previous_handler: Handler = None
+        self.started = self.cpu_sec = 0.0
+
+    def start(self) -> None:
+        self.previous_handler = signal.signal(signal.SIGPROF, self.__sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval_sec,
+                         self.interval_sec)
+        self.started = time.process_time()
+
+    def stop(self) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler or signal.SIG_DFL)
+        self.cpu_sec += time.process_time() - self.started
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as folded:
+            for stack, count in self.samples.most_common():
+                frames = ";".join(f"{name} ({file}:{line})"
+                                  for file, name, line in stack)
+                folded.write(f"{frames} {count}\n")
+
+    def total_seconds(self) -> float:
+        return self.cpu_sec
+
+    def stage_seconds(self) -> Dict[str, float]:
+        seconds = dict.fromkeys(STAGES, 0.0)
+        per_sample = self.cpu_sec / max(sum(self.samples.values()), 1)
+        for stack, count in self.samples.items():
+            on_stack = {(file, name) for file, name, _ in stack}
+            for stage, functions in STAGES.items():
+                if on_stack & functions:
+                    seconds[stage] += count * per_sample
+        return seconds
+
+    def __sample(self, signum, frame) -> None:
+        """Internal. Count the stack of the interrupted `frame`."""
+        stack: List[Tuple[str, str, int]] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((os.path.basename(code.co_filename), code.co_name,
+                          code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        self.samples[tuple(stack)] += 1
+
+
+PROFILERS = {"sampling": SamplingProfiler, "cprofile": CProfileProfiler}
+
+
+def create_profiler(name: str) -> LogProfiler:
+    """
+    Return the LogProfiler named `name` (see PROFILERS). Sampling falls back
+    to cProfile where SIGPROF interval timers are unavailable.
+    """
+    if name == "sampling" and not hasattr(signal, "setitimer"):
+        name = "cprofile"
+    return PROFILERS[name]()
@@ -0,0 +1,64 @@
+import pstats
+import time
+
+from .log_analyzer import LogAnalyzer
+from .log_line import LogLine
+from .log_profile import STAGES, CProfileProfiler, SamplingProfiler
+from .log_store import DequeDataStore
+from .log_timestamps import decode_datetime, decode_epoch
+from .log_utils import now_utc
+
+
+def workload(sample_log_path, seconds=0.0):
+    """Parse, store and report on the sample log, for at least `seconds`."""
+    with open(sample_log_path) as sample_log:
+        lines = sample_log.read().splitlines()
+
+    started = time.process_time()
+    while True:
+        store = DequeDataStore()
+        store.add_many([LogLine.from_log_line(line) for line in lines * 50])
+        LogAnalyzer(store).report(since=now_utc(year=2018))
+        if time.process_time() - started >= seconds:
+            return
+
+
+def test_cprofile_breaks_down_time_by_stage(sample_log_path, tmp_path):
+    # decoded timestamps are cached, so decode the sample's afresh
+    decode_datetime.cache_clear()
+    decode_epoch.cache_clear()
+    with CProfileProfiler() as profiler:
+        workload(sample_log_path)
+
+    stages = profiler.stage_seconds()
+    assert list(stages) == list(STAGES)
+    for stage in ("parse", "timestamp decode", "store insert", "peek",
+                  "report"):
+        assert stages[stage] > 0
+    assert stages["read"] == 0
+    # stages include the stages they call
+    assert stages["report"] >= stages["peek"]
+    assert stages["store insert"] >= stages["timestamp decode"]
+    assert sum(stages.values()) <= 2 * profiler.total_seconds()
+
+    path = str(tmp_path / "profile.pstats")
+    profiler.write(path)
+    assert pstats.Stats(path).total_tt == profiler.total_seconds()
+
+
+def test_sampling_writes_collapsed_stacks(sample_log_path, tmp_path):
+    with SamplingProfiler(interval_sec=0.001) as profiler:
+        workload(sample_log_path, seconds=0.2)
+
+    assert profiler.total_seconds() >= 0.2
+    stages = profiler.stage_seconds()
+    assert stages["parse"] > 0
+    assert max(stages.values()) <= profiler.total_seconds()
+
+    path = tmp_path / "profile.folded"
+    profiler.write(str(path))
+    lines = path.read_text().splitlines()
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert sum(counts) == sum(profiler.samples.values()) > 0
+    assert counts == sorted(counts, reverse=True)
+    assert any("from_log_line (log_line.py:" in line for line in lines)
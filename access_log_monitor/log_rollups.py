@@ -0,0 +1,157 @@
+from typing import (Dict, FrozenSet, Iterator, List, Optional, Sequence,
+                    Tuple)
+
+from .log_aggregates import AggregateFactories
+from .log_buckets import LogBuckets
+from .log_summary import LogSummary
+
+# (resolution, span) in seconds of each level, finest first: per-second
+# buckets for 5 minutes, 10-second buckets for an hour, per-minute buckets for
+# a day and hourly buckets for 30 days
+DEFAULT_LEVELS: Sequence[Tuple[int, int]] = (
+    (1, 5 * 60),
+    (10, 60 * 60),
+    (60, 24 * 60 * 60),
+    (60 * 60, 30 * 24 * 60 * 60),
+)
+
+# Sections kept per bucket, most popular first, at levels coarser than 1s
+MAX_SECTIONS = 100
+
+
+class LogRollups:
+    """
+    A data structure designed to hold aggregated log entries at several
+    resolutions: a LogBuckets per `(resolution_sec, span_sec)` pair in
+    `levels`, finest first, each holding the most recent `span_sec` seconds
+    in buckets of `resolution_sec` seconds. Every entry is counted at every
+    level, so each level is complete over its own span.
+
+    A window is answered from the finest levels that cover it: recent
+    seconds from the finest level, then older, whole coarser buckets from
+    the next, and so on. Only the start of a window reaching past the finest
+    level is rounded, down to a bucket of the coarsest level needed.
+
+    Memory and query time depend on the number of buckets, not the window
+    length or request volume: with the default levels, any window of up to
+    30 days merges at most a few thousand buckets.
+    """
+
+    def __init__(self,
+                 levels: Sequence[Tuple[int, int]] = DEFAULT_LEVELS,
+                 aggregates: Optional[AggregateFactories] = None,
+                 max_sections: Optional[int] = MAX_SECTIONS) -> None:
+        self.aggregates = aggregates if aggregates is not None else {}
+        self.levels: List[LogBuckets] = [
+            LogBuckets(
+                span_sec,
+                self.aggregates,
+                resolution_sec=resolution_sec,
+                max_sections=max_sections if resolution_sec > 1 else None)
+            for resolution_sec, span_sec in levels
+        ]
+
+    def add(self, epoch: int, entry) -> "LogRollups":
+        """
+        Add a log entry logged at the epoch second `epoch` to its bucket at
+        every level.
+        """
+        for level in self.levels:
+            level.add(epoch, entry)
+        return self
+
+    def merge(self, epoch: int, summary: LogSummary) -> "LogRollups":
+        """
+        Fold `summary`, a LogSummary of entries logged at the epoch second
+        `epoch`, into its bucket at every level.
+        """
+        for level in self.levels:
+            level.merge(epoch, summary)
+        return self
+
+    def summarize(self, since: int) -> LogSummary:
+        """
+        Merge the buckets covering every second from the epoch second `since`
+        onward, at the finest resolutions available, into a single LogSummary.
+        """
+        summary = LogSummary(self.aggregates)
+        for level, start, stop in self.__plan(since):
+            summary.merge(level.summarize(start, stop))
+        return summary
+
+    def count(self, since: int) -> int:
+        """Count the entries from the epoch second `since` onward."""
+        return sum(level.count(start, stop)
+                   for level, start, stop in self.__plan(since))
+
+    def count_matching(self, since: int,
+                       filters: Dict[str, FrozenSet[str]]) -> int:
+        """
+        Count the entries from the epoch second `since` onward matching every
+        one of the normalized `filters` (see LogBuckets.count_matching).
+        """
+        return sum(level.count_matching(start, filters, stop)
+                   for level, start, stop in self.__plan(since))
+
+    def buckets(self, since: int) -> Iterator[Tuple[int, LogSummary]]:
+        """
+        Yield (epoch second, LogSummary) pairs for the buckets covering every
+        second from the epoch second `since` onward, oldest first, at the
+        finest resolutions available (see LogBuckets.buckets).
+        """
+        for level, start, stop in reversed(list(self.__plan(since))):
+            yield from level.buckets(start, stop)
+
+    def per_second_hits(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (epoch second, hits) pairs for every retained bucket, oldest
+        first, at the finest resolution available, counting each bucket's
+        hits at its first second.
+        """
+        for level, start, stop in reversed(list(self.__plan(since=0))):
+            for second, hits in level.per_second_hits():
+                if second >= start and (stop is None or second < stop):
+                    yield second, hits
+
+    def snapshot(self) -> list:
+        """
+        The buckets of every level as plain data, for checkpoints (see
+        LogBuckets.snapshot), finest level first.
+        """
+        return [level.snapshot() for level in self.levels]
+
+    def restore(self, snapshot: list) -> "LogRollups":
+        """
+        Merge the buckets of each level of `snapshot`, taken of rollups with
+        the same levels, into the corresponding level.
+        """
+        for level, buckets in zip(self.levels, snapshot):
+            level.restore(buckets)
+        return self
+
+    def __plan(self, since: int
+               ) -> Iterator[Tuple[LogBuckets, int, Optional[int]]]:
+        """
+        Internal. Yield (level, start, stop) triples, newest first, that
+        together cover every second from the epoch second `since` onward:
+        each level answers for the seconds from `start` and before `stop`
+        (or onward, if None). Each boundary is aligned to the resolution of
+        the coarser level below it, which covers only whole buckets.
+        """
+        stop: Optional[int] = None
+        for level, coarser in zip(self.levels, self.levels[1:] + [None]):
+            oldest = level.oldest
+            if oldest is None:
+                return
+            if since >= oldest or coarser is None:
+                yield level, since, stop
+                return
+
+            resolution = coarser.resolution_sec
+            boundary = -(-oldest // resolution) * resolution
+            if stop is None or boundary < stop:
+                yield level, boundary, stop
+                stop = boundary
+
+    def __len__(self):
+        return self.count(since=0)
@@ -0,0 +1,91 @@
+from .log_buckets import LogBuckets
+from .log_line import LogLine
+from .log_rollups import LogRollups
+from .log_summary import LogSummary
+
+START = 1_536_600_000  # a multiple of an hour
+LEVELS = ((1, 60), (10, 600), (60, 3600))
+
+
+def entry(status="200", path="/pages/create"):
+    return LogLine(path=path, status=status, size="100")
+
+
+def one_per_second(rollups, start, stop):
+    for epoch in range(start, stop):
+        status = "500" if epoch % 10 == 0 else "200"
+        rollups.merge(epoch, LogSummary().add(entry(status=status)))
+    return rollups
+
+
+def test_windows_within_the_finest_level_are_exact():
+    rollups = LogRollups(LEVELS)
+    buckets = LogBuckets(window_sec=60)
+    for epoch in (START, START + 1, START + 1, START + 30, START + 59):
+        rollups.add(epoch, entry())
+        buckets.add(epoch, entry())
+
+    for since in (START, START + 1, START + 2, START + 59, START + 60):
+        assert rollups.count(since) == buckets.count(since)
+        assert rollups.summarize(since).hits == buckets.count(since)
+
+
+def test_long_windows_combine_resolutions():
+    latest = START + 3599
+    rollups = one_per_second(LogRollups(LEVELS), START, latest + 1)
+
+    # aligned to the minute level: exact
+    for since in (START, START + 60, START + 1800, START + 3540):
+        summary = rollups.summarize(since)
+        assert rollups.count(since) == summary.hits == latest + 1 - since
+        assert summary.status_classes["5"] == (latest + 10 - since) // 10
+        assert summary.bytes == 100 * summary.hits
+
+    # the finest level covers the last minute exactly
+    assert rollups.count(latest - 45) == 46
+    # older windows start at the beginning of the enclosing 10s bucket
+    assert rollups.count(latest - 95) == 100
+    # and beyond that, of the enclosing minute
+    assert rollups.count(START + 1801) == 1800
+
+
+def test_memory_is_bounded_by_the_number_of_buckets():
+    rollups = one_per_second(LogRollups(LEVELS), START, START + 4 * 3600)
+    assert sum(level.size for level in rollups.levels) == 61 + 61 + 61
+    assert rollups.count(0) == 3600 + 60
+    assert rollups.count(START + 3 * 3600) == 3600
+
+
+def test_per_second_hits_uses_the_finest_resolution_available():
+    rollups = one_per_second(LogRollups(LEVELS), START, START + 3600)
+    hits = list(rollups.per_second_hits())
+
+    assert sum(count for _, count in hits) == 3600
+    seconds = [second for second, _ in hits]
+    assert seconds == sorted(seconds)
+    assert hits[0] == (START, 60)
+    assert hits[-1] == (START + 3599, 1)
+
+
+def test_buckets_cover_a_window_at_the_finest_resolution_available():
+    rollups = one_per_second(LogRollups(LEVELS), START, START + 3600)
+    buckets = list(rollups.buckets(START + 1800))
+
+    assert sum(summary.hits for _, summary in buckets) == 1800
+    assert [second for second, _ in buckets[:2]] == [START + 1800,
+                                                     START + 1860]
+    assert buckets[-1][0] == START + 3599
+    assert next(rollups.buckets(START + 3599))[1].hits == 1
+
+
+def test_coarse_buckets_keep_the_most_popular_sections():
+    rollups = LogRollups(LEVELS, max_sections=1)
+    rollups.add(START, entry(path="/api/user"))
+    rollups.add(START + 1, entry(path="/pages/edit"))
+    rollups.add(START + 2, entry(path="/pages/edit"))
+    rollups.add(START + 60, entry(path="/api/user"))
+
+    fine, _, minutes = rollups.levels
+    assert fine.summarize(START, START + 60).sections == {"pages": 2, "api": 1}
+    assert minutes.summarize(START, START + 60).sections == {"pages": 2}
+    assert minutes.summarize(START).hits == 4
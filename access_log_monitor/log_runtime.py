@@ -0,0 +1,209 @@
+import asyncio
+import time
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from .log_analyzer import LogAnalyzer
+from .log_manager import LogManager
+from .log_metrics import NO_METRICS, MetricsRegistry
+from .log_monitors import LogMonitor
+from .log_store import LogStore
+from .log_monitor import READ_SECONDS, STORE_WRITE_SECONDS
+from .log_watcher import LogWatcher
+
+
+class BackpressureStats:
+    """
+    Counters describing the flow of parsed batches from the ingest task,
+    through the bounded queue, to the consumer task writing to the store.
+
+    `blocked_puts` and `blocked_sec` count how often, and for how long, the
+    ingest task waited for room in a full queue; `max_depth` is the most
+    batches ever waiting at once.
+    """
+
+    __slots__ = ("batches_in", "entries_in", "entries_out", "blocked_puts",
+                 "blocked_sec", "max_depth")
+
+    def __init__(self) -> None:
+        self.batches_in = 0
+        self.entries_in = 0
+        self.entries_out = 0
+        self.blocked_puts = 0
+        self.blocked_sec = 0.0
+        self.max_depth = 0
+
+    @property
+    def backlog(self) -> int:
+        """The number of entries read but not yet written to the store."""
+        return self.entries_in - self.entries_out
+
+    # Descriptions of each counter, and the backlog, as exported metrics
+    DESCRIPTIONS = {
+        "batches_in": "Batches read from the log and queued.",
+        "entries_in": "Entries read from the log and queued.",
+        "entries_out": "Entries written from the queue to the datastore.",
+        "blocked_puts": "Times reading waited for room in a full queue.",
+        "blocked_sec": "Seconds reading waited for room in a full queue.",
+        "max_depth": "The most batches ever waiting in the queue at once.",
+        "backlog": "Entries read but not yet written to the datastore.",
+    }
+
+    def export(self, metrics: MetricsRegistry) -> None:
+        """Expose the counters, and the backlog, as gauges in `metrics`."""
+        for name, description in self.DESCRIPTIONS.items():
+            metrics.gauge(f"runtime_{name}", description,
+                          partial(getattr, self, name))
+
+    def as_dict(self) -> Dict[str, float]:
+        """The counters, and the backlog, by name."""
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["backlog"] = self.backlog
+        return stats
+
+
+class AsyncRuntime:
+    """
+    An asyncio alternative to `monitor_continuously`, running concurrently:
+
+    - an ingest task, reading every line appended to `log` whenever `watcher`
+      reports a change (or every `tick_sec` seconds) and putting the parsed
+      entries on a queue bounded to `queue_size` batches
+    - a consumer task, writing each batch from the queue to `datastore`
+    - a task per monitor, each processing on its own schedule: when it is
+      next due, or every `tick_sec` seconds if it has no schedule
+
+    Monitors run via `LogMonitor.process_async`, off the event loop, so a
+    slow report does not delay reading the log. Writes to the datastore and
+    monitor runs hold a shared lock for the whole run, so monitors always see
+    a consistent datastore; while a monitor holds it, other monitors and
+    writes wait, ingested batches queue up, and once the queue is full,
+    reading waits too. `stats` records this backpressure, and is exported to
+    `metrics`, where reads and writes are also timed.
+    """
+
+    def __init__(self,
+                 log: LogManager,
+                 datastore: LogStore,
+                 analyzer: LogAnalyzer,
+                 monitors: List[LogMonitor],
+                 watcher: LogWatcher,
+                 tick_sec: float = 1.0,
+                 queue_size: int = 64,
+                 metrics: MetricsRegistry = NO_METRICS) -> None:
+        self.log = log
+        self.datastore = datastore
+        self.analyzer = analyzer
+        self.monitors = monitors
+        self.watcher = watcher
+        self.tick_sec = tick_sec
+        self.queue_size = queue_size
+        self.stats = BackpressureStats()
+        self.metrics = metrics
+        self.stats.export(metrics)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Run the ingest, consumer and monitor tasks until `stop` is set (or
+        indefinitely), then write whatever has been queued and return.
+        """
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.lock = asyncio.Lock()
+        stop = stop or asyncio.Event()
+
+        tasks = [asyncio.ensure_future(self.ingest()),
+                 asyncio.ensure_future(self.consume())]
+        tasks += [asyncio.ensure_future(self.schedule(monitor))
+                  for monitor in self.monitors]
+        stopping = asyncio.ensure_future(stop.wait())
+
+        await asyncio.wait(tasks + [stopping],
+                           return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        stopping.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if not task.cancelled() and task.exception():
+                raise task.exception()  # type: ignore
+
+        while not self.queue.empty():
+            self.__write(*self.queue.get_nowait())
+
+    async def ingest(self) -> None:
+        """
+        Read and parse new entries off the event loop, queue them as a
+        single batch, with where the log was read up to, then wait (also off
+        the loop) for the log to change.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            entries, position = await loop.run_in_executor(None, self.__read)
+            if entries:
+                await self.__put(entries, position)
+            await loop.run_in_executor(None, self.watcher.wait, self.tick_sec)
+
+    async def consume(self) -> None:
+        """Write each queued batch to the datastore, holding the lock."""
+        while True:
+            entries, position = await self.queue.get()
+            async with self.lock:
+                self.__write(entries, position)
+
+    async def schedule(self, monitor: LogMonitor) -> None:
+        """
+        Process `monitor` whenever it is next due, or every `tick_sec`
+        seconds if sooner, holding the lock.
+        """
+        while True:
+            async with self.lock:
+                await monitor.process_async(self.analyzer)
+            await asyncio.sleep(min(self.tick_sec,
+                                    monitor.seconds_until_due()))
+
+    async def __put(self, entries: list, position: list) -> None:
+        """
+        Internal. Queue the batch `entries`, read from the log up to
+        `position`, recording whether, and for how long, the queue was full.
+        The batch is counted once queued, so that a put cancelled on stopping
+        does not count as a backlog.
+        """
+        if self.queue.full():
+            self.stats.blocked_puts += 1
+            started = time.monotonic()
+            try:
+                await self.queue.put((entries, position))
+            finally:
+                self.stats.blocked_sec += time.monotonic() - started
+        else:
+            self.queue.put_nowait((entries, position))
+
+        self.stats.batches_in += 1
+        self.stats.entries_in += len(entries)
+        self.stats.max_depth = max(self.stats.max_depth, self.queue.qsize())
+
+    def __read(self) -> Tuple[list, list]:
+        """
+        Internal. Read and parse new entries from the log, timed, returning
+        them with where the log was read up to (see LogManager.snapshot). Runs
+        on an executor thread, so the metrics lock is held only to record the
+        time, not across the read, which would block writes on the loop.
+        """
+        read_seconds = self.metrics.histogram("read_seconds", READ_SECONDS)
+        started = time.perf_counter()
+        entries = self.log.read_entries()
+        elapsed = time.perf_counter() - started
+        with self.metrics.lock:
+            read_seconds.observe(elapsed)
+        return entries, self.log.snapshot()
+
+    def __write(self, entries: list, position: list) -> None:
+        """
+        Internal. Write the batch `entries` to the datastore, timed, then mark
+        `position` as read (see LogStore.mark_history).
+        """
+        with self.metrics.lock, self.metrics.histogram(
+                "store_write_seconds", STORE_WRITE_SECONDS).time():
+            self.datastore.add_many(entries)
+            self.datastore.mark_history(self.log.path, position)
+        self.stats.entries_out += len(entries)
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+from .log_analyzer import LogAnalyzer
+from .log_line import LogLine
+from .log_manager import LogManager
+from .log_metrics import MetricsRegistry
+from .log_monitors import LogMonitor
+from .log_runtime import AsyncRuntime
+from .log_store import DequeDataStore
+from .log_watcher import LogWatcher, PollingWatcher
+
+
+class CountingMonitor(LogMonitor):
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.runs = 0
+
+    def process(self, analyzer):
+        time.sleep(self.delay)
+        self.runs += 1
+
+
+class EndlessLog:
+    """Stands in for a LogManager whose log always has one more entry."""
+
+    def __init__(self, entry) -> None:
+        self.entry = entry
+
+    path = "endless.log"
+
+    def read_entries(self):
+        return [self.entry]
+
+    def snapshot(self):
+        return [0, 0, 0, b""]
+
+
+class LockProbingLog:
+    """
+    Stands in for a LogManager with nothing new to read, noting whether
+    `lock` could be taken by another thread while the log was read.
+    """
+
+    def __init__(self, lock) -> None:
+        self.lock = lock
+        self.lock_free: List[bool] = []
+
+    def read_entries(self):
+        probe = threading.Thread(target=self.probe)
+        probe.start()
+        probe.join()
+        return []
+
+    def snapshot(self):
+        return [0, 0, 0, b""]
+
+    def probe(self):
+        acquired = self.lock.acquire(blocking=False)
+        if acquired:
+            self.lock.release()
+        self.lock_free.append(acquired)
+
+
+class ImpatientWatcher(LogWatcher):
+    def wait(self, timeout):
+        return True
+
+
+def run_until(runtime, done, timeout=5.0):
+    """Run `runtime` until `done()` holds, or `timeout` seconds pass."""
+
+    async def main():
+        stop = asyncio.Event()
+
+        async def watch():
+            deadline = time.monotonic() + timeout
+            while not done() and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            stop.set()
+
+        await asyncio.gather(runtime.run(stop), watch())
+
+    asyncio.run(main())
+
+
+def test_runtime_ingests_appended_lines_and_runs_monitors(
+        tmp_path, sample_log_path):
+    path = str(tmp_path / "access.log")
+    open(path, "w").close()
+
+    datastore = DequeDataStore()
+    monitor = CountingMonitor()
+    runtime = AsyncRuntime(
+        log=LogManager(path=path),
+        datastore=datastore,
+        analyzer=LogAnalyzer(datastore),
+        monitors=[monitor],
+        watcher=PollingWatcher(path),
+        tick_sec=0.05)
+
+    with open(sample_log_path) as sample, open(path, "a") as log:
+        log.write(sample.read())
+
+    run_until(runtime,
+              lambda: len(datastore.datastore) == 10 and monitor.runs > 1)
+
+    assert len(datastore.datastore) == 10
+    assert monitor.runs > 1
+    assert runtime.stats.entries_in == runtime.stats.entries_out == 10
+    assert runtime.stats.backlog == 0
+
+
+def test_runtime_records_backpressure_behind_a_slow_monitor(
+        sample_log_path):
+    with open(sample_log_path) as sample:
+        entry = LogLine.from_log_line(sample.readline())
+
+    datastore = DequeDataStore(maxlen=None)
+    monitor = CountingMonitor(delay=0.2)
+    runtime = AsyncRuntime(
+        log=EndlessLog(entry),
+        datastore=datastore,
+        analyzer=LogAnalyzer(datastore),
+        monitors=[monitor],
+        watcher=ImpatientWatcher(),
+        tick_sec=0.05,
+        queue_size=1)
+
+    run_until(runtime, lambda: monitor.runs >= 2)
+
+    stats = runtime.stats
+    assert stats.blocked_puts > 0
+    assert stats.blocked_sec > 0
+    assert stats.max_depth == 1
+    assert stats.backlog == 0
+    assert len(datastore.datastore) == stats.entries_out == stats.entries_in
+
+
+def test_runtime_reads_without_holding_the_metrics_lock():
+    metrics = MetricsRegistry()
+    log = LockProbingLog(metrics.lock)
+    datastore = DequeDataStore()
+    runtime = AsyncRuntime(
+        log=log,
+        datastore=datastore,
+        analyzer=LogAnalyzer(datastore),
+        monitors=[],
+        watcher=ImpatientWatcher(),
+        tick_sec=0.05,
+        metrics=metrics)
+
+    run_until(runtime, lambda: len(log.lock_free) >= 3)
+
+    assert log.lock_free and all(log.lock_free)
+    assert metrics.histogram("read_seconds", "").count >= 3
@@ -0,0 +1,239 @@
+import heapq
+import math
+from itertools import count
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class SpaceSaving:
+    """
+    A streaming estimate of the most frequent keys in a stream, in at most
+    `capacity` counters: the Space-Saving algorithm (Metwally et al., 2005).
+
+    While there is room, each new key gets its own counter. Once the sketch
+    is full, a new key takes over the smallest counter, inheriting its count
+    as the new key's possible overestimate (`errors`). Every count therefore
+    overestimates its key's true count by at most the smallest count, which
+    is at most `total / capacity`; any key occurring more often than that is
+    guaranteed to be held.
+
+    The smallest counter is found with a heap that is updated lazily: counts
+    only grow, so a stale heap entry is simply refreshed when it surfaces.
+
+    Sketches are mergeable (Cafaro et al., 2016): keys missing from a full
+    sketch are assumed to have its smallest count, so the merged counts keep
+    the same error bound over the combined stream.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "total", "heap", "sequence")
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self.total = 0
+        self.heap: List[Tuple[int, int, Hashable]] = []
+        self.sequence = count()
+
+    def add(self, key: Hashable, weight: int = 1) -> "SpaceSaving":
+        """Count `weight` occurrences of `key`."""
+        self.total += weight
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+            return self
+
+        error = 0
+        if len(counts) >= self.capacity:
+            evicted, error = self.__pop_smallest()
+            del self.errors[evicted]
+
+        counts[key] = error + weight
+        self.errors[key] = error
+        heapq.heappush(self.heap, (counts[key], next(self.sequence), key))
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Fold the sketch `other` into this one, keeping the `capacity` keys
+        with the largest combined counts.
+        """
+        if not other.counts:
+            return self
+
+        own_floor, other_floor = self.floor, other.floor
+        # in order of first appearance, so that ties rank deterministically
+        keys = [*self.counts, *(key for key in other.counts
+                                if key not in self.counts)]
+        merged = {
+            key: (self.counts.get(key, own_floor) +
+                  other.counts.get(key, other_floor),
+                  self.errors.get(key, own_floor) +
+                  other.errors.get(key, other_floor))
+            for key in keys
+        }
+        kept = heapq.nlargest(self.capacity, merged.items(),
+                              key=lambda item: item[1][0])
+
+        self.counts = {key: counts for key, (counts, _) in kept}
+        self.errors = {key: error for key, (_, error) in kept}
+        self.total += other.total
+        self.heap = [(counts, next(self.sequence), key)
+                     for key, counts in self.counts.items()]
+        heapq.heapify(self.heap)
+        return self
+
+    @property
+    def floor(self) -> int:
+        """
+        An upper bound on the true count of any key not held: the smallest
+        count, if the sketch is full, else 0.
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+        return self.__smallest()
+
+    def top(self, n: int) -> List[Tuple[Hashable, int]]:
+        """
+        The `n` keys with the largest estimated counts, as (key, count)
+        pairs, most frequent first.
+        """
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+    def snapshot(self) -> list:
+        """
+        The sketch's counters as plain data, for checkpoints: the total and
+        a [key, count, error] triple per key held.
+        """
+        return [self.total,
+                [[key, counts, self.errors[key]]
+                 for key, counts in self.counts.items()]]
+
+    def restore(self, snapshot: list) -> "SpaceSaving":
+        """Replace the sketch's counters with those of `snapshot`."""
+        self.total, counters = snapshot
+        self.counts = {key: counts for key, counts, _ in counters}
+        self.errors = {key: error for key, _, error in counters}
+        self.heap = [(counts, next(self.sequence), key)
+                     for key, counts in self.counts.items()]
+        heapq.heapify(self.heap)
+        return self
+
+    def __smallest(self) -> int:
+        """Internal. The smallest count, refreshing stale heap entries."""
+        heap = self.heap
+        while True:
+            counted, _, key = heap[0]
+            if self.counts.get(key) == counted:
+                return counted
+            heapq.heappop(heap)
+            if key in self.counts:
+                heapq.heappush(heap,
+                               (self.counts[key], next(self.sequence), key))
+
+    def __pop_smallest(self) -> Tuple[Hashable, int]:
+        """Internal. Remove the key with the smallest count; return both."""
+        smallest = self.__smallest()
+        _, _, key = heapq.heappop(self.heap)
+        del self.counts[key]
+        return key, smallest
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class QuantileSketch:
+    """
+    A streaming, mergeable estimate of the quantiles of a stream of
+    non-negative values: a DDSketch (Masson et al., 2019).
+
+    Values are counted in logarithmically-sized bins: bin i holds values in
+    (gamma^(i-1), gamma^i], where gamma = (1 + a) / (1 - a) for the
+    `relative_accuracy` a, and each quantile is reported as its bin's
+    midpoint, within a factor of a of the true value. Zeros have a bin of
+    their own. Memory is bounded by `max_bins`: past that, the lowest bins
+    are collapsed into one, losing accuracy only for the smallest values.
+
+    Merging adds bin counts, so a sketch of any window can be assembled
+    exactly from sketches of its parts.
+    """
+
+    __slots__ = ("relative_accuracy", "max_bins", "gamma", "log_gamma",
+                 "bins", "zeros", "count")
+
+    def __init__(self,
+                 relative_accuracy: float = 0.01,
+                 max_bins: int = 2048) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float, weight: int = 1) -> "QuantileSketch":
+        """Count `weight` occurrences of the non-negative `value`."""
+        self.count += weight
+        if value <= 0:
+            self.zeros += weight
+            return self
+
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + weight
+        if len(self.bins) > self.max_bins:
+            self.__collapse()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold the sketch `other`, of the same accuracy, into this one."""
+        for index, weight in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + weight
+        self.zeros += other.zeros
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self.__collapse()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        The estimated `q`-quantile (0 <= q <= 1) of the values counted, or
+        None if there are none.
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return 2 * self.gamma**max(self.bins) / (self.gamma + 1)
+
+    def snapshot(self) -> list:
+        """
+        The sketch's bins as plain data, for checkpoints. The accuracy is not
+        included: restore into a sketch of the same accuracy.
+        """
+        return [self.zeros, self.count, self.bins]
+
+    def restore(self, snapshot: list) -> "QuantileSketch":
+        """Replace the sketch's bins with those of `snapshot`."""
+        self.zeros, self.count, bins = snapshot
+        self.bins = dict(bins)
+        if len(self.bins) > self.max_bins:
+            self.__collapse()
+        return self
+
+    def __collapse(self) -> None:
+        """Internal. Fold the lowest bins into one, to fit `max_bins`."""
+        indices = sorted(self.bins)
+        excess = len(indices) - self.max_bins
+        lowest = indices[excess]
+        for index in indices[:excess]:
+            self.bins[lowest] += self.bins.pop(index)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,142 @@
+import random
+from collections import Counter
+
+from .log_sketches import QuantileSketch, SpaceSaving
+
+DISTINCT = 5_000
+COUNT = 50_000
+
+
+def zipf_stream(seed=42, count=COUNT):
+    """`count` keys from `DISTINCT` with Zipf-like (1/rank) frequencies."""
+    rand = random.Random(seed)
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(DISTINCT)]
+    weights = [1 / rank for rank in range(1, DISTINCT + 1)]
+    return rand.choices(keys, weights=weights, k=count)
+
+
+def sketch_of(stream, capacity):
+    sketch = SpaceSaving(capacity)
+    for key in stream:
+        sketch.add(key)
+    return sketch
+
+
+def max_overestimate(sketch, truth):
+    return max(count - truth[key] for key, count in sketch.counts.items())
+
+
+def test_counts_are_exact_until_the_sketch_is_full():
+    sketch = sketch_of(["a", "b", "a", "c", "a", "b"], capacity=3)
+    assert sketch.top(2) == [("a", 3), ("b", 2)]
+    assert sketch.floor == 1
+    assert sketch_of(["a", "b"], capacity=3).floor == 0
+
+
+def test_memory_and_error_are_bounded_by_capacity():
+    stream = zipf_stream()
+    truth = Counter(stream)
+
+    errors = []
+    for capacity in (16, 64, 256, 1024):
+        sketch = sketch_of(stream, capacity)
+        assert len(sketch) == capacity
+        assert len(sketch.heap) <= 2 * capacity
+
+        # never underestimates, and overestimates by at most N / capacity
+        for key, count in sketch.counts.items():
+            assert truth[key] <= count
+            assert count - sketch.errors[key] <= truth[key]
+        errors.append(max_overestimate(sketch, truth))
+        assert errors[-1] <= sketch.floor <= COUNT / capacity
+
+        # every key more frequent than N / capacity is held
+        for key, count in truth.items():
+            if count > COUNT / capacity:
+                assert key in sketch.counts
+
+    # error shrinks as memory grows
+    assert errors == sorted(errors, reverse=True)
+    assert errors[-1] < errors[0] / 10
+
+
+def test_top_keys_are_found_with_a_small_sketch():
+    stream = zipf_stream()
+    expected = [key for key, _ in Counter(stream).most_common(5)]
+    assert [key for key, _ in sketch_of(stream, 64).top(5)] == expected
+
+
+def test_merged_sketches_keep_the_error_bound():
+    stream = zipf_stream()
+    truth = Counter(stream)
+    parts = [stream[i::10] for i in range(10)]
+
+    merged = SpaceSaving(64)
+    for part in parts:
+        merged.merge(sketch_of(part, 64))
+
+    assert merged.total == COUNT
+    assert len(merged) == 64
+    for key, count in merged.counts.items():
+        assert truth[key] <= count
+    assert max_overestimate(merged, truth) <= COUNT / 64
+    expected = [key for key, _ in truth.most_common(3)]
+    assert [key for key, _ in merged.top(3)] == expected
+
+    # and can keep counting
+    merged.add("new", weight=COUNT)
+    assert merged.top(1) == [("new", merged.counts["new"])]
+
+
+def lognormal_sizes(seed=42, count=COUNT):
+    rand = random.Random(seed)
+    return [int(rand.lognormvariate(8, 1.5)) for _ in range(count)]
+
+
+def true_quantile(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    values = lognormal_sizes()
+    for accuracy in (0.05, 0.01):
+        sketch = QuantileSketch(accuracy)
+        for value in values:
+            sketch.add(value)
+
+        assert sketch.count == COUNT
+        for q in (0.0, 0.5, 0.9, 0.99, 1.0):
+            expected = true_quantile(values, q)
+            assert abs(sketch.quantile(q) - expected) <= accuracy * expected
+
+
+def test_quantile_sketch_memory_is_fixed():
+    values = lognormal_sizes()
+    sketch = QuantileSketch(0.01, max_bins=256)
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.bins) == 256
+
+    # only the smallest values lose accuracy
+    for q in (0.9, 0.99):
+        expected = true_quantile(values, q)
+        assert abs(sketch.quantile(q) - expected) <= 0.01 * expected
+    assert sketch.quantile(0.01) > 1.01 * true_quantile(values, 0.01)
+
+
+def test_merged_quantile_sketches_match_a_single_sketch():
+    values = lognormal_sizes() + [0] * 100
+    single = QuantileSketch()
+    merged = QuantileSketch()
+    for part in range(10):
+        sketch = QuantileSketch()
+        for value in values[part::10]:
+            single.add(value)
+            sketch.add(value)
+        merged.merge(sketch)
+
+    assert merged.count == single.count
+    assert merged.zeros == 100
+    for q in (0.001, 0.5, 0.9, 0.99):
+        assert merged.quantile(q) == single.quantile(q)
+    assert QuantileSketch().quantile(0.5) is None
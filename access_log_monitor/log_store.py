@@ -1,9 +1,24 @@
 import abc
+from collections import Counter
 from datetime import datetime
-from typing import Optional
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
 
+from .log_aggregates import AggregateFactories, AggregateFactory
+from .log_batch import LogBatch
+from .log_bitmaps import LogBitmaps
+from .log_buckets import LogBuckets
 from .log_deque import LogDeque
-from .log_line import LogLine
+from .log_filters import Filters, matches, normalize
+from .log_frame import LogFrame
+from .log_line import Entry, LogLine
+from .log_rollups import DEFAULT_LEVELS, LogRollups
+from .log_summary import SUMMARY_FIELDS, LogSummary
+from .log_table import LogTable, Row
+from .log_timestamps import decode_datetime, decode_epoch
+from .log_utils import epoch_seconds
+from .log_window import WindowCounter
 
 
 class LogStore(metaclass=abc.ABCMeta):
@@ -19,6 +34,10 @@ class LogStore(metaclass=abc.ABCMeta):
     - BitmapDataStore
     """
 
+    def __init__(self) -> None:
+        self.aggregates: AggregateFactories = {}
+        self.windows: List[WindowCounter] = []
+
     @abc.abstractmethod
     def add(self, entry: Optional[LogLine]) -> None:
         pass
@@ -27,29 +46,622 @@ class LogStore(metaclass=abc.ABCMeta):
     def peek(self, since: datetime) -> list:
         pass
 
+    def add_many(self, batch: Union[List[LogLine], LogBatch]) -> None:
+        """
+        Add every entry in `batch`, either a list of LogLines or a LogBatch.
+        Subclasses should override this to merge a batch in one operation.
+        """
+        entries = batch.lines() if isinstance(batch, LogBatch) else batch
+        for entry in entries:
+            self.add(entry)
+
+    def count(self, since: datetime) -> int:
+        """
+        Return the number of entries since the given time `since`, from a
+        tracked window if one can answer, else by peeking.
+        """
+        windowed_count = self.windowed_count(since)
+        if windowed_count is not None:
+            return windowed_count
+        return len(self.peek(since))
+
+    def count_matching(self, since: datetime, filters: Filters) -> int:
+        """
+        Return the number of entries since the given time `since` matching
+        `filters` (see log_filters). Raises ValueError for unknown fields.
+        """
+        accepted = normalize(filters)
+        return sum(1 for entry in self.peek(since) if matches(entry, accepted))
+
+    def track_window(self, length_sec: int) -> None:
+        """
+        Keep a running count of entries over the last `length_sec` seconds,
+        so that `count` answers for that window in O(1).
+        """
+        if any(window.length_sec == length_sec for window in self.windows):
+            return
+
+        window = WindowCounter(length_sec)
+        for epoch, hits in self.per_second_hits():
+            window.add(epoch, hits)
+        self.windows.append(window)
+
+    def windowed_count(self, since: datetime) -> Optional[int]:
+        """
+        Return the number of entries since `since` according to the first
+        tracked window able to answer, or None if none can.
+        """
+        epoch = epoch_seconds(since)
+        for window in self.windows:
+            hits = window.count_since(epoch)
+            if hits is not None:
+                return hits
+        return None
+
+    def size(self) -> int:
+        """The number of entries retained, by the underlying datastore."""
+        return len(self.datastore)  # type: ignore
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        """(epoch second, hits) pairs for the retained entries."""
+        return []
+
+    def summarize(self, since: datetime) -> LogSummary:
+        """
+        Return a LogSummary of all entries since the given time `since`,
+        including any registered aggregates.
+        """
+        return LogSummary.of(self.peek(since), self.aggregates)
+
+    def history_until(self, log: str) -> Optional[list]:
+        """
+        Where a store that survives a restart last read the log at the path
+        `log` up to (see `mark_history`), or None. History resumes from there.
+        """
+        return None
+
+    def mark_history(self, log: str, position: list) -> None:
+        """
+        Record that the store holds the entries of the log at the path `log`
+        read up to `position` (see LogManager.snapshot).
+        """
+
+    def members(self) -> List["LogStore"]:
+        """The stores written to: this one, or a TeeDataStore's stores."""
+        return [self]
+
+    def snapshot(self) -> Optional[Any]:
+        """
+        The retained traffic as plain data, for checkpoints, or None if the
+        store must instead be reloaded from the log.
+        """
+        return None
+
+    def restore(self, snapshot: Any) -> None:
+        """
+        Load `snapshot`, taken by a store of the same kind, into the empty
+        store. No-ops for stores that cannot be snapshotted.
+        """
+
+    def register_aggregate(self, name: str, factory: AggregateFactory) -> None:
+        """
+        Compute the Aggregate built by `factory` as part of every summary,
+        under the key `name`.
+        """
+        self.aggregates[name] = factory
+
 
 class DequeDataStore(LogStore):
     """
     An in-memory DataStore the uses a LogDeque.
+
+    If `compact`, entries are retained as compact LogRecords rather than as
+    the LogLines they were added as. At most `maxlen` entries are retained
+    (pass None for no limit).
     """
 
-    def __init__(self):
-        self.datastore = LogDeque()
+    def __init__(self, compact: bool = False, maxlen: Optional[int] = 10_000):
+        super().__init__()
+        self.compact = compact
+        self.datastore = LogDeque(maxlen=maxlen)
 
     def add(self, entry: Optional[LogLine]):
         """
         Adds an entry. If the given `entry` is falsy, no-ops.
-        Otherwise parses the timestamp for the LogLine instance using
-        datetime.strptime and adds the model to the datastore.
+        Otherwise decodes the timestamp for the LogLine instance (reusing the
+        datetime for repeated timestamps) and adds the model to the datastore.
         """
         if not isinstance(entry, LogLine):
             return self
 
-        timestamp = datetime.strptime(entry.timestamp, entry.timestamp_format)
-        self.datastore.add(timestamp, entry)
+        timestamp = decode_datetime(entry.timestamp, entry.timestamp_format)
+        self.datastore.add(timestamp,
+                           entry.compact() if self.compact else entry)
+        if self.windows:
+            epoch = epoch_seconds(timestamp)
+            for window in self.windows:
+                window.add(epoch)
+
+        return self
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """
+        Adds every entry in `batch`, a list of LogLines or a LogBatch, sorting
+        the batch once and merging it into the datastore in a single pass.
+        Falsy entries are skipped. Entries of a LogBatch are retained as
+        LogRecords.
+        """
+        timestamped: List[Tuple[datetime, Entry]]
+        if isinstance(batch, LogBatch):
+            timestamped = [(decode_datetime(record.timestamp), record)
+                           for record in batch.records()]
+        else:
+            timestamped = [(decode_datetime(entry.timestamp,
+                                            entry.timestamp_format),
+                            entry.compact() if self.compact else entry)
+                           for entry in batch if isinstance(entry, LogLine)]
+
+        # Latest first; among equal timestamps, the last added comes first,
+        # as it would if the entries were added one at a time.
+        timestamped.reverse()
+        timestamped.sort(key=itemgetter(0), reverse=True)
+        self.datastore.add_many(timestamped)
+
+        if self.windows:
+            hits = Counter(epoch_seconds(timestamp)
+                           for timestamp, _ in timestamped)
+            for epoch in sorted(hits):
+                for window in self.windows:
+                    window.add(epoch, hits[epoch])
 
         return self
 
     def peek(self, since: datetime) -> list:
         "Delegates to the underlying datastore."
         return self.datastore.peek(since)
+
+    def summarize(self, since: datetime) -> LogSummary:
+        """
+        Summarize entries since `since` in a single pass over the underlying
+        datastore, without first copying them out.
+        """
+        return LogSummary.of(self.datastore.iter_since(since), self.aggregates)
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        for timestamp, _ in self.datastore:
+            yield epoch_seconds(timestamp), 1
+
+
+class BucketedDataStore(LogStore):
+    """
+    An in-memory DataStore that uses LogBuckets to keep per-second aggregates
+    of the most recent `window_sec` seconds of traffic, rather than the
+    entries themselves.
+
+    Should be sized to the longest window any monitor queries.
+    """
+
+    def __init__(self, window_sec: int) -> None:
+        super().__init__()
+        # LogRollups for a RollupDataStore
+        self.datastore: Union[LogBuckets, LogRollups] = LogBuckets(
+            window_sec, self.aggregates)
+
+    def add(self, entry: Optional[LogLine]):
+        """
+        Adds an entry. If the given `entry` is falsy, no-ops.
+        Otherwise decodes the timestamp for the LogLine instance to epoch
+        seconds and counts the entry in the bucket for that second.
+        """
+        if not isinstance(entry, LogLine):
+            return self
+
+        epoch = decode_epoch(entry.timestamp, entry.timestamp_format)
+        self.datastore.add(epoch, entry)
+        for window in self.windows:
+            window.add(epoch)
+
+        return self
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """
+        Adds every entry in `batch`, a list of LogLines or a LogBatch.
+        Sorts the batch by epoch second once, summarizes each second's entries
+        in a single pass, and merges each summary into its bucket.
+        """
+        for epoch, summary in self.__per_second_summaries(batch):
+            self.datastore.merge(epoch, summary)
+            for window in self.windows:
+                window.add(epoch, summary.hits)
+
+        return self
+
+    def peek(self, since: datetime) -> list:
+        """
+        Return the buckets since `since`, oldest first, as (epoch second,
+        LogSummary) pairs, as individual entries are not retained.
+        """
+        return list(self.datastore.buckets(epoch_seconds(since)))
+
+    def count(self, since: datetime) -> int:
+        """
+        Counts from a tracked window if one can answer, else delegates to the
+        underlying datastore.
+        """
+        windowed_count = self.windowed_count(since)
+        if windowed_count is not None:
+            return windowed_count
+        return self.datastore.count(epoch_seconds(since))
+
+    def count_matching(self, since: datetime, filters: Filters) -> int:
+        """
+        Counts from the buckets' per-status class and per-section counts,
+        without peeking. Raises ValueError for filters on any other field, as
+        buckets keep no other.
+        """
+        accepted = normalize(filters, SUMMARY_FIELDS)
+        return self.datastore.count_matching(epoch_seconds(since), accepted)
+
+    def summarize(self, since: datetime) -> LogSummary:
+        return self.datastore.summarize(epoch_seconds(since))
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        return self.datastore.per_second_hits()
+
+    def snapshot(self) -> Optional[Any]:
+        return self.datastore.snapshot()
+
+    def restore(self, snapshot: Any) -> None:
+        """Restores the buckets, then reseeds any tracked windows from them."""
+        self.datastore.restore(snapshot)
+        lengths = [window.length_sec for window in self.windows]
+        self.windows = []
+        for length_sec in lengths:
+            self.track_window(length_sec)
+
+    def __per_second_summaries(
+            self, batch: Union[List[LogLine], LogBatch]
+    ) -> Iterator[Tuple[int, LogSummary]]:
+        """
+        Internal. Yield (epoch second, LogSummary) pairs for the entries in
+        `batch`, oldest second first.
+        """
+        if isinstance(batch, LogBatch):
+            batch = batch.sorted()
+            for epoch, start, stop in batch.epoch_runs():
+                yield epoch, LogSummary.of_batch(batch, self.aggregates,
+                                                 start, stop)
+            return
+
+        keyed = sorted(((decode_epoch(entry.timestamp,
+                                      entry.timestamp_format), entry)
+                        for entry in batch if isinstance(entry, LogLine)),
+                       key=itemgetter(0))
+        for epoch, group in groupby(keyed, key=itemgetter(0)):
+            yield epoch, LogSummary.of(
+                (entry for _, entry in group), self.aggregates)
+
+
+class RollupDataStore(BucketedDataStore):
+    """
+    An in-memory DataStore that uses LogRollups to keep aggregates at several
+    resolutions, so that windows of hours or days cost about as much as
+    windows of minutes. The coarsest spans at least `retention_sec` seconds.
+    """
+
+    def __init__(self, retention_sec: Optional[int] = None) -> None:
+        LogStore.__init__(self)
+        levels = list(DEFAULT_LEVELS)
+        resolution_sec, span_sec = levels[-1]
+        levels[-1] = (resolution_sec, max(span_sec, retention_sec or 0))
+        self.datastore = LogRollups(levels, self.aggregates)
+
+    def track_window(self, length_sec: int) -> None:
+        """
+        No-ops: rollups count any window by merging a bounded number of
+        buckets, without the per-second state a tracked window would need.
+        """
+
+
+class DataFrameDataStore(LogStore):
+    """
+    An in-memory DataStore that uses a LogFrame: NumPy columns, ordered by
+    time, queried with vectorized reductions. Entries older than
+    `retention_sec` seconds (if given) are discarded. Requires NumPy.
+    """
+
+    def __init__(self, retention_sec: Optional[int] = None) -> None:
+        super().__init__()
+        self.datastore = LogFrame(retention_sec)
+
+    def add(self, entry: Optional[LogLine]):
+        """
+        Adds an entry. If the given `entry` is falsy, no-ops.
+        Otherwise decodes the timestamp for the LogLine instance to epoch
+        seconds and appends the entry's retained fields to the columns.
+        """
+        if not isinstance(entry, LogLine):
+            return self
+
+        epoch = decode_epoch(entry.timestamp, entry.timestamp_format)
+        self.datastore.append(epoch, int(entry.status or 0),
+                              entry.site_section, entry.username,
+                              int(entry.size or 0), entry.ip_address,
+                              entry.verb, entry.path, entry.request_time)
+        for window in self.windows:
+            window.add(epoch)
+
+        return self
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """
+        Adds every entry in `batch`, a list of LogLines or a LogBatch, to the
+        columns in a single sorted merge. LogLines are first gathered into a
+        LogBatch.
+        """
+        if not isinstance(batch, LogBatch):
+            batch = LogBatch.from_entries(
+                entry for entry in batch if isinstance(entry, LogLine))
+        self.datastore.extend_batch(batch)
+
+        if self.windows:
+            hits = Counter(batch.epochs)
+            for epoch in sorted(hits):
+                for window in self.windows:
+                    window.add(epoch, hits[epoch])
+
+        return self
+
+    def peek(self, since: datetime) -> list:
+        """
+        Return the entries since `since`, oldest first, as FrameRows holding
+        the retained fields.
+        """
+        first = self.datastore.index_since(epoch_seconds(since))
+        return list(self.datastore.rows(first))
+
+    def count(self, since: datetime) -> int:
+        """
+        Counts from a tracked window if one can answer, else by binary search
+        on the timestamp column.
+        """
+        windowed_count = self.windowed_count(since)
+        if windowed_count is not None:
+            return windowed_count
+        return self.datastore.count(epoch_seconds(since))
+
+    def count_matching(self, since: datetime, filters: Filters) -> int:
+        """
+        Counts with vectorized comparisons on the status, section, verb and
+        username columns.
+        """
+        return self.datastore.count_matching(epoch_seconds(since),
+                                             normalize(filters))
+
+    def summarize(self, since: datetime) -> LogSummary:
+        return self.datastore.summarize(epoch_seconds(since), self.aggregates)
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        return self.datastore.per_second_hits()
+
+
+class SqliteDataStore(LogStore):
+    """
+    A persistent DataStore that uses a LogTable: a SQLite table, indexed by
+    epoch second, in the database file at `path` (in memory by default).
+    Entries retained in a database file are available again after a restart.
+
+    Entries older than `retention_sec` seconds (if given) are deleted in
+    periodic sweeps.
+    """
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 retention_sec: Optional[int] = None) -> None:
+        super().__init__()
+        self.datastore = LogTable(path, retention_sec)
+
+    def add(self, entry: Optional[LogLine]):
+        """
+        Adds an entry. If the given `entry` is falsy, no-ops.
+        Prefer `add_many`, which inserts a whole batch in one transaction.
+        """
+        if not isinstance(entry, LogLine):
+            return self
+        return self.add_many([entry])
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """
+        Adds every entry in `batch`, a list of LogLines or a LogBatch, sorted
+        by time, in a single transaction. Falsy entries are skipped.
+        """
+        if isinstance(batch, LogBatch):
+            rows = self.__batch_rows(batch)
+        else:
+            rows = [self.__row(entry) for entry in batch
+                    if isinstance(entry, LogLine)]
+        self.datastore.insert(rows)
+
+        if self.windows:
+            hits = Counter(row[-1] for row in rows)
+            for epoch in sorted(hits):
+                for window in self.windows:
+                    window.add(epoch, hits[epoch])
+
+        return self
+
+    def peek(self, since: datetime) -> list:
+        """
+        Return the entries since `since`, oldest first, as LogRecords.
+        """
+        return list(self.datastore.records(epoch_seconds(since)))
+
+    def count(self, since: datetime) -> int:
+        """
+        Counts from a tracked window if one can answer, else with an indexed
+        range scan.
+        """
+        windowed_count = self.windowed_count(since)
+        if windowed_count is not None:
+            return windowed_count
+        return self.datastore.count(epoch_seconds(since))
+
+    def summarize(self, since: datetime) -> LogSummary:
+        return self.datastore.summarize(epoch_seconds(since), self.aggregates)
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        return self.datastore.per_second_hits()
+
+    def history_until(self, log: str) -> Optional[list]:
+        """The position last recorded in the database, in any run."""
+        return self.datastore.position(log)
+
+    def mark_history(self, log: str, position: list) -> None:
+        """Records the position in the database."""
+        self.datastore.mark(log, position)
+
+    @staticmethod
+    def __row(entry: LogLine) -> Row:
+        """Internal. The entries table row for the LogLine `entry`."""
+        return (entry.ip_address, entry.username, entry.timestamp,
+                entry.verb, entry.path, entry.version,
+                int(entry.status or 0), int(entry.size or 0),
+                entry.request_time, entry.site_section,
+                decode_epoch(entry.timestamp, entry.timestamp_format))
+
+    @staticmethod
+    def __batch_rows(batch: LogBatch) -> List[Row]:
+        """Internal. The entries table rows for the LogBatch `batch`."""
+        string_columns = (batch.string_column(column)
+                          for column in ("ip_addresses", "usernames",
+                                         "timestamps", "verbs", "paths",
+                                         "versions"))
+        return list(
+            zip(*string_columns, batch.statuses, batch.sizes,
+                batch.string_column("request_times"),
+                batch.string_column("sections"), batch.epochs))
+
+
+class BitmapDataStore(LogStore):
+    """
+    An in-memory DataStore that uses LogBitmaps, so that filtered counts are
+    bitmap intersections rather than scans. Entries older than
+    `retention_sec` seconds (if given) are discarded a chunk at a time.
+    """
+
+    def __init__(self, retention_sec: Optional[int] = None) -> None:
+        super().__init__()
+        self.datastore = LogBitmaps(retention_sec)
+
+    def add(self, entry: Optional[LogLine]):
+        """
+        Adds an entry. If the given `entry` is falsy, no-ops.
+        Prefer `add_many`, which indexes a whole batch at once.
+        """
+        if not isinstance(entry, LogLine):
+            return self
+        return self.add_many([entry])
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """
+        Adds every entry in `batch`, a list of LogLines or a LogBatch, sorted
+        by time, indexing each field value's rows with a single bitmap OR.
+        LogLines are first gathered into a LogBatch.
+        """
+        if not isinstance(batch, LogBatch):
+            batch = LogBatch.from_entries(
+                entry for entry in batch if isinstance(entry, LogLine))
+        self.datastore.extend(batch)
+
+        if self.windows:
+            hits = Counter(batch.epochs)
+            for epoch in sorted(hits):
+                for window in self.windows:
+                    window.add(epoch, hits[epoch])
+
+        return self
+
+    def peek(self, since: datetime) -> list:
+        """Return the entries since `since` as LogRecords."""
+        return list(self.datastore.records(epoch_seconds(since)))
+
+    def count(self, since: datetime) -> int:
+        """
+        Counts from a tracked window if one can answer, else by popcounts of
+        the time bitmaps.
+        """
+        windowed_count = self.windowed_count(since)
+        if windowed_count is not None:
+            return windowed_count
+        return self.datastore.count(epoch_seconds(since))
+
+    def count_matching(self, since: datetime, filters: Filters) -> int:
+        """Counts by intersecting the bitmaps for the accepted values."""
+        return self.datastore.count(epoch_seconds(since), normalize(filters))
+
+    def summarize(self, since: datetime) -> LogSummary:
+        return self.datastore.summarize(epoch_seconds(since), self.aggregates)
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        return self.datastore.per_second_hits()
+
+
+class TeeDataStore(LogStore):
+    """
+    A DataStore that writes every entry to each of `stores` and answers
+    queries from the first, so that a log monitored alongside others can feed
+    both its own store and one merged across all of them, parsing each entry
+    once.
+    """
+
+    def __init__(self, *stores: LogStore) -> None:
+        super().__init__()
+        self.stores = stores
+        self.primary = stores[0]
+
+    def add(self, entry: Optional[LogLine]):
+        """Adds an entry to every store."""
+        for store in self.stores:
+            store.add(entry)
+        return self
+
+    def add_many(self, batch: Union[List[LogLine], LogBatch]):
+        """Adds every entry in `batch` to every store."""
+        for store in self.stores:
+            store.add_many(batch)
+        return self
+
+    def peek(self, since: datetime) -> list:
+        return self.primary.peek(since)
+
+    def count(self, since: datetime) -> int:
+        return self.primary.count(since)
+
+    def count_matching(self, since: datetime, filters: Filters) -> int:
+        return self.primary.count_matching(since, filters)
+
+    def track_window(self, length_sec: int) -> None:
+        self.primary.track_window(length_sec)
+
+    def summarize(self, since: datetime) -> LogSummary:
+        return self.primary.summarize(since)
+
+    def per_second_hits(self) -> Iterable[Tuple[int, int]]:
+        return self.primary.per_second_hits()
+
+    def size(self) -> int:
+        return self.primary.size()
+
+    def mark_history(self, log: str, position: list) -> None:
+        """Marks the position in every store."""
+        for store in self.stores:
+            store.mark_history(log, position)
+
+    def members(self) -> List[LogStore]:
+        """Each of the stores, which may hold different history."""
+        return [member for store in self.stores for member in store.members()]
+
+    def register_aggregate(self, name: str, factory: AggregateFactory) -> None:
+        """Registers the aggregate with every store."""
+        for store in self.stores:
+            store.register_aggregate(name, factory)
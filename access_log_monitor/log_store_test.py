@@ -1,7 +1,14 @@
 from datetime import datetime
 
-from .log_line import LogLine
-from .log_store import DequeDataStore
+from freezegun import freeze_time
+
+from .log_analyzer import LogAnalyzer
+from .log_batch import LogBatch
+from .log_checkpoint import decode, encode
+from .log_line import LogLine, LogRecord
+from .log_store import (BucketedDataStore, DequeDataStore, RollupDataStore,
+                        TeeDataStore)
+from .log_utils import now_utc
 
 
 def test_adding_non_loglines_is_a_no_op():
@@ -25,3 +32,198 @@ def test_adding_an_entry_parses_date():
     assert all(isinstance(e, LogLine) for t, e in store.datastore)
     assert list(t.year for t, e in store.datastore) == [2000, 1999, 1990]
     assert list(t.month for t, e in store.datastore) == [1, 2, 3]
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_bucketed_store_counts_and_summarizes_since_given_time():
+    store = BucketedDataStore(window_sec=120)
+    entries = [
+        LogLine(timestamp="11/Sep/2018 03:28:00 +0000", status="200"),
+        LogLine(timestamp="11/Sep/2018 03:29:00 +0000", status="200"),
+        LogLine(timestamp="11/Sep/2018 03:29:30 +0000", status="500"),
+    ]
+    for entry in entries:
+        store.add(entry)
+    store.add(None).add("")
+
+    assert store.count(since=now_utc(minute=29)) == 2
+    assert store.summarize(since=now_utc(minute=29)).percent("5") == 50.0
+    assert store.count(since=now_utc(minute=28)) == 3
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_bucketed_store_peeks_at_its_buckets():
+    store = BucketedDataStore(window_sec=120)
+    store.add(LogLine(timestamp="11/Sep/2018 03:28:00 +0000", status="200"))
+    store.add(LogLine(timestamp="11/Sep/2018 03:29:30 +0000", status="500"))
+    store.add(LogLine(timestamp="11/Sep/2018 03:29:30 +0000", status="200"))
+
+    buckets = store.peek(since=now_utc(minute=29))
+    assert [(epoch, summary.hits) for epoch, summary in buckets] == [
+        (1536636570, 2)
+    ]
+    assert buckets[0][1].status_classes == {"2": 1, "5": 1}
+    assert len(store.peek(since=now_utc(minute=28))) == 2
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_tracked_windows_count_the_same_as_peeking(sample_log_path):
+    for store in (DequeDataStore(), BucketedDataStore(window_sec=60)):
+        with open(sample_log_path) as sample_log:
+            lines = sample_log.readlines()
+        for line in lines[:5]:
+            store.add(LogLine.from_log_line(line))
+
+        # seeded from entries already stored
+        store.track_window(10)
+        store.track_window(10)
+        assert len(store.windows) == 1
+
+        for line in lines[5:]:
+            store.add(LogLine.from_log_line(line))
+
+        since = now_utc(minute=29, second=50)
+        assert store.windowed_count(since) == 9
+        assert store.count(since) == 9
+
+        # earlier than the window's horizon
+        assert store.windowed_count(now_utc(minute=29, second=44)) is None
+        assert store.count(now_utc(minute=29, second=44)) == 10
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_short_window_queries_leave_tracked_windows_intact(sample_log_path):
+    store = DequeDataStore()
+    store.track_window(60)
+    with open(sample_log_path) as sample_log:
+        store.add_many([LogLine.from_log_line(line) for line in sample_log])
+
+    assert store.count(now_utc(minute=29, second=50)) == 9
+    assert store.windowed_count(now_utc(minute=29)) == 10
+    assert store.count(now_utc(minute=29)) == 10
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_compact_deque_store_retains_records(sample_log_path):
+    store = DequeDataStore(compact=True)
+    store.track_window(60)
+    with open(sample_log_path) as sample_log:
+        for line in sample_log:
+            store.add(LogLine.from_log_line(line))
+
+    assert len(store.datastore) == 10
+    assert all(isinstance(e, LogRecord) for t, e in store.datastore)
+    assert store.summarize(since=now_utc(year=2018, month=1)).hits == 10
+    assert store.windowed_count(now_utc(minute=29)) == 10
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_add_many_matches_adding_one_at_a_time(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    shuffled = entries[5:] + [None] + entries[:5]
+    since = now_utc(minute=29, second=50)
+
+    for build_store in (lambda: DequeDataStore(compact=True),
+                        lambda: BucketedDataStore(window_sec=60)):
+        one_at_a_time, batched, columnar = (build_store() for _ in range(3))
+        for store in (one_at_a_time, batched, columnar):
+            store.track_window(10)
+        for entry in shuffled:
+            one_at_a_time.add(entry)
+        batched.add_many(shuffled)
+        columnar.add_many(LogBatch.from_entries(shuffled))
+
+        expected = one_at_a_time.summarize(since)
+        for store in (batched, columnar):
+            assert store.count(since) == one_at_a_time.count(since) == 9
+            summary = store.summarize(since)
+            assert summary.hits == expected.hits
+            assert summary.status_classes == expected.status_classes
+            assert summary.sections == expected.sections
+            assert summary.bytes == expected.bytes
+
+
+def test_add_many_keeps_the_deque_ordered_latest_first(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    one_at_a_time, batched = DequeDataStore(), DequeDataStore()
+    for entry in entries:
+        one_at_a_time.add(entry)
+    batched.add_many(entries[:4])
+    batched.add_many(entries[4:])
+
+    assert list(batched.datastore) == list(one_at_a_time.datastore)
+
+
+def test_tee_store_writes_to_every_store_and_reads_from_the_first(
+        sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    own, merged = DequeDataStore(), BucketedDataStore(window_sec=60)
+    merged.add_many(entries[:4])
+    tee = TeeDataStore(own, merged)
+    tee.add_many(entries[4:])
+
+    since = datetime(2018, 9, 11, 3, 29, tzinfo=now_utc().tzinfo)
+    assert len(own.datastore) == 6
+    assert merged.count(since) == 10
+    assert tee.count(since) == 6
+    assert tee.summarize(since).hits == 6
+
+
+def test_rollup_store_matches_the_bucketed_store(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    bucketed, rollups = BucketedDataStore(window_sec=60), RollupDataStore()
+    bucketed.add_many(entries[:5])
+    rollups.add_many(entries[:5])
+    for entry in entries[5:]:
+        bucketed.add(entry)
+        rollups.add(entry)
+    rollups.track_window(60)
+
+    tz = now_utc().tzinfo
+    for since in (datetime(2018, 9, 11, 3, 29, tzinfo=tz),
+                  datetime(2018, 9, 11, 3, 29, 52, tzinfo=tz)):
+        assert rollups.count(since) == bucketed.count(since)
+        expected, summary = bucketed.summarize(since), rollups.summarize(since)
+        assert summary.hits == expected.hits
+        assert summary.status_classes == expected.status_classes
+        assert summary.sections == expected.sections
+        assert summary.bytes == expected.bytes
+
+
+def test_aggregate_stores_restore_from_snapshots(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        entries = [LogLine.from_log_line(line) for line in sample_log]
+    since = datetime(2018, 9, 11, 3, 29, tzinfo=now_utc().tzinfo)
+
+    for build in (lambda: BucketedDataStore(window_sec=60), RollupDataStore):
+        store, restored = build(), build()
+        for analyzer in (LogAnalyzer(store), LogAnalyzer(restored)):
+            analyzer.track_heavy_hitters(n=2)
+            analyzer.track_percentiles()
+            analyzer.track_window(60)
+        store.add_many(entries)
+
+        restored.restore(decode(encode(store.snapshot())))
+
+        assert restored.count(since) == store.count(since) == 10
+        expected, summary = store.summarize(since), restored.summarize(since)
+        assert summary.hits == expected.hits
+        assert summary.status_classes == expected.status_classes
+        assert summary.sections == expected.sections
+        assert summary.bytes == expected.bytes
+        filters = {"section": "pages", "status_class": "5"}
+        assert (restored.count_matching(since, filters) ==
+                store.count_matching(since, filters) == 2)
+        for name, extra in expected.extras.items():
+            assert summary.extras[name].value == extra.value
+
+
+def test_entry_stores_cannot_be_snapshotted():
+    store = DequeDataStore()
+    assert store.snapshot() is None
+    store.restore(store.snapshot())
+    assert store.size() == 0
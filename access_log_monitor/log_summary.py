@@ -0,0 +1,218 @@
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from .log_aggregates import Aggregate, AggregateFactories
+from .log_batch import LogBatch
+
+# The fields summaries count hits by, and so can filter on (see log_filters)
+SUMMARY_FIELDS = frozenset(("status_class", "section"))
+
+
+class LogSummary:
+    """
+    Pre-aggregated counters for a set of log entries: total hits, hits per
+    response status class ("2" for 2xx, etc.), hits per site section, hits
+    per (status class, section) pair, and total bytes served, plus any
+    registered `extras` aggregates, keyed by name.
+
+    Summaries are mergeable, so a summary of a time window can be assembled
+    from summaries of its parts.
+    """
+
+    __slots__ = ("hits", "status_classes", "sections", "status_sections",
+                 "bytes", "extras")
+
+    def __init__(self,
+                 aggregates: Optional[AggregateFactories] = None) -> None:
+        self.hits = 0
+        self.status_classes: Counter = Counter()
+        self.sections: Counter = Counter()
+        self.status_sections: Counter = Counter()
+        self.bytes = 0
+        self.extras: Dict[str, Aggregate] = {
+            name: factory()
+            for name, factory in (aggregates or {}).items()
+        }
+
+    @classmethod
+    def of(cls,
+           entries: Iterable,
+           aggregates: Optional[AggregateFactories] = None) -> "LogSummary":
+        """
+        Summarize the given iterable of LogLine-like `entries` in a single
+        pass. The built-in counters are computed inline, without per-entry
+        method dispatch; registered `aggregates` join the same pass.
+
+        `entries` may also be a LogBatch, which is summarized column-wise.
+        """
+        if isinstance(entries, LogBatch):
+            return cls.of_batch(entries, aggregates)
+
+        summary = cls(aggregates)
+        extras = list(summary.extras.values())
+        status_sections: Dict[Tuple[str, str], int] = {}
+        hits = 0
+        total_bytes = 0
+
+        for entry in entries:
+            hits += 1
+            pair = (entry.status[:1], entry.site_section)
+            status_sections[pair] = status_sections.get(pair, 0) + 1
+            size = entry.size
+            if size:
+                total_bytes += int(size)
+            for extra in extras:
+                extra.add(entry)
+
+        summary.hits = hits
+        summary.count_pairs(status_sections)
+        summary.bytes = total_bytes
+        return summary
+
+    @classmethod
+    def of_batch(cls,
+                 batch: LogBatch,
+                 aggregates: Optional[AggregateFactories] = None,
+                 start: int = 0,
+                 stop: Optional[int] = None) -> "LogSummary":
+        """
+        Summarize the columnar `batch`, or the entries from index `start` up
+        to `stop` within it, counting its status and section id columns
+        directly rather than materializing entries. Entries are only
+        materialized, as LogRecords, if there are `aggregates` to feed.
+        """
+        stop = len(batch) if stop is None else stop
+        summary = cls(aggregates)
+        summary.hits = stop - start
+        summary.bytes = sum(batch.sizes[start:stop])
+
+        values = batch.strings.values
+        status_sections: Counter = Counter()
+        for (status, section_id), hits in Counter(
+                zip(batch.statuses[start:stop],
+                    batch.sections[start:stop])).items():
+            status_sections[str(status)[:1], values[section_id]] += hits
+        summary.count_pairs(status_sections)
+
+        if summary.extras:
+            for i in range(start, stop):
+                record = batch.record(i)
+                for extra in summary.extras.values():
+                    extra.add(record)
+
+        return summary
+
+    def add(self, entry) -> "LogSummary":
+        """Count the LogLine-like `entry` in the summary."""
+        status_class, section = entry.status[:1], entry.site_section
+        self.hits += 1
+        self.status_classes[status_class] += 1
+        self.sections[section] += 1
+        self.status_sections[status_class, section] += 1
+        self.bytes += int(entry.size or 0)
+        for extra in self.extras.values():
+            extra.add(entry)
+        return self
+
+    def merge(self, other: "LogSummary") -> "LogSummary":
+        """
+        Fold the counters of the summary `other` into this one. Extras are
+        merged by name; those not present in this summary are ignored.
+        """
+        self.hits += other.hits
+        self.status_classes.update(other.status_classes)
+        self.sections.update(other.sections)
+        self.status_sections.update(other.status_sections)
+        self.bytes += other.bytes
+        for name, extra in other.extras.items():
+            if name in self.extras:
+                self.extras[name].merge(extra)
+        return self
+
+    def snapshot(self) -> list:
+        """
+        The summary's counters as plain data, for checkpoints (see
+        log_checkpoint). Extras that cannot be checkpointed are left out.
+        """
+        extras = {
+            name: extra.snapshot()
+            for name, extra in self.extras.items()
+        }
+        return [self.hits, self.bytes, dict(self.status_classes),
+                dict(self.sections),
+                [[status_class, section, hits]
+                 for (status_class, section), hits
+                 in self.status_sections.items()],
+                {name: state for name, state in extras.items()
+                 if state is not None}]
+
+    @classmethod
+    def from_snapshot(
+            cls,
+            snapshot: list,
+            aggregates: Optional[AggregateFactories] = None) -> "LogSummary":
+        """
+        Rebuild a summary from its `snapshot`, with an instance of every
+        aggregate in `aggregates`. Extras snapshotted under names not in
+        `aggregates` are ignored.
+        """
+        summary = cls(aggregates)
+        (hits, total_bytes, status_classes, sections, status_sections,
+         extras) = snapshot
+        summary.hits = hits
+        summary.bytes = total_bytes
+        summary.status_classes.update(status_classes)
+        summary.sections.update(sections)
+        for status_class, section, pair_hits in status_sections:
+            summary.status_sections[status_class, section] = pair_hits
+        for name, state in extras.items():
+            if name in summary.extras:
+                summary.extras[name].restore(state)
+        return summary
+
+    @property
+    def most_popular_section(self) -> Tuple[Optional[str], int]:
+        """
+        The most commonly occurring site section and its count, or
+        (None, 0) if the summary is empty.
+        """
+        most_common = self.sections.most_common(1)
+        if most_common:
+            return most_common[0]
+        return None, 0
+
+    def count_matching(self, filters: Dict[str, FrozenSet[str]]) -> int:
+        """
+        Count the hits matching every one of the normalized `filters` (see
+        log_filters.normalize), which may be on SUMMARY_FIELDS only.
+        """
+        statuses = filters.get("status_class")
+        sections = filters.get("section")
+        if sections is None:
+            if statuses is None:
+                return self.hits
+            return sum(self.status_classes[status] for status in statuses)
+        if statuses is None:
+            return sum(self.sections[section] for section in sections)
+        return sum(self.status_sections[status, section]
+                   for status in statuses for section in sections)
+
+    def percent(self, status_class: str) -> float:
+        """
+        The percentage of hits with a response status in the given class
+        (e.g. "2" for 2xx responses), rounded to one decimal point.
+        """
+        if not self.hits:
+            return 0
+        return round(100 * self.status_classes[status_class] / self.hits, 1)
+
+    def count_pairs(self, status_sections: Dict[Tuple[str, str],
+                                                int]) -> None:
+        """
+        Count `status_sections`, hits per (status class, section) pair, in
+        the pair counts and in the per-status class and per-section counts.
+        """
+        self.status_sections.update(status_sections)
+        for (status_class, section), hits in status_sections.items():
+            self.status_classes[status_class] += hits
+            self.sections[section] += hits
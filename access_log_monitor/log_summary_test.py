@@ -0,0 +1,41 @@
+from .log_line import LogLine
+from .log_summary import LogSummary
+
+
+def entries():
+    return [
+        LogLine(path="/pages/create", status="200", size="100"),
+        LogLine(path="/pages/update", status="201", size="200"),
+        LogLine(path="/api/user", status="404", size="300"),
+        LogLine(path="/report", status="500", size="400"),
+    ]
+
+
+def test_of_counts_hits_status_classes_sections_and_bytes():
+    summary = LogSummary.of(entries())
+    assert summary.hits == 4
+    assert summary.status_classes == {"2": 2, "4": 1, "5": 1}
+    assert summary.sections == {"pages": 2, "api": 1, "report": 1}
+    assert summary.bytes == 1000
+
+
+def test_merge_combines_counters():
+    summary = LogSummary.of(entries()[:2]).merge(LogSummary.of(entries()[2:]))
+    expected = LogSummary.of(entries())
+    assert summary.hits == expected.hits
+    assert summary.status_classes == expected.status_classes
+    assert summary.sections == expected.sections
+    assert summary.bytes == expected.bytes
+
+
+def test_most_popular_section_returns_section_and_count():
+    assert LogSummary.of(entries()).most_popular_section == ("pages", 2)
+    assert LogSummary().most_popular_section == (None, 0)
+
+
+def test_percent_computes_percent_of_hits_by_status_class():
+    summary = LogSummary.of(entries())
+    assert summary.percent("2") == 50.0
+    assert summary.percent("3") == 0.0
+    assert summary.percent("5") == 25.0
+    assert LogSummary().percent("2") == 0
@@ -0,0 +1,209 @@
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .log_aggregates import AggregateFactories
+from .log_line import LogRecord
+from .log_summary import LogSummary
+
+# A row of the entries table, in column order
+Row = Tuple[str, str, str, str, str, str, int, int, str, str, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ip_address TEXT,
+    username TEXT,
+    timestamp TEXT,
+    verb TEXT,
+    path TEXT,
+    version TEXT,
+    status INTEGER,
+    size INTEGER,
+    request_time TEXT,
+    section TEXT,
+    epoch INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_epoch ON entries (epoch);
+CREATE TABLE IF NOT EXISTS positions (
+    log TEXT PRIMARY KEY,
+    device INTEGER,
+    inode INTEGER,
+    offset INTEGER,
+    last_bytes BLOB
+);
+"""
+
+INSERT = "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+COUNT_SINCE = "SELECT COUNT(*) FROM entries WHERE epoch >= ?"
+SELECT_SINCE = "SELECT * FROM entries WHERE epoch >= ? ORDER BY epoch"
+STATUS_SECTIONS_SINCE = """
+SELECT status / 100, section, COUNT(*), TOTAL(size) FROM entries
+WHERE epoch >= ? GROUP BY status / 100, section
+"""
+HITS_PER_SECOND = """
+SELECT epoch, COUNT(*) FROM entries GROUP BY epoch ORDER BY epoch
+"""
+LATEST = "SELECT MAX(epoch) FROM entries"
+SELECT_POSITION = """
+SELECT device, inode, offset, last_bytes FROM positions WHERE log = ?
+"""
+UPSERT_POSITION = "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?, ?)"
+DELETE_CHUNK = """
+DELETE FROM entries WHERE rowid IN (
+    SELECT rowid FROM entries WHERE epoch < ? LIMIT ?
+)
+"""
+
+
+class LogTable:
+    """
+    A data structure designed to hold log entries in a SQLite table indexed
+    by epoch second, at the database file `path` (in memory by default), so
+    that history survives a restart. Where each log was read up to is kept
+    alongside, so that reading resumes from there.
+
+    File databases use write-ahead logging, so that readers never block on
+    the writer. Entries are inserted in batches, one transaction per batch,
+    and window queries are range scans of the epoch index with aggregation
+    done by SQLite (`GROUP BY` status class and section).
+
+    If `retention_sec` is given, entries more than `retention_sec` seconds
+    older than the latest entry are deleted in a sweep once every
+    `sweep_sec` seconds of log time, rather than on every insert, and
+    `chunk_size` rows per transaction, so that no one transaction holds the
+    write lock for long.
+    """
+
+    def __init__(self,
+                 path: str = ":memory:",
+                 retention_sec: Optional[int] = None,
+                 chunk_size: int = 10_000,
+                 sweep_sec: int = 60) -> None:
+        self.retention_sec = retention_sec
+        self.chunk_size = chunk_size
+        self.sweep_sec = sweep_sec
+        # The latest epoch second as of the last sweep
+        self.swept: Optional[int] = None
+        # Access may come from the asyncio runtime's executor threads, which
+        # serialize it
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.latest: Optional[int] = self.connection.execute(
+            LATEST).fetchone()[0]
+
+    def insert(self, rows: Iterable[Row]) -> int:
+        """
+        Insert the entries table `rows`, sorted by epoch second, in a single
+        transaction, then sweep expired rows if a sweep is due. Return the
+        number of rows inserted.
+        """
+        rows = sorted(rows, key=lambda row: row[-1])
+        if not rows:
+            return 0
+
+        with self.connection:
+            self.connection.executemany(INSERT, rows)
+
+        if self.latest is None or rows[-1][-1] > self.latest:
+            self.latest = rows[-1][-1]
+        if self.retention_sec is not None and (
+                self.swept is None
+                or self.latest >= self.swept + self.sweep_sec):
+            self.sweep()
+
+        return len(rows)
+
+    def sweep(self) -> int:
+        """
+        Delete every row logged more than `retention_sec` seconds before the
+        latest, `chunk_size` rows per transaction. Return the number deleted.
+        """
+        if self.latest is None or self.retention_sec is None:
+            return 0
+
+        self.swept = self.latest
+        deleted = 0
+        while True:
+            chunk = self.expire(before=self.latest - self.retention_sec)
+            deleted += chunk
+            if chunk < self.chunk_size:
+                return deleted
+
+    def expire(self, before: int) -> int:
+        """
+        Delete at most `chunk_size` rows logged before the epoch second
+        `before`, returning the number deleted. Repeated calls finish the job.
+        """
+        with self.connection:
+            cursor = self.connection.execute(DELETE_CHUNK,
+                                             (before, self.chunk_size))
+        return cursor.rowcount
+
+    def position(self, log: str) -> Optional[list]:
+        """
+        The position recorded by `mark` for the log at the path `log`, or
+        None if there is none.
+        """
+        row = self.connection.execute(SELECT_POSITION, (log, )).fetchone()
+        return list(row) if row else None
+
+    def mark(self, log: str, position: list) -> None:
+        """
+        Record that the table holds the entries of the log at the path `log`
+        read up to `position`, taken by LogManager.snapshot.
+        """
+        with self.connection:
+            self.connection.execute(UPSERT_POSITION, (log, *position))
+
+    def count(self, since: int) -> int:
+        """Count the entries from the epoch second `since` onward."""
+        return self.connection.execute(COUNT_SINCE, (since, )).fetchone()[0]
+
+    def summarize(self,
+                  since: int,
+                  aggregates: Optional[AggregateFactories] = None
+                  ) -> LogSummary:
+        """
+        Summarize the entries from the epoch second `since` onward, with the
+        built-in counters aggregated in SQL. Entries are only read back, as
+        LogRecords, if there are `aggregates` to feed.
+        """
+        summary = LogSummary(aggregates)
+        status_sections: Dict[Tuple[str, str], int] = {}
+        for status_class, section, hits, size in self.connection.execute(
+                STATUS_SECTIONS_SINCE, (since, )):
+            summary.hits += hits
+            summary.bytes += int(size)
+            status_sections[str(status_class), section] = hits
+        summary.count_pairs(status_sections)
+
+        if summary.extras:
+            for record in self.records(since):
+                for extra in summary.extras.values():
+                    extra.add(record)
+
+        return summary
+
+    def records(self, since: int) -> Iterator[LogRecord]:
+        """
+        Yield the entries from the epoch second `since` onward, oldest first,
+        as LogRecords.
+        """
+        rows = self.connection.execute(SELECT_SINCE, (since, ))
+        for (ip_address, username, timestamp, verb, path, version, status,
+             size, request_time, _, epoch) in rows:
+            yield LogRecord(ip_address, username, timestamp, verb, path,
+                            version, str(status), str(size), epoch,
+                            request_time)
+
+    def per_second_hits(self) -> List[Tuple[int, int]]:
+        """(epoch second, hits) pairs for every second with entries."""
+        return self.connection.execute(HITS_PER_SECOND).fetchall()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def __len__(self):
+        return self.count(since=0)
@@ -0,0 +1,104 @@
+from freezegun import freeze_time
+
+from .log_aggregates import TopN
+from .log_batch import LogBatch
+from .log_line import LogLine, LogRecord
+from .log_store import DequeDataStore, SqliteDataStore
+from .log_table import LogTable
+from .log_utils import now_utc
+
+
+def sample_entries(sample_log_path):
+    with open(sample_log_path) as sample_log:
+        return [LogLine.from_log_line(line) for line in sample_log]
+
+
+def row(epoch, status=200, section="api", size=10, request_time="0.010"):
+    return ("127.0.0.1", "jill", "", "GET", f"/{section}", "HTTP/1.0", status,
+            size, request_time, section, epoch)
+
+
+def test_count_and_summarize_since_given_second():
+    table = LogTable()
+    table.insert([row(1002, status=500, section="pages", size=30),
+                  row(1000),
+                  row(1001, status=404, section="pages", size=20)])
+
+    assert table.count(since=1001) == 2
+    summary = table.summarize(since=1001)
+    assert summary.hits == 2
+    assert summary.bytes == 50
+    assert summary.status_classes == {"4": 1, "5": 1}
+    assert summary.most_popular_section == ("pages", 2)
+    assert [record.epoch for record in table.records(since=0)] == [
+        1000, 1001, 1002
+    ]
+
+
+def test_retention_sweeps_old_rows_periodically_in_chunks():
+    table = LogTable(retention_sec=10, chunk_size=20, sweep_sec=30)
+    table.insert(row(second) for second in range(1000, 1100))
+    assert len(table) == 11
+
+    # not yet due
+    table.insert([row(second) for second in range(1100, 1129)])
+    assert table.per_second_hits()[0] == (1089, 1)
+
+    table.insert([row(1129)])
+    assert table.per_second_hits()[0] == (1119, 1)
+    assert len(table) == 11
+
+
+def test_history_survives_reopening(tmp_path):
+    path = str(tmp_path / "access_log.db")
+    table = LogTable(path)
+    table.insert([row(1000), row(1001)])
+    table.close()
+
+    reopened = LogTable(path)
+    assert len(reopened) == 2
+    assert [record.request_time for record in reopened.records(since=0)
+            ] == ["0.010", "0.010"]
+    assert reopened.latest == 1001
+    assert reopened.connection.execute(
+        "PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    assert reopened.position("access.log") is None
+    reopened.mark("access.log", [1, 2, 3, b"line\n"])
+    reopened.mark("access.log", [1, 2, 30, b"longer line\n"])
+    reopened.close()
+    assert LogTable(path).position("access.log") == [
+        1, 2, 30, b"longer line\n"
+    ]
+
+
+@freeze_time("2018-09-11 03:30:00", tz_offset=0)
+def test_store_matches_deque_store(sample_log_path):
+    entries = sample_entries(sample_log_path)
+    since = now_utc(minute=29, second=50)
+    deque_store = DequeDataStore()
+    sqlite_stores = [SqliteDataStore() for _ in range(3)]
+    for store in [deque_store] + sqlite_stores:
+        store.register_aggregate("top_users", lambda: TopN("username", n=1))
+
+    for entry in entries:
+        deque_store.add(entry)
+        sqlite_stores[0].add(entry)
+    sqlite_stores[1].add_many(entries[5:] + [None] + entries[:5])
+    sqlite_stores[2].add_many(LogBatch.from_entries(entries))
+
+    expected = deque_store.summarize(since)
+    for store in sqlite_stores:
+        store.track_window(10)
+        assert store.windowed_count(since) == 9
+        assert store.datastore.count(10**9) == 10
+        peeked = store.peek(since)
+        assert len(peeked) == 9
+        assert all(isinstance(record, LogRecord) for record in peeked)
+        summary = store.summarize(since)
+        assert summary.hits == expected.hits
+        assert summary.status_classes == expected.status_classes
+        assert summary.sections == expected.sections
+        assert summary.bytes == expected.bytes
+        assert (summary.extras["top_users"].value ==
+                expected.extras["top_users"].value)
@@ -0,0 +1,101 @@
+import calendar
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from .log_entry_format import TIMESTAMP_FORMAT
+
+# Not calendar.month_abbr, which is locale-dependent
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct",
+         "Nov", "Dec"], 1)
+}
+
+# Timestamps have one-second resolution and arrive nearly sorted, so a small
+# cache absorbs almost every lookup.
+CACHE_SIZE = 1024
+
+Fields = Tuple[int, int, int, int, int, int, int]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def decode_epoch(timestamp: str,
+                 timestamp_format: str = TIMESTAMP_FORMAT) -> int:
+    """
+    Return the number of seconds since the Unix epoch for the string
+    `timestamp`, formatted according to `timestamp_format`.
+    """
+    fields = fast_fields(timestamp, timestamp_format)
+    if fields is None:
+        parsed = datetime.strptime(timestamp, timestamp_format)
+        return int(parsed.timestamp())
+
+    year, month, day, hour, minute, second, offset = fields
+    return calendar.timegm(
+        (year, month, day, hour, minute, second)) - offset
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def decode_datetime(timestamp: str,
+                    timestamp_format: str = TIMESTAMP_FORMAT) -> datetime:
+    """
+    Return a datetime for the string `timestamp`, formatted according to
+    `timestamp_format`. Equal timestamps share a single datetime object.
+    """
+    fields = fast_fields(timestamp, timestamp_format)
+    if fields is None:
+        return datetime.strptime(timestamp, timestamp_format)
+
+    year, month, day, hour, minute, second, offset = fields
+    return datetime(
+        year, month, day, hour, minute, second, tzinfo=utc_offset(offset))
+
+
+def fast_fields(timestamp: str, timestamp_format: str) -> Optional[Fields]:
+    """
+    Decode a timestamp in the fixed access log layout (TIMESTAMP_FORMAT, e.g.
+    "11/Sep/2018 03:29:52 +0000") by slicing rather than datetime.strptime.
+
+    Return (year, month, day, hour, minute, second, utc offset in seconds),
+    or None if the format or layout differs or any field is out of range,
+    in which case callers should fall back to strptime (which decodes
+    other layouts it accepts and raises for the rest).
+    """
+    if (timestamp_format != TIMESTAMP_FORMAT or len(timestamp) != 26
+            or timestamp[2] != "/" or timestamp[6] != "/"
+            or timestamp[11] != " " or timestamp[14] != ":"
+            or timestamp[17] != ":" or timestamp[20] != " "):
+        return None
+
+    month = MONTHS.get(timestamp[3:6])
+    sign = timestamp[21]
+    digits = (timestamp[0:2] + timestamp[7:11] + timestamp[12:14] +
+              timestamp[15:17] + timestamp[18:20] + timestamp[22:26])
+    if (month is None or sign not in "+-" or not digits.isdigit()
+            or not digits.isascii()):
+        return None
+
+    day, year = int(digits[0:2]), int(digits[2:6])
+    hour, minute, second = (int(digits[6:8]), int(digits[8:10]),
+                            int(digits[10:12]))
+    offset_hours, offset_minutes = int(digits[12:14]), int(digits[14:16])
+    if (year < 1 or not 1 <= day <= calendar.monthrange(year, month)[1]
+            or hour > 23 or minute > 59 or second > 59 or offset_hours > 23
+            or offset_minutes > 59):
+        return None
+
+    offset = offset_hours * 3600 + offset_minutes * 60
+    return (year, month, day, hour, minute, second,
+            -offset if sign == "-" else offset)
+
+
+TIMEZONES: Dict[int, timezone] = {}
+
+
+def utc_offset(seconds: int) -> timezone:
+    """Return a shared timezone instance for the UTC offset `seconds`."""
+    if seconds not in TIMEZONES:
+        TIMEZONES[seconds] = timezone(timedelta(seconds=seconds))
+    return TIMEZONES[seconds]
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+from .log_entry_format import TIMESTAMP_FORMAT
+from .log_timestamps import decode_datetime, decode_epoch, fast_fields
+
+TIMESTAMPS = [
+    "11/Sep/2018 03:29:52 +0000",
+    "01/Jan/2000 00:00:00 -0530",
+    "29/Feb/2020 23:59:59 +1245",
+    "31/Dec/1999 12:00:00 +0100",
+]
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_decode_epoch_agrees_with_strptime(timestamp):
+    expected = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    assert decode_epoch(timestamp) == int(expected.timestamp())
+
+
+@pytest.mark.parametrize("timestamp", TIMESTAMPS)
+def test_decode_datetime_agrees_with_strptime(timestamp):
+    expected = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    actual = decode_datetime(timestamp)
+    assert actual == expected
+    assert actual.utcoffset() == expected.utcoffset()
+
+
+def test_decode_datetime_reuses_datetimes_for_repeated_timestamps():
+    timestamp = "11/Sep/2018 03:29:52 +0000"
+    assert decode_datetime(timestamp) is decode_datetime(timestamp)
+
+
+def test_other_formats_fall_back_to_strptime():
+    assert fast_fields("2000-01 +0000", "%Y-%m %z") is None
+    assert decode_epoch("2000-01 +0000", "%Y-%m %z") == 946684800
+    assert decode_datetime("2000-01 +0000", "%Y-%m %z").month == 1
+
+
+def test_malformed_timestamps_fall_back_to_strptime():
+    assert fast_fields("11/Foo/2018 03:29:52 +0000", TIMESTAMP_FORMAT) is None
+    assert fast_fields("11/Sep/2018 03:29:52 00000", TIMESTAMP_FORMAT) is None
+    assert fast_fields("1x/Sep/2018 03:29:52 +0000", TIMESTAMP_FORMAT) is None
+    with pytest.raises(ValueError):
+        decode_epoch("11/Foo/2018 03:29:52 +0000")
+
+
+@pytest.mark.parametrize("timestamp", [
+    "31/Sep/2018 03:29:52 +0000",
+    "29/Feb/2019 03:29:52 +0000",
+    "00/Sep/2018 03:29:52 +0000",
+    "11/Sep/0000 03:29:52 +0000",
+    "11/Sep/2018 24:29:52 +0000",
+    "11/Sep/2018 03:60:52 +0000",
+    "11/Sep/2018 03:29:60 +0000",
+    "11/Sep/2018 03:29:52 +2400",
+    "11/Sep/2018 03:29:52 +0060",
+    "11/Sep/2018 03 29 52 +0000",
+    "11/Sep/2018 03:29: 2 +0000",
+    "11/Sep/2018 03:29:+2 +0000",
+    "11/Sep/2018 03:29:52 +00_0",
+])
+def test_fast_path_refuses_what_strptime_refuses(timestamp):
+    assert fast_fields(timestamp, TIMESTAMP_FORMAT) is None
+    with pytest.raises(ValueError):
+        datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    with pytest.raises(ValueError):
+        decode_epoch(timestamp)
+    with pytest.raises(ValueError):
+        decode_datetime(timestamp)
+
+
+@pytest.mark.parametrize("timestamp", [
+    " 1/Sep/2018 03:29:52 +0000",
+    "11/Sep/2018  3:29:52 +0000",
+    "11/sep/2018 03:29:52 +0000",
+    "11/Sep/2018 03:29:52 +23:59",
+])
+def test_other_layouts_strptime_accepts_decode_alike(timestamp):
+    expected = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    assert decode_epoch(timestamp) == int(expected.timestamp())
+    assert decode_datetime(timestamp) == expected
@@ -1,19 +1,50 @@
+import glob
+import math
+import os
 from collections import Counter
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Collection, Dict
+from typing import Any, Callable, Collection, Dict, Iterable, List
 
-import tailer
+from .log_mmap import MappedLog
 
 BoolCollectionPredicate = Callable[[Any], bool]
 
 
 def read_last_line(filename: str) -> str:
-    """Read the last line of the log at `filename`."""
-    with open(filename) as f:
-        lines = tailer.tail(f, 1)
-        if lines:
-            return lines[0]
-        return ""
+    """
+    Read the last line of the log at `filename`, by searching backwards for
+    newlines in a memory map of the file rather than reading it.
+    """
+    with MappedLog(filename) as log:
+        return log.last_line().decode("utf-8", "replace")
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """
+    Expand each of the glob `patterns` to the files it matches, in sorted
+    order, dropping duplicates. Patterns matching nothing are kept as given,
+    so that a log yet to be created can still be named.
+    """
+    paths: Dict[str, None] = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            paths.setdefault(path, None)
+    return list(paths)
+
+
+def short_labels(paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Label each of the file `paths` by its path relative to the deepest
+    directory they share, e.g. "a/access.log" and "b/access.log" for logs in
+    /var/log/a and /var/log/b.
+    """
+    paths = list(paths)
+    if len(paths) == 1:
+        return {paths[0]: os.path.basename(paths[0])}
+    root = os.path.commonpath(
+        [os.path.dirname(os.path.abspath(path)) for path in paths])
+    return {path: os.path.relpath(os.path.abspath(path), root)
+            for path in paths}
 
 
 def most_common_by(value_of: Callable,
@@ -49,6 +80,14 @@ def percent(predicate: BoolCollectionPredicate,
     return round(100 * num_subset / len(collection), 1)
 
 
+def epoch_seconds(time: datetime) -> int:
+    """
+    Return the whole number of seconds since the Unix epoch for the
+    timezone-aware datetime `time`, rounding partial seconds up.
+    """
+    return math.ceil(time.timestamp())
+
+
 def now_utc(**kwargs) -> datetime:
     """
     Return a timezone-aware datetime object for the current time, assumed to be
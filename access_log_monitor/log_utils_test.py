@@ -1,4 +1,3 @@
-import io
 from collections import namedtuple
 from datetime import timedelta
 from inspect import cleandoc
@@ -8,20 +7,23 @@ from freezegun import freeze_time
 from . import log_utils
 
 
-def test_read_last_line_returns_the_last_line_as_string(mocker):
+def test_read_last_line_returns_the_last_line_as_string(tmp_path):
     text = """
     1 line
     2 line
-    3 line\0
+    3 line
     """
-    mocker.patch("builtins.open", return_value=io.StringIO(cleandoc(text)))
-    last_line = log_utils.read_last_line(filename="")
-    assert last_line == "3 line"
+    for ending in ("", "\n", "\n\n"):
+        path = tmp_path / "access.log"
+        path.write_text(cleandoc(text) + ending)
+        last_line = log_utils.read_last_line(filename=str(path))
+        assert last_line == "3 line"
 
 
-def test_read_last_line_fails_with_empty_string(mocker):
-    mocker.patch("builtins.open", return_value=io.StringIO())
-    last_line = log_utils.read_last_line(filename="")
+def test_read_last_line_fails_with_empty_string(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text("")
+    last_line = log_utils.read_last_line(filename=str(path))
     assert last_line == ""
 
 
@@ -86,3 +88,24 @@ def test_is_interval_complete_returns_true_if_it_is():
         start_time=two_hrs_ago, delta=one_hr_delta)
 
     assert result is True
+
+
+def test_expand_paths_expands_globs_in_order_without_duplicates(tmp_path):
+    for name in ("b.log", "a.log", "c.txt"):
+        (tmp_path / name).write_text("")
+    missing = str(tmp_path / "missing.log")
+
+    paths = log_utils.expand_paths(
+        [str(tmp_path / "*.log"), str(tmp_path / "a.log"), missing])
+
+    assert paths == [str(tmp_path / "a.log"), str(tmp_path / "b.log"), missing]
+
+
+def test_short_labels_are_relative_to_the_shared_directory(tmp_path):
+    paths = [str(tmp_path / "a" / "access.log"),
+             str(tmp_path / "b" / "access.log")]
+    assert log_utils.short_labels(paths) == {
+        paths[0]: "a/access.log",
+        paths[1]: "b/access.log",
+    }
+    assert log_utils.short_labels(paths[:1]) == {paths[0]: "access.log"}
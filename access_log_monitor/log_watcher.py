@@ -0,0 +1,193 @@
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Optional, Set, Tuple
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class LogWatcher(metaclass=abc.ABCMeta):
+    """
+    Abstract base class for classes that block until any of the watched log
+    files changes, so that the monitoring loop sleeps while the logs are idle.
+
+    `max_latency` is the upper bound, in seconds, on the delay between a write
+    to a log and `wait` returning.
+
+    `changed` is the set of paths, as given, that changed during the last
+    `wait`, or None if the watcher cannot tell which did.
+    """
+
+    max_latency: float = 0.0
+    changed: Optional[Set[str]] = None
+
+    @abc.abstractmethod
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until a watched file is modified, rotated or truncated, or
+        until `timeout` seconds have elapsed.
+
+        Return True if a change was observed, else False.
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the watcher."""
+
+
+class InotifyWatcher(LogWatcher):
+    """
+    Watches the directories containing the logs at `paths` with Linux
+    inotify, via ctypes, and wakes only for events naming one of the log
+    files. Watching directories rather than files means writes, truncation,
+    and rotation (rename and re-create) are all observed.
+
+    However many logs are watched, there is a single inotify instance, with
+    one watch per distinct directory, and a wakeup costs one read of the
+    pending events.
+
+    Raises OSError if inotify is not available on this platform.
+    """
+
+    def __init__(self, *paths: str) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not supported on this platform")
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.paths = paths
+        self.changed: Set[str] = set()
+        # The watched paths in each watched directory, by file name
+        self.watches: Dict[int, Dict[bytes, str]] = {}
+        for path in paths:
+            directory, filename = os.path.split(os.path.abspath(path))
+            watch = libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                           WATCH_MASK)
+            if watch < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, os.strerror(errno), directory)
+            self.watches.setdefault(watch, {})[os.fsencode(filename)] = path
+
+    def wait(self, timeout: float) -> bool:
+        self.changed = set()
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return False
+        return self.__drain_events()
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    def __drain_events(self) -> bool:
+        """
+        Internal. Read all pending events, add the watched paths they refer
+        to to `changed` (all of them, if the event queue overflowed), and
+        return True if there were any.
+        """
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return bool(self.changed)
+
+            offset = 0
+            while offset < len(buffer):
+                watch, mask, _, length = EVENT_HEADER.unpack_from(
+                    buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.changed.update(self.paths)
+                elif name in self.watches.get(watch, {}):
+                    self.changed.add(self.watches[watch][name])
+
+
+class PollingWatcher(LogWatcher):
+    """
+    Fallback LogWatcher for platforms without inotify.
+
+    Polls each log's (inode, size, mtime) with exponential backoff: polling
+    restarts at `min_interval` seconds after every observed change and
+    doubles while the logs are idle, up to `max_interval`.
+    """
+
+    def __init__(self,
+                 *paths: str,
+                 min_interval: float = 0.01,
+                 max_interval: float = 0.25) -> None:
+        self.paths = paths
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_latency = max_interval
+        self.interval = min_interval
+        self.changed: Set[str] = set()
+        self.signatures = {path: self.__signature(path) for path in paths}
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + max(timeout, 0)
+
+        while True:
+            self.changed = set()
+            for path, last_signature in self.signatures.items():
+                signature = self.__signature(path)
+                if signature != last_signature:
+                    self.signatures[path] = signature
+                    self.changed.add(path)
+            if self.changed:
+                self.interval = self.min_interval
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            time.sleep(min(self.interval, remaining))
+            self.interval = min(self.interval * 2, self.max_interval)
+
+    @staticmethod
+    def __signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def create_watcher(*paths: str) -> LogWatcher:
+    """
+    Return an InotifyWatcher for the logs at `paths` where inotify is
+    available, else a PollingWatcher.
+    """
+    try:
+        return InotifyWatcher(*paths)
+    except (OSError, AttributeError):
+        return PollingWatcher(*paths)
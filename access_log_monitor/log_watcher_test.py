@@ -0,0 +1,131 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from .log_watcher import InotifyWatcher, PollingWatcher, create_watcher
+
+
+def append_later(path, text, delay):
+    def append():
+        time.sleep(delay)
+        with open(path, "a") as log:
+            log.write(text)
+
+    thread = threading.Thread(target=append)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def inotify_watcher(tmp_path):
+    log_path = tmp_path / "access.log"
+    log_path.write_text("")
+    try:
+        watcher = InotifyWatcher(str(log_path))
+    except OSError:
+        pytest.skip("inotify unavailable")
+    yield log_path, watcher
+    watcher.close()
+
+
+def test_create_watcher_prefers_inotify_where_available(tmp_path):
+    log_path = tmp_path / "access.log"
+    log_path.write_text("")
+    watcher = create_watcher(str(log_path))
+    try:
+        if sys.platform.startswith("linux"):
+            assert isinstance(watcher, InotifyWatcher)
+        else:
+            assert isinstance(watcher, PollingWatcher)
+    finally:
+        watcher.close()
+
+
+def test_inotify_wait_times_out_if_log_is_idle(inotify_watcher):
+    _, watcher = inotify_watcher
+    started = time.monotonic()
+    assert watcher.wait(timeout=0.05) is False
+    assert time.monotonic() - started >= 0.05
+
+
+def test_inotify_wait_wakes_promptly_on_write(inotify_watcher):
+    log_path, watcher = inotify_watcher
+    writer = append_later(log_path, "line 1\n", delay=0.05)
+
+    started = time.monotonic()
+    assert watcher.wait(timeout=5) is True
+    latency = time.monotonic() - started - 0.05
+    writer.join()
+
+    assert latency < 0.5
+
+
+def test_inotify_wait_ignores_other_files_in_directory(inotify_watcher):
+    log_path, watcher = inotify_watcher
+    (log_path.parent / "other.log").write_text("line 1\n")
+    assert watcher.wait(timeout=0.05) is False
+
+
+def test_inotify_wait_observes_rotation_and_truncation(inotify_watcher):
+    log_path, watcher = inotify_watcher
+
+    os.rename(log_path, str(log_path) + ".1")
+    log_path.write_text("")
+    assert watcher.wait(timeout=1) is True
+
+    with open(log_path, "a") as log:
+        log.write("line 1\n")
+    watcher.wait(timeout=1)
+
+    with open(log_path, "r+") as log:
+        log.truncate(0)
+    assert watcher.wait(timeout=1) is True
+
+
+def test_polling_wait_times_out_if_log_is_idle(tmp_path):
+    log_path = tmp_path / "access.log"
+    log_path.write_text("")
+    watcher = PollingWatcher(str(log_path), max_interval=0.02)
+    assert watcher.wait(timeout=0.05) is False
+    assert watcher.interval == 0.02
+
+
+def test_polling_wait_wakes_within_max_latency_on_write(tmp_path):
+    log_path = tmp_path / "access.log"
+    log_path.write_text("")
+    watcher = PollingWatcher(str(log_path), max_interval=0.05)
+    watcher.wait(timeout=0.2)
+    writer = append_later(log_path, "line 1\n", delay=0.1)
+
+    started = time.monotonic()
+    assert watcher.wait(timeout=5) is True
+    latency = time.monotonic() - started - 0.1
+    writer.join()
+
+    assert latency <= watcher.max_latency + 0.05
+    assert watcher.interval == watcher.min_interval
+
+
+def test_watchers_report_which_of_several_logs_changed(tmp_path):
+    (tmp_path / "b").mkdir()
+    paths = [tmp_path / "a.log", tmp_path / "b" / "a.log", tmp_path / "c.log"]
+    for path in paths:
+        path.write_text("")
+
+    watchers = [PollingWatcher(*map(str, paths), max_interval=0.02)]
+    try:
+        watchers.append(InotifyWatcher(*map(str, paths)))
+    except OSError:
+        pass
+
+    for watcher in watchers:
+        with open(paths[1], "a") as log:
+            log.write("line 1\n")
+        assert watcher.wait(timeout=1) is True
+        assert watcher.changed == {str(paths[1])}
+        assert watcher.wait(timeout=0.05) is False
+        assert watcher.changed == set()
+        watcher.close()
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Optional
+
+
+class WindowCounter:
+    """
+    A running count of log entries over the most recent `length_sec` seconds,
+    kept as per-second counts plus their running total.
+
+    Entries are counted as they are ingested and per-second counts are evicted
+    as they expire, so counting the entries in the window costs O(1) rather
+    than a scan of the window; counting from a later second costs a scan of
+    only the seconds before it. Queries never evict.
+
+    Counts before `horizon` have been evicted and can no longer be queried.
+    """
+
+    def __init__(self, length_sec: int) -> None:
+        self.length_sec = length_sec
+        self.buckets: deque = deque()  # [epoch second, hits], oldest first
+        self.total = 0
+        self.horizon = 0
+
+    def add(self, epoch: int, hits: int = 1) -> "WindowCounter":
+        """
+        Count `hits` entries logged at the epoch second `epoch`, then evict
+        any seconds that have fallen out of the window ending at the latest
+        second counted.
+        """
+        if epoch < self.horizon:
+            return self
+
+        buckets = self.buckets
+        if not buckets or buckets[-1][0] < epoch:
+            buckets.append([epoch, hits])
+        elif buckets[-1][0] == epoch:
+            buckets[-1][1] += hits
+        else:
+            self.__insert(epoch, hits)
+
+        self.total += hits
+        self.expire(before=buckets[-1][0] - self.length_sec)
+        return self
+
+    def expire(self, before: int) -> None:
+        """Evict the counts for every second before the epoch `before`."""
+        buckets = self.buckets
+        while buckets and buckets[0][0] < before:
+            self.total -= buckets.popleft()[1]
+        self.horizon = max(self.horizon, before)
+
+    def count_since(self, since: int) -> Optional[int]:
+        """
+        Return the number of entries from the epoch second `since` onward,
+        without evicting anything. Return None if counts from before `since`
+        have already been evicted, since the answer would be wrong.
+        """
+        if since < self.horizon:
+            return None
+
+        hits = self.total
+        for second, second_hits in self.buckets:
+            if second >= since:
+                break
+            hits -= second_hits
+        return hits
+
+    def __insert(self, epoch: int, hits: int) -> None:
+        """
+        Internal. Count an out-of-order entry, scanning back from the newest
+        second (where late entries almost always land).
+        """
+        for i in range(len(self.buckets) - 1, -1, -1):
+            second = self.buckets[i][0]
+            if second == epoch:
+                self.buckets[i][1] += hits
+                return
+            if second < epoch:
+                self.buckets.insert(i + 1, [epoch, hits])
+                return
+        self.buckets.appendleft([epoch, hits])
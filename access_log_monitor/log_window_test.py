@@ -0,0 +1,42 @@
+from .log_window import WindowCounter
+
+
+def test_count_since_counts_entries_in_window():
+    window = WindowCounter(length_sec=60)
+    for epoch in (1000, 1000, 1010, 1030):
+        window.add(epoch)
+
+    assert window.total == 4
+    assert window.count_since(1000) == 4
+    assert window.count_since(1005) == 2
+    assert window.count_since(1031) == 0
+
+
+def test_add_evicts_seconds_that_fall_out_of_window():
+    window = WindowCounter(length_sec=10).add(1000).add(1005).add(1011)
+    assert window.total == 2
+    assert [second for second, _ in window.buckets] == [1005, 1011]
+    assert window.horizon == 1001
+
+
+def test_add_counts_out_of_order_entries_in_window():
+    window = WindowCounter(length_sec=60).add(1010).add(1000).add(1005)
+    assert [second for second, _ in window.buckets] == [1000, 1005, 1010]
+    assert window.count_since(1005) == 2
+
+    # already evicted
+    window.add(1000)
+    assert window.count_since(1005) == 2
+
+
+def test_count_since_refuses_to_count_evicted_seconds():
+    window = WindowCounter(length_sec=60).add(1000, hits=3).add(1070)
+    assert window.count_since(1010) == 1
+    assert window.count_since(1000) is None
+
+
+def test_count_since_does_not_evict():
+    window = WindowCounter(length_sec=60).add(1000, hits=3).add(1020)
+    assert window.count_since(1015) == 1
+    assert window.count_since(1000) == 4
+    assert [second for second, _ in window.buckets] == [1000, 1020]
@@ -0,0 +1,54 @@
+"""
+Benchmark parallel backfill of a 1M-line access log into a buckets store at
+increasing worker counts, against parsing it line by line in a single
+process. Speedups need as many cores as workers: with fewer, the extra
+workers only add overhead.
+
+Usage: python -m benchmarks.backfill
+"""
+import os
+import tempfile
+
+from access_log_monitor.log_backfill import backfill
+from access_log_monitor.log_batch import LogBatch
+from access_log_monitor.log_line import LogLine
+from access_log_monitor.log_store import BucketedDataStore
+
+from .common import best_of
+from .memory import log_lines
+
+COUNT = 1_000_000
+WINDOW_SEC = 120
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "access.log")
+        with open(path, "w") as log:
+            log.writelines(f"{line}\n" for line in log_lines(COUNT))
+        size = os.path.getsize(path)
+
+        def serial():
+            with open(path) as log:
+                BucketedDataStore(WINDOW_SEC).add_many(
+                    LogBatch.from_entries(
+                        LogLine.from_log_line(line) for line in log))
+
+        baseline = best_of(serial, 1)
+        print(f"{os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>8} {'lines/s':>10} {'speedup':>8}")
+        print(f"{'serial':>8} {baseline:>8.2f} {COUNT / baseline:>10,.0f} "
+              f"{1:>7.1f}x")
+
+        workers = 1
+        while workers <= 2 * (os.cpu_count() or 1):
+            elapsed = best_of(
+                lambda: backfill(path, size, BucketedDataStore(WINDOW_SEC),
+                                 workers=workers), 1)
+            print(f"{workers:>8} {elapsed:>8.2f} {COUNT / elapsed:>10,.0f} "
+                  f"{baseline / elapsed:>7.1f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark filtered counts ("5xx responses for the api section") with
+BitmapDataStore over 3M retained entries, against a scan of the same
+entries in a DequeDataStore.
+
+Usage: python -m benchmarks.bitmaps
+"""
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_store import BitmapDataStore, DequeDataStore
+
+from .common import best_of
+from .dataframe import build_batch
+
+COUNT = 3_000_000
+
+
+def main() -> None:
+    now = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    batch = build_batch(now, COUNT)
+    bitmap_analyzer = LogAnalyzer(BitmapDataStore())
+    bitmap_analyzer.add_many(batch)
+    deque_analyzer = LogAnalyzer(DequeDataStore(compact=True, maxlen=None))
+    deque_analyzer.add_many(batch)
+
+    queries = {
+        "5xx in api (10m)":
+        lambda analyzer: analyzer.count(now - timedelta(minutes=10),
+                                        status_class="5",
+                                        section="api"),
+        "5xx in api (all 3M)":
+        lambda analyzer: analyzer.count(now - timedelta(days=1),
+                                        status_class="5",
+                                        section="api"),
+        "4xx/5xx by jill (all 3M)":
+        lambda analyzer: analyzer.count(now - timedelta(days=1),
+                                        status_class=("4", "5"),
+                                        username="jill"),
+    }
+
+    print(f"{'query':>26} {'deque (ms)':>12} {'bitmaps (ms)':>13} "
+          f"{'speedup':>8}")
+    for name, query in queries.items():
+        assert query(bitmap_analyzer) == query(deque_analyzer)
+        before = 1_000 * best_of(lambda: query(deque_analyzer), 1)
+        after = 1_000 * best_of(lambda: query(bitmap_analyzer), 5)
+        print(f"{name:>26} {before:>12.2f} {after:>13.3f} "
+              f"{before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark reading the last 2 minutes of entries from a 1M-line log: a
+binary search over a memory map of the log, decoding and parsing only the
+lines in the window, against decoding and parsing the whole log.
+
+Usage: python -m benchmarks.catchup
+"""
+import os
+import tempfile
+
+from access_log_monitor.log_line import LogLine
+from access_log_monitor.log_mmap import MappedLog
+from access_log_monitor.log_timestamps import decode_epoch
+
+from .common import best_of
+from .memory import log_lines
+
+COUNT = 1_000_000
+WINDOW_SEC = 120
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "access.log")
+        with open(path, "w") as log:
+            log.writelines(f"{line}\n" for line in log_lines(COUNT))
+
+        with MappedLog(path) as log:
+            last = LogLine.from_log_line(log.last_line().decode())
+        since = decode_epoch(last.timestamp) - WINDOW_SEC
+
+        def full_scan():
+            with open(path) as log:
+                entries = (LogLine.from_log_line(line) for line in log)
+                return [
+                    entry for entry in entries
+                    if decode_epoch(entry.timestamp) >= since
+                ]
+
+        def mapped():
+            with MappedLog(path) as log:
+                return log.entries_since(since)
+
+        assert full_scan() == mapped()
+        before = 1_000 * best_of(full_scan, 1)
+        after = 1_000 * best_of(mapped, 5)
+        print(f"{len(mapped()):,} entries in the last {WINDOW_SEC}s of "
+              f"{COUNT:,} ({os.path.getsize(path) / 2**20:.0f} MiB)")
+        print(f"full scan: {before:.1f} ms, mmap + binary search: "
+              f"{after:.1f} ms ({before / after:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
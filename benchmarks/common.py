@@ -0,0 +1,44 @@
+import os
+import resource
+import timeit
+from typing import Callable, List, Sequence
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+FIXTURES_DIR = os.path.join(PROJECT_ROOT, "access_log_monitor",
+                            "test_fixtures")
+
+
+def best_of(func: Callable, repeat: int, number: int = 1) -> float:
+    """
+    Best wall-clock time of `repeat` runs of `number` calls to `func`, in
+    seconds per call.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def fixture_lines() -> List[str]:
+    """Every line of the bundled test fixture logs."""
+    lines: List[str] = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        with open(os.path.join(FIXTURES_DIR, name)) as fixture:
+            lines += fixture.read().splitlines()
+    return lines
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The nearest-rank `q`-quantile (0 <= q <= 1) of `values`."""
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+def rss_bytes() -> int:
+    """
+    The resident set size of this process, in bytes: current, from
+    /proc/self/statm where available, else the peak so far.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
@@ -0,0 +1,81 @@
+"""
+Benchmark DataFrameDataStore against DequeDataStore at 1M retained entries:
+batch ingest, requests_per_second over the alerting window, and
+LogAnalyzer.report over a reporting window and over everything retained.
+
+Usage: python -m benchmarks.dataframe
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_batch import LogBatch
+from access_log_monitor.log_entry_format import TIMESTAMP_FORMAT
+from access_log_monitor.log_line import LogLine
+from access_log_monitor.log_store import DataFrameDataStore, DequeDataStore
+
+from .common import best_of
+
+COUNT = 1_000_000
+RATE = 100
+USERS = ["james", "jill", "frank", "mary"]
+ENDPOINTS = [
+    "/report", "/settings", "/profile", "/pages/create", "/pages/update",
+    "/pages/delete", "/pages/edit", "/api/user", "/api/pages"
+]
+STATUSES = ["200", "201", "301", "404", "500"]
+
+
+def build_batch(now: datetime, count: int = COUNT) -> LogBatch:
+    """`count` synthetic entries at `RATE` per second, ending at `now`."""
+    rand = random.Random(42)
+    start = now - timedelta(seconds=count // RATE)
+    timestamps = [(start + timedelta(seconds=second)).strftime(
+        TIMESTAMP_FORMAT) for second in range(count // RATE + 1)]
+    return LogBatch.from_entries(
+        LogLine(
+            username=rand.choice(USERS),
+            timestamp=timestamps[i // RATE],
+            path=rand.choice(ENDPOINTS),
+            status=rand.choice(STATUSES),
+            size=str(rand.randint(100, 500))) for i in range(count))
+
+
+def main() -> None:
+    now = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    batch = build_batch(now)
+    stores = {
+        "deque": lambda: DequeDataStore(compact=True, maxlen=None),
+        "dataframe": lambda: DataFrameDataStore(),
+    }
+    queries = {
+        "requests_per_second (2m)":
+        lambda analyzer: analyzer.requests_per_second(
+            now - timedelta(minutes=2), now),
+        "report (10s)":
+        lambda analyzer: analyzer.report(now - timedelta(seconds=10)),
+        "report (all 1M)":
+        lambda analyzer: analyzer.report(now - timedelta(days=1)),
+    }
+
+    timings = {}
+    for name, build_store in stores.items():
+        store = build_store()
+        analyzer = LogAnalyzer(store)
+        timings[name] = {"add_many": best_of(lambda: store.add_many(batch), 1)}
+        assert analyzer.report(now - timedelta(days=1))[
+            "requests_processed"] == COUNT
+        for query, run in queries.items():
+            timings[name][query] = best_of(lambda: run(analyzer), 3)
+
+    print(f"{'operation':>26} {'deque (ms)':>12} {'dataframe (ms)':>15} "
+          f"{'speedup':>8}")
+    for operation in timings["deque"]:
+        before = 1_000 * timings["deque"][operation]
+        after = 1_000 * timings["dataframe"][operation]
+        print(f"{operation:>26} {before:>12.2f} {after:>15.2f} "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
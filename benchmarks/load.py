@@ -0,0 +1,139 @@
+"""
+A seeded synthetic load generator: access log lines in the vocabulary of
+util/log_writer.py (users, endpoints, response codes, line format) at a
+configurable rate, with weighted section and status distributions and
+periodic bursts.
+
+Usage: python -m benchmarks.load [--rps N] [--duration SEC] [--logfile PATH]
+
+Appends `--rps` lines per second to `--logfile` in real time, for watching
+with ./monitor_access_log, or prints them to stdout if no log file is given.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from access_log_monitor.log_entry_format import PATH_FORMAT
+from util.log_writer import (ENDPOINTS, RESPONSE_CODES, TIMESTAMP_FORMAT,
+                             USERS, format_entry)
+
+
+class Burst(NamedTuple):
+    """
+    Multiply the rate by `factor` for the first `length_sec` seconds of
+    every `period_sec` seconds.
+    """
+    period_sec: int
+    length_sec: int
+    factor: float
+
+
+def section_of(endpoint: str) -> str:
+    return PATH_FORMAT.match(endpoint).group("base_path")
+
+
+class SyntheticLoad:
+    """
+    Generates `rps` log lines per second of simulated time, from `start`
+    (default: now), reproducibly for a given `seed`.
+
+    `sections` and `statuses` weight the sections of util/log_writer.py's
+    endpoints (endpoints within a section are equally likely) and its
+    response codes; either defaults to uniform. Each of `bursts` multiplies
+    the rate periodically.
+    """
+
+    def __init__(self,
+                 rps: int = 1_000,
+                 seed: int = 42,
+                 sections: Optional[Dict[str, float]] = None,
+                 statuses: Optional[Dict[int, float]] = None,
+                 bursts: Sequence[Burst] = (),
+                 start: Optional[datetime] = None) -> None:
+        self.rps = rps
+        self.rand = random.Random(seed)
+        self.bursts = bursts
+        self.start = (start or datetime.now(tz=timezone.utc)).replace(
+            microsecond=0)
+
+        self.endpoints = ENDPOINTS
+        self.endpoint_weights = [1.0] * len(ENDPOINTS)
+        if sections:
+            by_section = [section_of(endpoint) for endpoint in ENDPOINTS]
+            self.endpoint_weights = [
+                sections.get(section, 0) / by_section.count(section)
+                for section in by_section
+            ]
+        self.statuses = RESPONSE_CODES
+        self.status_weights = [1.0] * len(RESPONSE_CODES)
+        if statuses:
+            self.status_weights = [
+                statuses.get(status, 0) for status in RESPONSE_CODES
+            ]
+
+    def rate_at(self, second: int) -> int:
+        """The number of lines logged in the `second`th second."""
+        rate = float(self.rps)
+        for burst in self.bursts:
+            if second % burst.period_sec < burst.length_sec:
+                rate *= burst.factor
+        return int(rate)
+
+    def second(self, second: int) -> List[str]:
+        """The lines logged in the `second`th second."""
+        count = self.rate_at(second)
+        rand = self.rand
+        stamp = (self.start + timedelta(seconds=second)).strftime(
+            TIMESTAMP_FORMAT)
+        endpoints = rand.choices(
+            self.endpoints, weights=self.endpoint_weights, k=count)
+        statuses = rand.choices(
+            self.statuses, weights=self.status_weights, k=count)
+        return [
+            format_entry(f"10.0.0.{rand.randint(1, 50)}", rand.choice(USERS),
+                         stamp, endpoint, status, rand.randint(100, 500))
+            for endpoint, status in zip(endpoints, statuses)
+        ]
+
+    def lines(self, duration_sec: int) -> Iterator[str]:
+        """Every line logged in the first `duration_sec` seconds."""
+        for second in range(duration_sec):
+            yield from self.second(second)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rps", type=int, default=1_000)
+    parser.add_argument("--duration", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--burst",
+        type=float,
+        nargs=3,
+        metavar=("PERIOD_SEC", "LENGTH_SEC", "FACTOR"),
+        help="e.g. 30 5 10 for 10x traffic during 5s of every 30s")
+    parser.add_argument("--logfile")
+    args = parser.parse_args()
+
+    bursts = [Burst(int(args.burst[0]), int(args.burst[1]), args.burst[2])
+              ] if args.burst else []
+    load = SyntheticLoad(rps=args.rps, seed=args.seed, bursts=bursts)
+    out = open(args.logfile, "a") if args.logfile else sys.stdout
+    try:
+        for second in range(args.duration):
+            due = load.start.timestamp() + second
+            time.sleep(max(0, due - time.time()))
+            out.writelines(f"{line}\n" for line in load.second(second))
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.logfile:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
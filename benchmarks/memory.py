@@ -0,0 +1,68 @@
+"""
+Report memory per retained entry for each representation of a parsed log
+line: LogLine (the dataclass produced by the parser), LogRecord (slotted,
+interned) and LogBatch (columnar), measured with tracemalloc over 100k
+synthetic entries.
+
+Usage: python -m benchmarks.memory
+"""
+import gc
+import random
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_batch import LogBatch
+from access_log_monitor.log_entry_format import TIMESTAMP_FORMAT
+from access_log_monitor.log_line import LogLine
+
+COUNT = 100_000
+USERS = ["james", "jill", "frank", "mary"]
+ENDPOINTS = [
+    "/report", "/settings", "/profile", "/pages/create", "/pages/update",
+    "/pages/delete", "/pages/edit", "/api/user", "/api/pages"
+]
+STATUSES = [200, 201, 301, 404, 500]
+
+
+def log_lines(count: int = COUNT):
+    """`count` synthetic log lines at 100 lines per second."""
+    rand = random.Random(42)
+    start = datetime(2018, 9, 11, tzinfo=timezone.utc)
+    for i in range(count):
+        time = (start + timedelta(seconds=i // 100)).strftime(
+            TIMESTAMP_FORMAT.replace(" ", ":", 1))
+        yield (f"127.0.0.{rand.randint(1, 50)} - {rand.choice(USERS)} "
+               f'[{time}] "GET {rand.choice(ENDPOINTS)} HTTP/1.0" '
+               f"{rand.choice(STATUSES)} {rand.randint(100, 500)}")
+
+
+def retained_bytes(build):
+    """Bytes still allocated by the object returned by `build`."""
+    gc.collect()
+    tracemalloc.start()
+    retained = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return size
+
+
+def main() -> None:
+    lines = list(log_lines())
+    representations = {
+        "LogLine":
+        lambda: [LogLine.from_log_line(line) for line in lines],
+        "LogRecord":
+        lambda: [LogLine.from_log_line(line).compact() for line in lines],
+        "LogBatch":
+        lambda: LogBatch.from_entries(
+            LogLine.from_log_line(line) for line in lines),
+    }
+
+    print(f"{'representation':>16} {'bytes/entry':>12}")
+    for name, build in representations.items():
+        print(f"{name:>16} {retained_bytes(build) / COUNT:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
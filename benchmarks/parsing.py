@@ -0,0 +1,65 @@
+"""
+Benchmark log line parsing throughput, in lines per second, on the bundled
+test fixtures: the W3C entry format against the non-backtracking common log
+format, both for the pattern match alone and for LogLine.from_log_line, and
+against LogLine.from_log_line as it was before (W3C format, keyword
+construction, one `match.group` call per field).
+
+Usage: python -m benchmarks.parsing
+"""
+from access_log_monitor.log_entry_format import (ENTRY_FORMATS,
+                                                 W3C_ENTRY_FORMAT)
+from access_log_monitor.log_line import LogLine
+
+from .common import best_of, fixture_lines
+
+REPEAT = 5
+NUMBER = 200
+
+
+def legacy_from_log_line(log_line: str):
+    match = W3C_ENTRY_FORMAT.match(log_line)
+    if not match:
+        return None
+
+    date = match.group("date")
+    time = match.group("time")
+    offset = match.group("offset")
+
+    return LogLine(
+        ip_address=match.group("ip_address"),
+        username=match.group("username"),
+        timestamp=f"{date} {time} {offset}",
+        verb=match.group("verb"),
+        path=match.group("path"),
+        version=match.group("http_version"),
+        status=match.group("response_status"),
+        size=match.group("size"))
+
+
+def main() -> None:
+    lines = fixture_lines()
+    print(f"{'format':>8} {'match (lines/s)':>16} {'parse (lines/s)':>16}")
+
+    legacy = len(lines) / best_of(
+        lambda: [legacy_from_log_line(line) for line in lines], REPEAT, NUMBER)
+    print(f"{'legacy':>8} {'':>16} {legacy:>16,.0f}")
+
+    results = {}
+    for name, entry_format in ENTRY_FORMATS.items():
+        match = best_of(lambda: [entry_format.match(line) for line in lines],
+                        REPEAT, NUMBER)
+        parse = best_of(
+            lambda: [
+                LogLine.from_log_line(line, entry_format) for line in lines
+            ], REPEAT, NUMBER)
+        results[name] = (len(lines) / match, len(lines) / parse)
+        print(f"{name:>8} {results[name][0]:>16,.0f} "
+              f"{results[name][1]:>16,.0f}")
+
+    print(f"\nclf vs w3c match: {results['clf'][0] / results['w3c'][0]:.1f}x")
+    print(f"clf parse vs legacy parse: {results['clf'][1] / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
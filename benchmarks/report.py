@@ -0,0 +1,87 @@
+"""
+Benchmark LogAnalyzer.report latency over windows of 10k, 100k and 1M
+retained entries, comparing the single-pass summary against the previous
+implementation (a peek per statistic, with per-entry lambdas).
+
+Usage: python -m benchmarks.report
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_deque import LogDeque
+from access_log_monitor.log_entry_format import PATH_FORMAT
+from access_log_monitor.log_line import LogLine
+from access_log_monitor.log_store import DequeDataStore
+from access_log_monitor.log_utils import most_common_by, percent
+
+from .common import best_of
+
+ENDPOINTS = [
+    "/report", "/settings", "/profile", "/pages/create", "/pages/update",
+    "/pages/delete", "/pages/edit", "/api/user", "/api/pages"
+]
+STATUSES = ["200", "201", "301", "404", "500"]
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def build_store(size: int, now: datetime) -> DequeDataStore:
+    """A DequeDataStore holding `size` entries, newest first, one per ms."""
+    rand = random.Random(42)
+    entries = []
+    for i in range(size):
+        entry = LogLine(
+            path=rand.choice(ENDPOINTS),
+            status=rand.choice(STATUSES),
+            size=str(rand.randint(100, 500)))
+        entries.append((now - timedelta(milliseconds=i), entry))
+
+    store = DequeDataStore()
+    store.datastore = LogDeque(entries, maxlen=None)
+    return store
+
+
+def legacy_site_section(entry) -> str:
+    match = PATH_FORMAT.match(entry.path)
+    if match:
+        return match.group("base_path")
+    return ""
+
+
+def legacy_report(store: DequeDataStore, since: datetime, now: datetime):
+    """LogAnalyzer.report as it was before the single-pass summary."""
+    entries = store.peek(since)
+    most_common = most_common_by(legacy_site_section, entries)
+    hits = len(store.peek(since))
+    return {
+        "most_popular_section": most_common["value"],
+        "most_popular_count": most_common["count"],
+        "requests_processed": len(entries),
+        "requests_per_second": round(hits / (now - since).total_seconds(), 1),
+        "response_2xx_pct": percent(lambda e: e.status[0] == "2", entries),
+        "response_3xx_pct": percent(lambda e: e.status[0] == "3", entries),
+        "response_4xx_pct": percent(lambda e: e.status[0] == "4", entries),
+        "response_5xx_pct": percent(lambda e: e.status[0] == "5", entries),
+    }
+
+
+def main() -> None:
+    now = datetime.now(tz=timezone.utc)
+    print(f"{'entries':>10} {'before (ms)':>12} {'after (ms)':>12} "
+          f"{'speedup':>8}")
+
+    for size in SIZES:
+        store = build_store(size, now)
+        analyzer = LogAnalyzer(store)
+        since = now - timedelta(days=1)
+        repeat = 5 if size < 1_000_000 else 2
+
+        before = 1_000 * best_of(lambda: legacy_report(store, since, now),
+                                 repeat)
+        after = 1_000 * best_of(lambda: analyzer.report(since), repeat)
+        print(f"{size:>10,} {before:>12.1f} {after:>12.1f} "
+              f"{before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare BucketedDataStore (per-second buckets) with RollupDataStore (1s, 10s,
+1m and 1h rollups), both retaining a day of traffic: memory retained, and
+summarize over windows from 2 minutes to 24 hours.
+
+Usage: python -m benchmarks.rollups
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_store import BucketedDataStore, RollupDataStore
+from access_log_monitor.log_summary import LogSummary
+from access_log_monitor.log_utils import epoch_seconds
+
+from .common import best_of
+from .memory import retained_bytes
+
+DAY = 24 * 60 * 60
+SECTIONS = ["report", "settings", "profile", "pages", "api"]
+STATUS_CLASSES = ["2", "3", "4", "5"]
+
+
+def fill(store, now: datetime):
+    """Merge a summary of random traffic for every second of the last day."""
+    rand = random.Random(42)
+    latest = epoch_seconds(now)
+    for epoch in range(latest - DAY + 1, latest + 1):
+        summary = LogSummary()
+        summary.hits = rand.randint(50, 150)
+        summary.bytes = 300 * summary.hits
+        for status_class in STATUS_CLASSES:
+            summary.status_classes[status_class] = summary.hits // 4
+        for section in SECTIONS:
+            summary.sections[section] = summary.hits // 5
+        store.datastore.merge(epoch, summary)
+    return store
+
+
+def main() -> None:
+    now = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    stores = {
+        "buckets": lambda: fill(BucketedDataStore(window_sec=DAY), now),
+        "rollups": lambda: fill(RollupDataStore(retention_sec=DAY), now),
+    }
+    windows = {
+        "2m": timedelta(minutes=2),
+        "1h": timedelta(hours=1),
+        "24h": timedelta(hours=23, minutes=59),
+    }
+
+    print(f"{'store':>8} {'MB':>8} " +
+          " ".join(f"{f'summarize {w} (ms)':>20}" for w in windows))
+    for name, build in stores.items():
+        size = retained_bytes(build) / 1e6
+        store = build()
+        timings = [
+            1_000 * best_of(lambda: store.summarize(now - window), 3)
+            for window in windows.values()
+        ]
+        print(f"{name:>8} {size:>8.1f} " +
+              " ".join(f"{timing:>20.2f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Run the benchmark suite and emit the results as JSON, to track performance
+across versions:
+
+- micro-benchmarks of LogLine.from_log_line, DequeDataStore.add,
+  LogDeque.peek and LogAnalyzer.report, and of checkpointing and restoring
+  a window of buckets, and
+- end-to-end runs of the monitoring pipeline per datastore, writing `--rps`
+  synthetic lines per simulated second to a log (see benchmarks.load) and
+  ticking after each second: sustained ingest rate, tick latency and RSS.
+
+Every tick of an end-to-end run reports as well as alerts, so tick latency
+is the worst case. Ingest rate is lines per second of time spent ticking.
+
+Usage: python -m benchmarks.suite [--rps N] [--duration SEC]
+           [--datastore NAME ...] [--output PATH] [--baseline PATH]
+
+With `--baseline`, a previous run's JSON, each result is also printed to
+stderr as a ratio to its baseline, flagging changes for the worse beyond
+`--tolerance`.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from access_log_monitor.log_analyzer import LogAnalyzer
+from access_log_monitor.log_checkpoint import decode, encode
+from access_log_monitor.log_line import LogLine
+from access_log_monitor.log_manager import LogManager
+from access_log_monitor.log_monitor import perform_monitoring
+from access_log_monitor.log_monitors.alerting_monitor import AlertingMonitor
+from access_log_monitor.log_monitors.reporting_monitor import ReportingMonitor
+from access_log_monitor.log_store import (BitmapDataStore, BucketedDataStore,
+                                          DataFrameDataStore, DequeDataStore,
+                                          LogStore, RollupDataStore,
+                                          SqliteDataStore)
+from access_log_monitor.log_timestamps import decode_datetime
+from access_log_monitor.log_utils import now_utc
+
+from .common import PROJECT_ROOT, best_of, percentile, rss_bytes
+from .load import SyntheticLoad
+
+MICRO_LINES = 10_000
+MICRO_RPS = 1_000
+CHECKPOINT_RPS = 100
+PEEK_SEC = 10
+REPEAT = 10
+WINDOW_SEC = 120
+# the suffixes of compared results: rates, then timings and sizes
+UNITS = ("_per_sec", "_rps", "ms", "_mb")
+
+STORES: Dict[str, Callable[[str], LogStore]] = {
+    "deque": lambda directory: DequeDataStore(compact=True),
+    "buckets": lambda directory: BucketedDataStore(window_sec=WINDOW_SEC),
+    "rollups": lambda directory: RollupDataStore(retention_sec=WINDOW_SEC),
+    "dataframe":
+    lambda directory: DataFrameDataStore(retention_sec=WINDOW_SEC),
+    "bitmaps": lambda directory: BitmapDataStore(retention_sec=WINDOW_SEC),
+    "sqlite": lambda directory: SqliteDataStore(
+        os.path.join(directory, "access.db"), retention_sec=WINDOW_SEC),
+}
+
+
+def micro(seed: int) -> Dict[str, Dict[str, float]]:
+    """Throughput of parsing and adding, latency of peeking and reporting."""
+    load = SyntheticLoad(rps=MICRO_RPS, seed=seed)
+    lines = list(load.lines(MICRO_LINES // MICRO_RPS))
+    entries = [LogLine.from_log_line(line) for line in lines]
+    latest = decode_datetime(entries[-1].timestamp)
+    since = latest - timedelta(seconds=PEEK_SEC - 1)
+
+    def fill() -> DequeDataStore:
+        store = DequeDataStore(maxlen=None)
+        for entry in entries:
+            store.add(entry)
+        return store
+
+    store = fill()
+    analyzer = LogAnalyzer(store)
+    parse = best_of(lambda: [LogLine.from_log_line(line) for line in lines],
+                    REPEAT)
+    add = best_of(fill, REPEAT)
+    return {
+        "log_line_from_log_line": {
+            "lines_per_sec": round(len(lines) / parse)
+        },
+        "deque_datastore_add": {
+            "entries_per_sec": round(len(entries) / add)
+        },
+        "log_deque_peek": {
+            "entries": len(store.peek(since)),
+            "ms": round(1_000 * best_of(lambda: store.datastore.peek(since),
+                                        REPEAT), 3),
+        },
+        "log_analyzer_report": {
+            "entries": len(store.peek(since)),
+            "ms": round(1_000 * best_of(lambda: analyzer.report(since),
+                                        REPEAT), 3),
+        },
+        "checkpoint": checkpoint(seed),
+    }
+
+
+def checkpoint(seed: int) -> Dict[str, float]:
+    """
+    Size of a checkpoint of a full window of buckets, with heavy hitters and
+    percentiles, and the time to encode it and to decode and restore it.
+    """
+    load = SyntheticLoad(rps=CHECKPOINT_RPS, seed=seed)
+    entries = [LogLine.from_log_line(line) for line in load.lines(WINDOW_SEC)]
+
+    def build() -> BucketedDataStore:
+        store = BucketedDataStore(window_sec=WINDOW_SEC)
+        analyzer = LogAnalyzer(store)
+        analyzer.track_heavy_hitters()
+        analyzer.track_percentiles()
+        return store
+
+    store = build()
+    store.add_many(entries)
+    data = encode(store.snapshot())
+    save = best_of(lambda: encode(store.snapshot()), REPEAT)
+    restore = best_of(lambda: build().restore(decode(data)), REPEAT)
+    return {
+        "bytes": len(data),
+        "save_ms": round(1_000 * save, 3),
+        "restore_ms": round(1_000 * restore, 3),
+    }
+
+
+def end_to_end(datastore: str, rps: int, duration_sec: int,
+               seed: int) -> Dict[str, Any]:
+    """
+    Tick the monitoring pipeline once per simulated second of `rps` lines,
+    with the timestamps of the last `duration_sec` seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "access.log")
+        open(path, "w").close()
+
+        load = SyntheticLoad(
+            rps=rps,
+            seed=seed,
+            start=now_utc() - timedelta(seconds=duration_sec))
+        log = LogManager(path)
+        store = STORES[datastore](directory)
+        analyzer = LogAnalyzer(store)
+        analyzer.track_heavy_hitters()
+        analyzer.track_percentiles()
+        monitors = [
+            ReportingMonitor(interval_sec=0),
+            AlertingMonitor(threshold_rps=rps, interval_sec=WINDOW_SEC),
+        ]
+
+        written = 0
+        ticks: List[float] = []
+        with open(path, "a") as out, redirect_stdout(io.StringIO()):
+            for second in range(duration_sec):
+                lines = load.second(second)
+                out.writelines(f"{line}\n" for line in lines)
+                out.flush()
+                written += len(lines)
+
+                started = time.perf_counter()
+                perform_monitoring(log, store, analyzer, monitors)
+                ticks.append(time.perf_counter() - started)
+
+        ingested = store.count(load.start)
+        rss = rss_bytes()
+
+    return {
+        "rps": rps,
+        "duration_sec": duration_sec,
+        "lines": written,
+        "ingested": ingested,
+        "ingest_rps": round(written / sum(ticks)),
+        "tick_ms": {
+            name: round(1_000 * value, 3)
+            for name, value in (("p50", percentile(ticks, 0.5)),
+                                ("p99", percentile(ticks, 0.99)),
+                                ("max", max(ticks)))
+        },
+        "rss_mb": round(rss / 2**20, 1),
+    }
+
+
+def version() -> Dict[str, Optional[str]]:
+    """The revision benchmarked, and where."""
+    try:
+        revision: Optional[str] = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def flatten(results: Dict[str, Any],
+            prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yield (dotted path, value) pairs for every number in `results`."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float) -> int:
+    """
+    Print every timing and rate in `results` as a ratio to `baseline`,
+    flagging those worse by more than `tolerance`; return how many are.
+    Rates (`*_per_sec`, `*_rps`) are better higher, the rest lower.
+    """
+    before = dict(flatten(baseline.get("results", {})))
+    regressions = 0
+    for name, value in flatten(results["results"]):
+        measures = [part for part in name.split(".") if part.endswith(UNITS)]
+        if not measures or not before.get(name):
+            continue
+        ratio = value / before[name]
+        higher_is_better = measures[-1].endswith(("_per_sec", "_rps"))
+        worse = ratio < 1 - tolerance if higher_is_better else (
+            ratio > 1 + tolerance)
+        regressions += worse
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:>50} {ratio:>7.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rps", type=int, default=5_000)
+    parser.add_argument("--duration", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--datastore",
+        nargs="+",
+        choices=list(STORES),
+        default=["deque", "buckets", "rollups"])
+    parser.add_argument("--output", help="write the JSON here, not stdout")
+    parser.add_argument("--baseline", help="a previous run's JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {
+        "version": version(),
+        "started_at": now_utc().isoformat(),
+        "seed": args.seed,
+        "results": {
+            "micro": micro(args.seed),
+            "end_to_end": {
+                name: end_to_end(name, args.rps, args.duration, args.seed)
+                for name in args.datastore
+            },
+        },
+    }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(f"{report}\n")
+    else:
+        print(report)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline),
+                                  args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
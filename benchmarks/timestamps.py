@@ -0,0 +1,54 @@
+"""
+Benchmark timestamp decoding, in timestamps per second: datetime.strptime
+(the previous path) against the cached fast-path decoders, both for a
+stream of distinct timestamps (every lookup misses the cache) and for a
+realistic stream where many consecutive lines share the same second.
+
+Usage: python -m benchmarks.timestamps
+"""
+from datetime import datetime, timedelta, timezone
+
+from access_log_monitor.log_entry_format import TIMESTAMP_FORMAT
+from access_log_monitor.log_timestamps import decode_datetime, decode_epoch
+
+from .common import best_of
+
+COUNT = 100_000
+LINES_PER_SECOND = 100
+REPEAT = 3
+
+
+def timestamps(lines_per_second: int):
+    start = datetime(2018, 9, 11, tzinfo=timezone.utc)
+    return [(start + timedelta(seconds=i // lines_per_second)
+             ).strftime(TIMESTAMP_FORMAT) for i in range(COUNT)]
+
+
+def decoders():
+    return {
+        "strptime": lambda t: datetime.strptime(t, TIMESTAMP_FORMAT),
+        "decode_datetime": decode_datetime,
+        "decode_epoch": decode_epoch,
+    }
+
+
+def main() -> None:
+    streams = {
+        "distinct": timestamps(lines_per_second=1),
+        f"{LINES_PER_SECOND}/s": timestamps(LINES_PER_SECOND),
+    }
+    print(f"{'decoder':>16} " +
+          " ".join(f"{name + ' (ts/s)':>18}" for name in streams))
+
+    for name, decode in decoders().items():
+        rates = []
+        for stream in streams.values():
+            decode_epoch.cache_clear()
+            decode_datetime.cache_clear()
+            seconds = best_of(lambda: [decode(t) for t in stream], REPEAT)
+            rates.append(len(stream) / seconds)
+        print(f"{name:>16} " + " ".join(f"{rate:>18,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
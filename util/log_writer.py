@@ -5,9 +5,6 @@ from datetime import datetime, timezone
 
 LOG_FILE = os.environ.get("LOG_FILE", "/var/log/access.log")
 
-seed = int(os.environ.get("RAND_SEED", 42))
-random.seed(seed)
-
 USERS = ["james", "jill", "frank", "mary"]
 ENDPOINTS = [
     "/report",
@@ -29,6 +26,10 @@ def reset_log(logfile):
     open(logfile, "w+").close()
 
 
+def format_entry(ip, user, time, endpoint, status, size):
+    return f'{ip} - {user} [{time}] "GET {endpoint} HTTP/1.0" {status} {size}'
+
+
 def generate_entry():
     ip = "127.0.0.1"
     user = random.choice(USERS)
@@ -36,7 +37,7 @@ def generate_entry():
     status = random.choice(RESPONSE_CODES)
     time = datetime.now(tz=timezone.utc).strftime(TIMESTAMP_FORMAT)
     size = random.randint(100, 500)
-    return f'{ip} - {user} [{time}] "GET {endpoint} HTTP/1.0" {status} {size}'
+    return format_entry(ip, user, time, endpoint, status, size)
 
 
 def write_entry_to_log(entry, logfile):
@@ -51,6 +52,8 @@ def random_sleep():
 
 
 if __name__ == "__main__":
+    random.seed(int(os.environ.get("RAND_SEED", 42)))
+
     try:
         reset_log(LOG_FILE)
 